@@ -0,0 +1,247 @@
+"""Columnar loading of the popup A/B dataset, ``data/dataset.tsv``.
+
+The TSV is parsed once into typed columns:
+
+- text columns are dictionary-encoded, as ``int32`` codes into a list of the
+  distinct values, so the long URLs and descriptions repeated on thousands
+  of rows are stored once;
+- the packed ``popup_version|start_date|popup_category`` cell, a JSON
+  array, is split into ``popup_version``, ``start_date`` and
+  ``popup_category``; ``start_date`` is a ``datetime64[D]`` column with
+  ``NaT`` where the cell has no date;
+- ``views`` and ``registrations`` are ``int64``.
+
+Text values are stripped of surrounding whitespace, such as the line break
+that starts most quoted ``popup_header`` cells. ``load`` caches the columns
+in ``<name>.columns`` next to the TSV and memory-maps them on later loads;
+the cache is rebuilt when the TSV's SHA-256 changes. Only the size and
+modification time are checked while they match the cache, so an unchanged
+file is never read::
+
+    python -m analytics.dataset [data/dataset.tsv] [--rebuild]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+DATASET = Path(__file__).resolve().parents[1] / "data" / "dataset.tsv"
+PACKED_COLUMN = "popup_version|start_date|popup_category"
+PACKED = ("popup_version", "start_date", "popup_category")
+
+TEXT_COLUMNS = (
+    "popup_name", "blog_post_url", "popup_version", "popup_category", "popup_header",
+    "popup_description", "popup_image_url", "popup_title",
+)
+COUNT_COLUMNS = ("views", "registrations")
+COLUMNS = (*TEXT_COLUMNS, "start_date", *COUNT_COLUMNS)
+
+MAGIC = b"POPUPCOL"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+
+class Dataset:
+    """Typed columns of equal length; text columns hold codes into ``dictionaries``."""
+
+    def __init__(self, columns, dictionaries, source_hash=None):
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.source_hash = source_hash
+
+    def __len__(self):
+        return len(self.columns["views"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def code(self, name, value):
+        """The code of ``value`` in a text column, or -1 when no row has it."""
+        try:
+            return self.dictionaries[name].index(value)
+        except ValueError:
+            return -1
+
+    def decode(self, name):
+        """A text column as an array of strings."""
+        return np.asarray(self.dictionaries[name], dtype=object)[self.columns[name]]
+
+    def rows(self):
+        """Yields every row as a dict of plain Python values."""
+        decoded = {name: self.decode(name) for name in TEXT_COLUMNS}
+        dates = self.columns["start_date"]
+        for index in range(len(self)):
+            row = {name: decoded[name][index] for name in TEXT_COLUMNS}
+            row["start_date"] = None if np.isnat(dates[index]) else dates[index].item()
+            row.update((name, int(self.columns[name][index])) for name in COUNT_COLUMNS)
+            yield row
+
+
+def load(path=DATASET, rebuild=False):
+    """The dataset at ``path``, from its column cache when that is still current."""
+    path = Path(path)
+    cache = cache_path(path)
+    stat = path.stat()
+    if not rebuild and cache.exists():
+        header = _read_header(cache)
+        if header and (header["size"], header["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return _open(cache, header)
+        if header and header["source_hash"] == file_hash(path):
+            # Touched but unchanged: keep the columns and remember the new modification time
+            _write(cache, _open(cache, header), stat)
+            return load(path)
+    dataset = parse(path)
+    _write(cache, dataset, stat)
+    return _open(cache, _read_header(cache))
+
+
+def cache_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".columns")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse(path):
+    """Parses the TSV into in-memory columns, without touching the cache."""
+    with open(path, newline="", encoding="utf-8") as source:
+        return from_records(read_records(source), source_hash=file_hash(path))
+
+
+def read_records(source, header=None):
+    """Yields ``(text values, start date, views, registrations)`` for every row of an open TSV.
+
+    ``source`` is any iterable of lines. Without ``header`` the first row is
+    the header; pass the header to read rows from the middle of a file.
+    """
+    reader = csv.reader(source, delimiter="\t")
+    return to_records(reader, header or next(reader))
+
+
+def to_records(rows, header):
+    """Yields ``read_records`` tuples for rows already split into fields."""
+    index = {name: position for position, name in enumerate(header)}
+    packed = index[PACKED_COLUMN]
+    for row in rows:
+        if not row:
+            continue
+        version, start_date, category = _unpack(row[packed])
+        values = {name: row[index[name]].strip() for name in TEXT_COLUMNS if name not in PACKED}
+        values.update(popup_version=version, popup_category=category)
+        yield values, start_date, int(row[index["views"]]), int(row[index["registrations"]])
+
+
+def from_records(records, source_hash=None):
+    """Builds a dataset from ``read_records`` output, encoding text columns as it goes."""
+    dictionaries = {name: [] for name in TEXT_COLUMNS}
+    lookups = {name: {} for name in TEXT_COLUMNS}
+    codes = {name: [] for name in TEXT_COLUMNS}
+    dates, views, registrations = [], [], []
+    for values, start_date, row_views, row_registrations in records:
+        for name in TEXT_COLUMNS:
+            value = values[name]
+            code = lookups[name].get(value)
+            if code is None:
+                code = lookups[name][value] = len(dictionaries[name])
+                dictionaries[name].append(value)
+            codes[name].append(code)
+        dates.append(start_date or "NaT")
+        views.append(row_views)
+        registrations.append(row_registrations)
+    columns = {name: np.asarray(codes[name], dtype=np.int32) for name in TEXT_COLUMNS}
+    columns["start_date"] = np.asarray(dates, dtype="datetime64[D]")
+    columns["views"] = np.asarray(views, dtype=np.int64)
+    columns["registrations"] = np.asarray(registrations, dtype=np.int64)
+    return Dataset(columns, dictionaries, source_hash)
+
+
+def _unpack(cell):
+    version, start_date, category = (json.loads(cell) + ["", "", ""])[:3]
+    return version.strip(), start_date.strip(), category.strip()
+
+
+def _write(cache, dataset, stat):
+    """Writes the columns aligned after a JSON header, then moves the file into place."""
+    layout = {}
+    offset = 0
+    for name in COLUMNS:
+        array = np.ascontiguousarray(dataset.columns[name])
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": array.dtype.str, "offset": offset, "length": len(array)}
+        offset += array.nbytes
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "source_hash": dataset.source_hash,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "rows": len(dataset),
+        "columns": layout,
+        "dictionaries": dataset.dictionaries,
+    }).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+    temporary = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as output:
+        output.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for name in COLUMNS:
+            output.seek(data_start + layout[name]["offset"])
+            output.write(np.ascontiguousarray(dataset.columns[name]).tobytes())
+        output.truncate(data_start + offset)
+    os.replace(temporary, cache)
+
+
+def _read_header(cache):
+    with open(cache, "rb") as source:
+        if source.read(len(MAGIC)) != MAGIC:
+            return None
+        (length,) = struct.unpack("<I", source.read(4))
+        header = json.loads(source.read(length))
+    if header.get("format") != FORMAT_VERSION:
+        return None
+    header["data_start"] = -(-(len(MAGIC) + 4 + length) // ALIGNMENT) * ALIGNMENT
+    return header
+
+
+def _open(cache, header):
+    """Memory-maps the columns of a cache file; nothing is read until a column is used."""
+    if header["rows"] == 0:
+        columns = {name: np.empty(0, dtype=np.dtype(spec["dtype"])) for name, spec in header["columns"].items()}
+    else:
+        data = np.memmap(cache, dtype=np.uint8, mode="r")
+        columns = {}
+        for name, spec in header["columns"].items():
+            dtype = np.dtype(spec["dtype"])
+            start = header["data_start"] + spec["offset"]
+            columns[name] = data[start:start + spec["length"] * dtype.itemsize].view(dtype)
+    return Dataset(columns, header["dictionaries"], header["source_hash"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analytics.dataset")
+    parser.add_argument("path", nargs="?", default=str(DATASET), help="TSV to load (default: data/dataset.tsv).")
+    parser.add_argument("--rebuild", action="store_true", help="Parse the TSV even if the cache is current.")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    dataset = load(args.path, rebuild=args.rebuild)
+    elapsed = time.perf_counter() - start
+    print(f"{len(dataset)} rows in {elapsed * 1000:.1f} ms from {cache_path(args.path)} "
+          f"({cache_path(args.path).stat().st_size / 1024:.0f} KiB)")
+    for name in TEXT_COLUMNS:
+        print(f"  {name:<20} {len(dataset.dictionaries[name]):6d} distinct values")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
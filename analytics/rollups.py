@@ -0,0 +1,289 @@
+"""Streaming, incremental rollups of views and registrations.
+
+``aggregate`` reads the TSV in chunks of ``chunk_rows`` rows, so memory
+stays bounded however long the file gets, and keeps running sums of views,
+registrations and rows for every requested grouping. A grouping is any
+combination of ``popup_name``, ``blog_post_url``, ``popup_version``,
+``popup_category`` and a start-date bucket, ``week`` (the Monday it starts
+on) or ``quarter`` (``2020-Q2``). Within a chunk the sums are taken with
+``numpy.bincount`` over the chunk's distinct keys.
+
+The sums and the byte offset after the last complete line are saved to
+a checkpoint, ``<name>.rollups.json`` next to the TSV. The next run checks
+that the bytes before that offset are unchanged (the last 64 KiB of them
+are hashed) and then only folds in the rows appended since. A last row
+without a line break may still be being written: it is counted in the
+result when it has every field, but never saved, so the next run reads it
+again. A rewritten file, new groupings or ``full=True`` start over from
+the first row::
+
+    python -m analytics.rollups --by popup_version --by popup_category,quarter [--full]
+"""
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from analytics.dataset import DATASET, to_records
+
+DIMENSIONS = ("popup_name", "blog_post_url", "popup_version", "popup_category")
+BUCKETS = ("week", "quarter")
+TAIL_BYTES = 1 << 16
+CHECKPOINT_FORMAT = 2
+
+
+@dataclass
+class Rollup:
+    """Running sums for one grouping: ``{key: [views, registrations, rows]}``."""
+
+    grouping: tuple
+    sums: dict = field(default_factory=dict)
+
+    def add(self, keys, views, registrations):
+        """Folds in one chunk; ``keys`` has one tuple per row."""
+        index = {}
+        positions = np.fromiter((index.setdefault(key, len(index)) for key in keys), dtype=np.int64, count=len(keys))
+        view_sums = np.bincount(positions, weights=views, minlength=len(index))
+        registration_sums = np.bincount(positions, weights=registrations, minlength=len(index))
+        row_counts = np.bincount(positions, minlength=len(index))
+        for key, position in index.items():
+            total = self.sums.setdefault(key, [0, 0, 0])
+            total[0] += int(view_sums[position])
+            total[1] += int(registration_sums[position])
+            total[2] += int(row_counts[position])
+
+    def table(self):
+        """``(key, views, registrations, rows, conversion)`` rows, most views first."""
+        return [
+            (key, views, registrations, rows, registrations / views if views else 0.0)
+            for key, (views, registrations, rows) in sorted(self.sums.items(), key=lambda item: -item[1][0])
+        ]
+
+
+@dataclass
+class Aggregation:
+    rollups: dict
+    rows: int
+    new_rows: int
+    resumed: bool
+
+
+def aggregate(path=DATASET, groupings=(("popup_version",),), chunk_rows=10_000, checkpoint=None, full=False):
+    """Rollups of ``path`` for every grouping, folding only appended rows into a valid checkpoint."""
+    path = Path(path)
+    groupings = [tuple(grouping) for grouping in groupings]
+    for grouping in groupings:
+        unknown = [name for name in grouping if name not in DIMENSIONS + BUCKETS]
+        if unknown:
+            raise ValueError(f"Unknown dimension {unknown[0]!r}, expected one of {', '.join(DIMENSIONS + BUCKETS)}")
+    checkpoint = Path(checkpoint) if checkpoint else checkpoint_path(path)
+    state = None if full else _resume(path, checkpoint, groupings)
+    if state is None:
+        rollups = {grouping: Rollup(grouping) for grouping in groupings}
+        offset, rows, header, counted_tail, resumed = 0, 0, None, None, False
+    else:
+        rollups, offset, rows, header, counted_tail = state
+        resumed = True
+
+    new_rows = 0
+    with open(path, "rb") as source:
+        source.seek(offset)
+        rows_read = _Rows(source)
+        if header is None:
+            # None while the header itself is unfinished; the next run reads it again
+            header = next(iter(rows_read), None)
+        rows_read.width = len(header or ())
+        records = to_records(rows_read, header) if header else ()
+        while True:
+            chunk = _take(records, chunk_rows)
+            if not chunk:
+                break
+            _fold(rollups, chunk)
+            new_rows += len(chunk)
+        # The unfinished last row the previous run already counted is not new
+        seen = (counted_tail is not None and rows_read.first_end is not None
+                and _digest(_read(source, offset, rows_read.first_end)) == counted_tail)
+        tail_record = _complete_record(rows_read.tail, header) if header else None
+        tail_digest = _digest(_read(source, rows_read.offset, rows_read.read)) if tail_record else None
+
+    # Groupings the checkpoint had but this run did not ask for are kept up to date too
+    _save(checkpoint, path, rows_read.offset, rows + new_rows, header, rollups, tail_digest)
+    if tail_record:
+        _fold(rollups, [tail_record])
+        new_rows += 1
+    return Aggregation({grouping: rollups[grouping] for grouping in groupings}, rows + new_rows, new_rows - seen, resumed)
+
+
+def checkpoint_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".rollups.json")
+
+
+def bucket(start_date, size):
+    """The ``week`` or ``quarter`` of an ISO date string; ``""`` for rows without a date."""
+    if not start_date:
+        return ""
+    date = datetime.date.fromisoformat(start_date)
+    if size == "week":
+        return (date - datetime.timedelta(days=date.weekday())).isoformat()
+    return f"{date.year}-Q{(date.month - 1) // 3 + 1}"
+
+
+class _Rows:
+    """Rows of a TSV in a binary file; ``offset`` is the byte offset after the last complete one.
+
+    The last row is unfinished when its last line has no line break yet, or
+    when it has fewer than ``width`` fields because the file ends inside a
+    quoted line break. It is kept back in ``tail``.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        # Fields of a complete row, known once the header is
+        self.width = 0
+        self.offset = self.read = source.tell()
+        # Where the first row read ends, complete or not
+        self.first_end = None
+        self.tail = None
+        self._unterminated = False
+        self._reader = csv.reader(self._lines(), delimiter="\t")
+
+    def __iter__(self):
+        for row in self._reader:
+            if self.first_end is None:
+                self.first_end = self.read
+            if self._unterminated or (row and len(row) < self.width):
+                end = self.read
+                if next(self._reader, None) is not None:
+                    raise ValueError(f"Row ending at byte {end} has {len(row)} of {self.width} fields")
+                self.tail = row
+                return
+            self.offset = self.read
+            yield row
+
+    def _lines(self):
+        for line in self.source:
+            self.read += len(line)
+            self._unterminated = not line.endswith(b"\n")
+            yield line.decode("utf-8", errors="replace" if self._unterminated else "strict")
+
+
+def _complete_record(row, header):
+    """The record of an unfinished last row, or ``None`` while some of its fields are missing."""
+    if not row or len(row) < len(header):
+        return None
+    try:
+        return next(to_records([row], header), None)
+    except ValueError:
+        return None
+
+
+def _read(source, start, end):
+    source.seek(start)
+    return source.read(end - start).rstrip(b"\r\n")
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _take(records, count):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == count:
+            break
+    return chunk
+
+
+def _fold(rollups, chunk):
+    views = np.fromiter((record[2] for record in chunk), dtype=np.float64, count=len(chunk))
+    registrations = np.fromiter((record[3] for record in chunk), dtype=np.float64, count=len(chunk))
+    buckets = {size: [bucket(record[1], size) for record in chunk] for size in BUCKETS}
+    for grouping, rollup in rollups.items():
+        keys = [
+            tuple(buckets[name][row] if name in BUCKETS else chunk[row][0][name] for name in grouping)
+            for row in range(len(chunk))
+        ]
+        rollup.add(keys, views, registrations)
+
+
+def _tail_hash(source, offset):
+    source.seek(max(offset - TAIL_BYTES, 0))
+    return _digest(source.read(offset - max(offset - TAIL_BYTES, 0)))
+
+
+def _resume(path, checkpoint, groupings):
+    """The saved rollups, offset, row count and header, or ``None`` when the checkpoint cannot be used."""
+    if not checkpoint.exists():
+        return None
+    saved = json.loads(checkpoint.read_text())
+    if saved.get("format") != CHECKPOINT_FORMAT or path.stat().st_size < saved["offset"]:
+        return None
+    with open(path, "rb") as source:
+        if _tail_hash(source, saved["offset"]) != saved["tail_hash"]:
+            return None
+    rollups = {}
+    for entry in saved["rollups"]:
+        grouping = tuple(entry["grouping"])
+        rollups[grouping] = Rollup(grouping, {tuple(key): sums for key, *sums in entry["sums"]})
+    if any(grouping not in rollups for grouping in groupings):
+        return None
+    return rollups, saved["offset"], saved["rows"], saved["header"], saved["counted_tail"]
+
+
+def _save(checkpoint, path, offset, rows, header, rollups, counted_tail):
+    with open(path, "rb") as source:
+        tail_hash = _tail_hash(source, offset)
+    temporary = checkpoint.with_name(f"{checkpoint.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps({
+        "format": CHECKPOINT_FORMAT,
+        "offset": offset,
+        "tail_hash": tail_hash,
+        "rows": rows,
+        "header": header,
+        "counted_tail": counted_tail,
+        "rollups": [
+            {"grouping": list(grouping), "sums": [[list(key), *sums] for key, sums in rollup.sums.items()]}
+            for grouping, rollup in rollups.items()
+        ],
+    }))
+    os.replace(temporary, checkpoint)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analytics.rollups")
+    parser.add_argument("path", nargs="?", default=str(DATASET), help="TSV to aggregate (default: data/dataset.tsv).")
+    parser.add_argument(
+        "--by", action="append", default=None,
+        help=f"Comma-separated grouping, repeatable; dimensions: {', '.join(DIMENSIONS + BUCKETS)} (default: popup_version).",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=10_000, help="Rows read per chunk (default: 10000).")
+    parser.add_argument("--full", action="store_true", help="Ignore the checkpoint and read every row.")
+    parser.add_argument("--top", type=int, default=20, help="Groups shown per grouping, most views first (default: 20).")
+    args = parser.parse_args(argv)
+
+    groupings = [tuple(name.strip() for name in grouping.split(",")) for grouping in args.by or ["popup_version"]]
+    try:
+        result = aggregate(args.path, groupings, chunk_rows=args.chunk_rows, full=args.full)
+    except ValueError as error:
+        parser.error(str(error))
+    how = "resumed from the checkpoint" if result.resumed else "read from the start"
+    print(f"{result.rows} rows, {result.new_rows} new ({how})")
+    for grouping, rollup in result.rollups.items():
+        print(f"\n{' x '.join(grouping):<60} {'views':>9} {'regs':>7} {'rows':>6} {'conversion':>10}")
+        for key, views, registrations, rows, conversion in rollup.table()[:args.top]:
+            label = " | ".join(value or "-" for value in key)
+            print(f"{label[:60]:<60} {views:9d} {registrations:7d} {rows:6d} {conversion:10.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
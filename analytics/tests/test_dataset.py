@@ -0,0 +1,83 @@
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+from analytics import dataset
+from analytics.dataset import cache_path, load, parse
+
+HEADER = "\t".join([
+    "popup_name", "blog_post_url", "popup_version|start_date|popup_category", "popup_header",
+    "popup_description", "popup_image_url", "popup_title", "views", "registrations",
+])
+ROWS = [
+    'Bio Template\thttps://blog.bookly.com/bio/\t"[""A"",""2020-05-01"",""Perfecting your Craft""]"\t"\nFREE: Author Bio"\tWrite it in 5 minutes\thttps://img/bio.jpg\tBio Examples\t1554\t70',
+    'Bio Template\thttps://blog.bookly.com/bio/\t"[""B"",""2020-05-01"",""Perfecting your Craft""]"\t"\nFREE: Author Bio"\tWrite it in 5 minutes\thttps://img/bio.jpg\tBio Examples\t1600\t90',
+    'Query Letter\thttps://blog.bookly.com/query/\t"["""","""",""Publishing""]"\tQuery letters\tA template\thttps://img/q.jpg\tQuery Examples\t35\t0',
+]
+
+
+@pytest.fixture
+def tsv(tmp_path):
+    path = tmp_path / "dataset.tsv"
+    path.write_text("\n".join([HEADER, *ROWS]) + "\n", encoding="utf-8")
+    return path
+
+
+def test_rows_are_parsed_into_typed_columns(tsv):
+    data = parse(tsv)
+
+    assert len(data) == 3
+    assert data["popup_name"].tolist() == [0, 0, 1]
+    assert data.dictionaries["popup_version"] == ["A", "B", ""]
+    assert data.decode("popup_header").tolist() == ["FREE: Author Bio", "FREE: Author Bio", "Query letters"]
+    assert data["start_date"].dtype == np.dtype("datetime64[D]")
+    assert data["start_date"][0] == np.datetime64("2020-05-01")
+    assert np.isnat(data["start_date"][2])
+    assert data["views"].tolist() == [1554, 1600, 35]
+    assert data["registrations"].dtype == np.int64
+    assert data.code("popup_version", "B") == 1
+    assert data.code("popup_version", "C") == -1
+    assert list(data.rows())[2]["start_date"] is None
+    assert list(data.rows())[0]["start_date"] == datetime.date(2020, 5, 1)
+
+
+def test_cache_is_memory_mapped_next_to_the_tsv(tsv):
+    first = load(tsv)
+    assert cache_path(tsv).exists()
+    assert isinstance(first["views"], np.memmap)
+
+    parsed = parse(tsv)
+    for name in dataset.COLUMNS:
+        assert np.array_equal(first[name], parsed[name], equal_nan=name == "start_date")
+    assert first.dictionaries == parsed.dictionaries
+
+
+def test_current_cache_is_used_without_parsing(tsv, monkeypatch):
+    load(tsv)
+    monkeypatch.setattr(dataset, "parse", lambda path: pytest.fail("parsed again"))
+    assert load(tsv)["views"].tolist() == [1554, 1600, 35]
+
+    # A touched but unchanged file keeps its cache too
+    stat = tsv.stat()
+    os.utime(tsv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load(tsv)["views"].tolist() == [1554, 1600, 35]
+
+
+def test_cache_is_rebuilt_when_the_source_changes(tsv):
+    load(tsv)
+    with open(tsv, "a", encoding="utf-8") as source:
+        source.write(ROWS[0].replace("1554\t70", "10\t1") + "\n")
+
+    data = load(tsv)
+    assert len(data) == 4
+    assert data["views"].tolist()[-1] == 10
+    assert data.source_hash == dataset.file_hash(tsv)
+
+
+def test_empty_dataset(tmp_path):
+    path = tmp_path / "empty.tsv"
+    path.write_text(HEADER + "\n", encoding="utf-8")
+    assert len(load(path)) == 0
+    assert len(load(path)) == 0
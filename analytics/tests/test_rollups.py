@@ -0,0 +1,127 @@
+import pytest
+
+from analytics.rollups import aggregate, bucket, checkpoint_path
+from analytics.tests.test_dataset import HEADER, ROWS
+
+GROUPINGS = [("popup_version",), ("popup_category", "quarter"), ("popup_name", "week")]
+
+
+@pytest.fixture
+def tsv(tmp_path):
+    # Like data/dataset.tsv, without a line break after the last row
+    path = tmp_path / "dataset.tsv"
+    path.write_text("\n".join([HEADER, *ROWS]), encoding="utf-8")
+    return path
+
+
+def append(path, *rows):
+    with open(path, "a", encoding="utf-8") as source:
+        source.write("".join("\n" + row for row in rows))
+
+
+def sums(result):
+    return {grouping: rollup.sums for grouping, rollup in result.rollups.items()}
+
+
+def test_buckets():
+    assert bucket("2020-05-01", "week") == "2020-04-27"
+    assert bucket("2020-05-01", "quarter") == "2020-Q2"
+    assert bucket("2020-12-31", "quarter") == "2020-Q4"
+    assert bucket("", "week") == ""
+
+
+def test_rows_are_summed_per_group(tsv):
+    result = aggregate(tsv, GROUPINGS, chunk_rows=2)
+
+    assert result.rows == result.new_rows == 3
+    assert not result.resumed
+    assert result.rollups[("popup_version",)].sums == {("A",): [1554, 70, 1], ("B",): [1600, 90, 1], ("",): [35, 0, 1]}
+    assert result.rollups[("popup_category", "quarter")].sums == {
+        ("Perfecting your Craft", "2020-Q2"): [3154, 160, 2],
+        ("Publishing", ""): [35, 0, 1],
+    }
+    key, views, registrations, rows, conversion = result.rollups[("popup_version",)].table()[0]
+    assert key == ("B",)
+    assert conversion == pytest.approx(90 / 1600)
+
+
+def test_later_runs_fold_in_only_appended_rows(tsv):
+    aggregate(tsv, GROUPINGS)
+    append(tsv, ROWS[0].replace("1554\t70", "10\t1"), ROWS[2])
+
+    resumed = aggregate(tsv, GROUPINGS, chunk_rows=1)
+    assert resumed.resumed
+    assert resumed.new_rows == 2
+    assert resumed.rows == 5
+    assert sums(resumed) == sums(aggregate(tsv, GROUPINGS, full=True))
+    assert resumed.rollups[("popup_version",)].sums[("A",)] == [1564, 71, 2]
+
+    assert aggregate(tsv, GROUPINGS).new_rows == 0
+
+
+def test_rewritten_file_or_new_grouping_starts_over(tsv):
+    aggregate(tsv, GROUPINGS[:1])
+    assert not aggregate(tsv, GROUPINGS).resumed
+    assert aggregate(tsv, GROUPINGS[1:]).resumed
+
+    tsv.write_text("\n".join([HEADER, ROWS[1].replace("1600", "1700"), ROWS[1], ROWS[2]]), encoding="utf-8")
+    result = aggregate(tsv, GROUPINGS)
+    assert not result.resumed
+    assert result.rollups[("popup_version",)].sums[("B",)] == [3300, 180, 2]
+    assert checkpoint_path(tsv).exists()
+
+
+def test_unknown_dimension(tsv):
+    with pytest.raises(ValueError, match="'popup_colour'"):
+        aggregate(tsv, [("popup_colour",)])
+
+
+@pytest.mark.parametrize("cut, counted", [(20, 2), (-1, 3)], ids=["mid-row", "inside-registrations"])
+def test_a_row_caught_mid_write_is_read_again_once_complete(tmp_path, cut, counted):
+    path = tmp_path / "dataset.tsv"
+    last = ROWS[2].replace("\t35\t0", "\t35\t12")
+    complete = "\n".join([HEADER, *ROWS[:2], last])
+    path.write_text(complete[:len(complete) - len(last)] + last[:cut], encoding="utf-8")
+
+    # A row with all its fields counts in the result, but only complete lines are saved
+    assert aggregate(path, GROUPINGS).rows == counted
+    path.write_text(complete, encoding="utf-8")
+    resumed = aggregate(path, GROUPINGS)
+
+    assert resumed.resumed and resumed.new_rows == 1
+    assert resumed.rows == 3
+    assert sums(resumed) == sums(aggregate(path, GROUPINGS, full=True))
+
+
+def test_a_row_cut_inside_a_quoted_line_break_is_read_again(tmp_path):
+    path = tmp_path / "dataset.tsv"
+    complete = "\n".join([HEADER, *ROWS])
+    # ROWS[1] ends right after the line break that opens its popup_header
+    cut = complete.index(ROWS[1]) + ROWS[1].index('"\n') + 2
+    path.write_text(complete[:cut], encoding="utf-8")
+
+    assert aggregate(path, GROUPINGS).rows == 1
+    path.write_text(complete, encoding="utf-8")
+    resumed = aggregate(path, GROUPINGS)
+
+    assert resumed.resumed and resumed.new_rows == 2
+    assert resumed.rows == 3
+    assert sums(resumed) == sums(aggregate(path, GROUPINGS, full=True))
+
+
+def test_rows_missing_fields_before_the_end_are_an_error(tmp_path):
+    path = tmp_path / "dataset.tsv"
+    path.write_text("\n".join([HEADER, "Bio Template\thttps://blog.bookly.com/bio/", *ROWS]), encoding="utf-8")
+    with pytest.raises(ValueError, match="has 2 of 9 fields"):
+        aggregate(path, GROUPINGS)
+
+
+def test_an_unfinished_header_is_read_again(tmp_path):
+    path = tmp_path / "dataset.tsv"
+    path.write_text(HEADER[:10], encoding="utf-8")
+    assert aggregate(path, GROUPINGS).rows == 0
+
+    path.write_text("\n".join([HEADER, *ROWS]), encoding="utf-8")
+    result = aggregate(path, GROUPINGS)
+    assert result.resumed and result.rows == 3
+    assert sums(result) == sums(aggregate(path, GROUPINGS, full=True))
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from analytics.dataset import from_records
+from analytics.significance import analyze, benjamini_hochberg, main, two_proportion_test, wilson_interval
+
+
+def record(version, category, header, views, registrations):
+    values = {
+        "popup_name": "Popup", "blog_post_url": f"https://blog.bookly.com/{category}/", "popup_version": version,
+        "popup_category": category, "popup_header": header, "popup_description": "", "popup_image_url": "",
+        "popup_title": "",
+    }
+    return values, "2020-05-01", views, registrations
+
+
+@pytest.fixture
+def data():
+    # Version B converts twice as well as A; the header makes no difference
+    generator = np.random.default_rng(1)
+    records = []
+    for index in range(400):
+        version = "AB"[index % 2]
+        views = int(generator.integers(500, 1500))
+        rate = 0.04 if version == "B" else 0.02
+        records.append(record(version, f"category-{index % 4}", f"header-{index % 5}", views,
+                              int(generator.binomial(views, rate))))
+    return from_records(records)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(np.array([10.0, 0.0]), np.array([100.0, 50.0]))
+    assert low == pytest.approx([0.0552, 0.0], abs=1e-4)
+    assert high == pytest.approx([0.1744, 0.0714], abs=1e-4)
+
+
+def test_two_proportion_test():
+    z, p_value = two_proportion_test(np.array([20.0, 0.0]), np.array([1000.0, 10.0]),
+                                     np.array([40.0, 0.0]), np.array([1000.0, 10.0]))
+    assert z[0] == pytest.approx(2.6216, abs=1e-4)
+    assert p_value[0] == pytest.approx(0.00875, abs=1e-5)
+    assert (z[1], p_value[1]) == (0.0, 1.0)
+
+
+def test_benjamini_hochberg():
+    q = benjamini_hochberg(np.array([0.01, 0.04, 0.03, 0.5]))
+    assert q == pytest.approx([0.04, 0.04 * 4 / 3, 0.04 * 4 / 3, 0.5])
+
+
+def test_factors_are_ranked_by_the_variation_they_explain(data):
+    factors = analyze(data, factors=("popup_header", "popup_version", "popup_category"), resamples=400)
+
+    assert [factor.name for factor in factors][0] == "popup_version"
+    version = factors[0]
+    assert version.significant == 1
+    (pair,) = version.top_pairs()
+    rates = version.groups.rate
+    assert version.pairs.uplift[pair] == pytest.approx(rates[1] / rates[0] - 1)
+    assert version.pairs.uplift_low[pair] < version.pairs.uplift[pair] < version.pairs.uplift_high[pair]
+    assert 0.7 < version.pairs.uplift_low[pair] and version.pairs.uplift_high[pair] < 1.3
+
+    header = next(factor for factor in factors if factor.name == "popup_header")
+    assert len(header.pairs.left) == 10
+    assert header.explained < version.explained
+
+
+def test_bootstrap_does_not_depend_on_the_number_of_workers(data):
+    one = analyze(data, factors=("popup_category",), resamples=120, workers=1)[0]
+    four = analyze(data, factors=("popup_category",), resamples=120, workers=4)[0]
+    assert np.array_equal(one.pairs.uplift_low, four.pairs.uplift_low)
+    assert np.array_equal(one.pairs.uplift_high, four.pairs.uplift_high)
+
+
+def test_at_least_one_resample_is_needed(data):
+    assert len(analyze(data, factors=("popup_version",), resamples=1)[0].pairs.uplift_low) == 1
+    with pytest.raises(ValueError, match="at least one bootstrap resample"):
+        analyze(data, resamples=0)
+    with pytest.raises(SystemExit):
+        main(["--resamples", "0"])
@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.bench_flows import SORTS
+
+# The API alone, without the browser: the backend's filter, slice and sort
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_api_sort(benchmark, api_client, sort):
+    benchmark.run(f"api_list[{sort}]", lambda: api_client.list(offset=12, limit=12, sort=sort))
+
+
+def test_api_regex_search(benchmark, api_client):
+    benchmark.run("api_search", lambda: api_client.list(limit=100, search="^(The|A) .*(of|and)"))
+
+
+def test_api_page_through_all_results(benchmark, api_client):
+    benchmark.run("api_page_through_all_results", lambda: list(api_client.iter_books(page_size=12)))
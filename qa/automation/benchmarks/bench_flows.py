@@ -0,0 +1,45 @@
+import pytest
+
+from pages.pages import BookDetailsPage, BookshelfPage
+
+SORTS = ["id", "rating", "title", "author"]
+
+
+@pytest.fixture
+def shelf(page):
+    return BookshelfPage(page)
+
+
+def test_load_bookshelf(benchmark, shelf):
+    benchmark.run("load_bookshelf", shelf.goto)
+
+
+def test_regex_search(benchmark, shelf):
+    benchmark.run("regex_search", lambda: shelf.search("^(The|A) .*(of|and)"), setup=shelf.goto)
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_sort(benchmark, shelf, sort):
+    def setup():
+        shelf.goto()
+        if sort == "id":
+            # id is already selected after loading, which would not request anything
+            shelf.sort_by("title")
+
+    benchmark.run(f"sort_by[{sort}]", lambda: shelf.sort_by(sort), setup=setup)
+
+
+def test_page_through_all_results(benchmark, shelf):
+    def page_through():
+        while shelf.snapshot():
+            shelf.go_to_next_page()
+
+    benchmark.run("page_through_all_results", page_through, setup=shelf.goto)
+
+
+def test_open_details(benchmark, shelf, page):
+    def open_details():
+        shelf.click_book_by_index(0)
+        BookDetailsPage(page).snapshot()
+
+    benchmark.run("open_details", open_details, setup=shelf.goto)
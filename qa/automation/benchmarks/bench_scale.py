@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from benchmarks.bench_flows import SORTS
+from support.api_client import BooksApiClient
+from support.catalogue import collation_key, field_string
+from support.node_server import NodeServer
+from support.stub_backend import StubBooksApi
+from support.stub_server import StubServer
+from support.synthetic_catalogue import generate_books, write_fixture
+
+# Search, sort and pagination against generated catalogues of each --scale-sizes size
+
+SEED = 1
+SEARCH = "^The (Golden|Silent) "
+PAGES = 5
+
+
+def pytest_generate_tests(metafunc):
+    if "scale_client" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("scale_sizes").split(",")]
+        metafunc.parametrize("scale_client", sizes, indirect=True, scope="module", ids=lambda size: f"{size}-books")
+
+
+@pytest.fixture(scope="module")
+def scale_client(request, pytestconfig, tmp_path_factory):
+    size = request.param
+    if pytestconfig.getoption("backend") == "live":
+        fixture = write_fixture(tmp_path_factory.mktemp("catalogue") / f"books-{size}.js", size, SEED)
+        server = NodeServer(fixture)
+    else:
+        server = StubServer(StubBooksApi([{"id": index, **book} for index, book in enumerate(generate_books(size, SEED))]))
+    with server, BooksApiClient(server.base_url) as client:
+        yield size, client
+
+
+def test_search(benchmark, scale_client):
+    size, client = scale_client
+    benchmark.run(f"search@{size}", lambda: client.list(limit=100, search=SEARCH))
+
+    books = client.list(limit=100, search=SEARCH)
+    assert books, f"Search '{SEARCH}' should find books among {size}"
+    assert all(re.search(SEARCH, book["title"], re.IGNORECASE) for book in books)
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_sort(benchmark, scale_client, sort):
+    size, client = scale_client
+    offset = size // 2
+    benchmark.run(f"sort_by[{sort}]@{size}", lambda: client.list(offset=offset, limit=12, sort=sort))
+
+    books = client.list(offset=offset, limit=12, sort=sort)
+    assert len(books) == 12
+    keys = [collation_key(field_string(book, sort)) for book in books]
+    assert keys == sorted(keys), f"The page should be sorted by {sort}"
+
+
+def test_pagination(benchmark, scale_client):
+    size, client = scale_client
+    offset = size // 2
+
+    def page_through():
+        return [client.list(offset=offset + page * 12, limit=12) for page in range(PAGES)]
+
+    benchmark.run(f"pagination@{size}", page_through)
+
+    ids = [book["id"] for books in page_through() for book in books]
+    assert ids == list(range(offset, offset + PAGES * 12)), "Pages should continue each other without gaps or overlaps"
@@ -0,0 +1,8 @@
+def test_api_search_matches_the_oracle(regex_fuzz, api_client):
+    report = regex_fuzz.run_api(api_client)
+    assert not report.failures, report.describe()
+
+
+def test_ui_search_matches_the_oracle(regex_fuzz, page):
+    report = regex_fuzz.run_ui(page)
+    assert not report.failures, report.describe()
@@ -0,0 +1,3 @@
+def test_bookshelf_session_does_not_leak(soak):
+    report = soak.run()
+    assert not report.leaks, report.describe()
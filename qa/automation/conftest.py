@@ -1,15 +1,85 @@
 import pytest
-from playwright.sync_api import sync_playwright
+
+from support.browser_server import browser_endpoint
+from support.context_pool import ContextPool
+from support.perf_metrics import INIT_SCRIPT
+from support.reusable_page import ReusablePage
+
+pytest_plugins = [
+    "plugins.parallel",
+    "plugins.no_sleep",
+    "plugins.backend",
+    "plugins.cassettes",
+    "plugins.async_browser",
+    "plugins.device_matrix",
+    "plugins.browser_server",
+    "plugins.timing",
+    "plugins.perf_metrics",
+    "plugins.benchmark",
+    "plugins.network_profiles",
+    "plugins.soak",
+    "plugins.regex_fuzz",
+    "plugins.visual",
+    "plugins.test_impact",
+    "plugins.flight_recorder",
+]
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "reuse_page: share one page between the tests of the module, see support.reusable_page")
 
 @pytest.fixture(scope="session")
-def browser():
+def browser(pytestconfig):
+    # Imported here so collecting or deselecting tests never starts Playwright
+    from playwright.sync_api import sync_playwright
+
+    endpoint = browser_endpoint(pytestconfig)
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+        browser = p.chromium.connect(endpoint) if endpoint else p.chromium.launch(headless=True)
         yield browser
         browser.close()
 
+@pytest.fixture(scope="session")
+def context_pool(browser, pytestconfig):
+    pool = ContextPool(browser, size=pytestconfig.getoption("context_pool_size"))
+    yield pool
+    pool.close()
+
+@pytest.fixture(scope="module")
+def reusable_page(context_pool):
+    reusable = ReusablePage(context_pool)
+    yield reusable
+    reusable.close()
+
 @pytest.fixture(scope="function")
-def page(browser):
-    page = browser.new_page()
+def page(request, context_pool, books_api, cassette, timeline, perf_metrics, network_profile, impact, flight_recorder):
+    def prepare(page):
+        if impact:
+            impact.watch(page)
+        if perf_metrics:
+            page.add_init_script(INIT_SCRIPT)
+        if books_api:
+            books_api.install(page)
+        if cassette:
+            cassette.install(page, include_api=books_api is None)
+
+    if request.node.get_closest_marker("reuse_page"):
+        reusable = request.getfixturevalue("reusable_page")
+        page = reusable.checkout(prepare, network_profile)
+        if timeline:
+            timeline.watch(page)
+        if flight_recorder:
+            flight_recorder.watch(page)
+        yield page
+        if timeline:
+            timeline.unwatch(page)
+        return
+
+    page = context_pool.acquire()
+    if timeline:
+        timeline.watch(page)
+    if flight_recorder:
+        flight_recorder.watch(page)
+    prepare(page)
+    network_profile.apply(page)
     yield page
-    page.close()
+    context_pool.release(page)
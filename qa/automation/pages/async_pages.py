@@ -0,0 +1,146 @@
+from typing import TYPE_CHECKING
+
+from pages.pages import (
+    DETAILS_SNAPSHOT,
+    GRID_RENDERED,
+    GRID_SNAPSHOT,
+    BookRecord,
+    BookshelfPage,
+    _is_book_response,
+    _is_books_response,
+    _query,
+)
+from support import perf_metrics
+from support.perf_metrics import DETAILS_RENDERED, LOAD_METRICS
+from support.timing import timed
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+# Async counterparts of the page objects in pages.py, for tests that drive many pages at once
+
+class AsyncBookshelfPage:
+    URL = BookshelfPage.URL
+    PAGE_SIZE = BookshelfPage.PAGE_SIZE
+    BOOK_LINKS = BookshelfPage.BOOK_LINKS
+
+    def __init__(self, page: "Page"):
+        self.page = page
+        self._search = ''
+        self._books = {}
+        self.query = {}
+
+    @timed("navigation")
+    async def goto(self):
+        self._search = ''
+        await self._wait_for_books("bookshelf.load", lambda: self.page.goto(self.URL))
+        metrics = perf_metrics.current()
+        if metrics:
+            metrics.record("bookshelf.load", await self.page.evaluate(LOAD_METRICS))
+
+    async def snapshot(self):
+        links = await self.page.locator(self.BOOK_LINKS).evaluate_all(GRID_SNAPSHOT)
+        return [
+            BookRecord.from_api(self._books.get(link['id'], {'id': link['id']}), cover=link['cover'])
+            for link in links
+        ]
+
+    async def get_book_titles(self):
+        return [book.title.strip() for book in await self.snapshot() if book.title and book.title.strip()]
+
+    @timed("network")
+    async def click_book_by_index(self, index: int):
+        books = await self.snapshot()
+        if len(books) > index:
+            book_id = books[index].id
+            async with self.page.expect_response(lambda response: _is_book_response(response, book_id)):
+                await self.page.locator(self.BOOK_LINKS).nth(index).click()
+            metrics = perf_metrics.current()
+            if metrics:
+                rendered = await self.page.wait_for_function(DETAILS_RENDERED)
+                metrics.record_render("details.open", await rendered.json_value())
+                await rendered.dispose()
+
+    @timed("network")
+    async def search(self, query: str):
+        async def action():
+            await self.page.fill('input[is="regexp-input"]', query)
+
+        if query == self._search or not await self._is_valid_regexp(query):
+            await action()
+            return
+        self._search = query
+        await self._wait_for_books("bookshelf.search", action, search=query)
+
+    async def is_invalid_feedback_visible(self):
+        return await self.page.is_visible('.invalid-feedback')
+
+    @timed("network")
+    async def sort_by(self, value: str):
+        if await self.page.input_value('select.form-select') == value:
+            await self.page.select_option('select.form-select', value)
+            return
+        await self._wait_for_books("bookshelf.sort_by", lambda: self.page.select_option('select.form-select', value), sort=value)
+
+    @timed("network")
+    async def go_to_next_page(self):
+        offset = (await self._page_number() + 1) * self.PAGE_SIZE
+        await self._wait_for_books("bookshelf.go_to_next_page", lambda: self.page.click('button:has(svg.bi-chevron-right)'), offset=offset)
+
+    @timed("network")
+    async def go_to_prev_page(self):
+        offset = (await self._page_number() - 1) * self.PAGE_SIZE
+        await self._wait_for_books("bookshelf.go_to_prev_page", lambda: self.page.click('button:has(svg.bi-chevron-left)'), offset=offset)
+
+    @timed("render")
+    async def wait_for_render(self, books):
+        ids = [str(book['id']) for book in books]
+        rendered = await self.page.wait_for_function(GRID_RENDERED, arg=[self.BOOK_LINKS, ids])
+        self._books.update((str(book['id']), book) for book in books)
+        return rendered
+
+    async def _wait_for_books(self, flow, action, **params):
+        async with self.page.expect_response(lambda response: _is_books_response(response, params)) as response_info:
+            await action()
+        response = await response_info.value
+        self.query = _query(response.url)
+        rendered = await self.wait_for_render(await response.json())
+        metrics = perf_metrics.current()
+        if metrics:
+            metrics.record_render(flow, await rendered.json_value())
+        await rendered.dispose()
+
+    async def _page_number(self):
+        return int((await self.page.text_content('.pager span')).split()[-1])
+
+    async def _is_valid_regexp(self, query: str):
+        return await self.page.evaluate(
+            "query => { try { new RegExp(query); return true; } catch { return false; } }", query
+        )
+
+class AsyncBookDetailsPage:
+    def __init__(self, page: "Page"):
+        self.page = page
+
+    @timed("navigation")
+    async def goto(self, book_id):
+        """Opens the details view of a book directly and waits for its data."""
+        async with self.page.expect_response(lambda response: _is_book_response(response, book_id)):
+            await self.page.goto(f"{BookshelfPage.URL}books/{book_id}")
+        metrics = perf_metrics.current()
+        if metrics:
+            metrics.record("details.load", await self.page.evaluate(LOAD_METRICS))
+
+    @timed("render")
+    async def snapshot(self):
+        await self.page.wait_for_selector('h1[data-v-2dd5deba]')
+        return BookRecord(**await self.page.evaluate(DETAILS_SNAPSHOT))
+
+    async def get_title(self):
+        return await self.page.text_content('h1[data-v-2dd5deba]')
+
+    async def get_author(self):
+        return await self.page.text_content('h2 em')
+
+    async def get_rating(self):
+        return await self.page.text_content('div:has-text("User rating")')
@@ -1,54 +1,211 @@
-from playwright.sync_api import Page
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import parse_qs, urlparse
+
+from support import perf_metrics
+from support.perf_metrics import DETAILS_RENDERED, LOAD_METRICS, RENDERED_AT
+from support.timing import timed
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+API_URL = "http://localhost:3000/api/books"
+
+# Reads every book link of the grid in a single call
+GRID_SNAPSHOT = """links => links.map(link => ({
+    id: link.getAttribute('href').split('/').pop(),
+    cover: (link.style.backgroundImage.match(/url\\("?(.*?)"?\\)/) || [])[1] || null,
+}))"""
+
+# Resolves once the grid shows exactly the given book ids, in order
+GRID_RENDERED = """([selector, ids]) => {
+    const links = [...document.querySelectorAll(selector)];
+    return links.length === ids.length
+        && links.every((link, i) => link.getAttribute('href').endsWith(`/books/${ids[i]}`))
+        && """ + RENDERED_AT + """;
+}"""
+
+# Remounts the bookshelf from scratch through the router, without reloading the app
+SOFT_RESET = """async () => {
+    const app = document.querySelector('#app').__vue_app__;
+    const {$router: router, $pinia: pinia} = app.config.globalProperties;
+    pinia._s.forEach(store => { try { store.$reset(); } catch {} });
+    localStorage.clear();
+    sessionStorage.clear();
+    // A path no route matches unmounts the view, so going back mounts a new one
+    await router.replace('/__reset__');
+    await router.replace('/');
+    window.scrollTo(0, 0);
+}"""
+
+# Reads the whole details view in a single call
+DETAILS_SNAPSHOT = """() => {
+    const title = document.querySelector('h1[data-v-2dd5deba]');
+    const author = document.querySelector('h2 em');
+    const rating = [...document.querySelectorAll('div')].find(div => div.firstChild?.textContent?.includes('User rating'));
+    const cover = document.querySelector('.book-cover');
+    return {
+        id: location.pathname.split('/').pop(),
+        title: title && title.textContent.trim(),
+        author: author && author.textContent.trim(),
+        rating: rating && rating.textContent.replace('User rating:', '').replace('/ 5', '').trim(),
+        cover: cover && ((cover.style.backgroundImage.match(/url\\("?(.*?)"?\\)/) || [])[1] || null),
+    };
+}"""
+
+@dataclass(frozen=True)
+class BookRecord:
+    id: str
+    title: Optional[str] = None
+    author: Optional[str] = None
+    rating: Optional[str] = None
+    cover: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, book, **overrides):
+        rating = book.get('rating')
+        fields = dict(
+            id=str(book['id']),
+            title=book.get('title'),
+            author=book.get('author'),
+            rating=None if rating is None else str(rating),
+            cover=book.get('cover'),
+        )
+        fields.update(overrides)
+        return cls(**fields)
 
 class BookshelfPage:
     URL = "http://localhost:5173/"
+    PAGE_SIZE = 12
+    BOOK_LINKS = 'a[data-v-78b5a187]'
+    # Pages shared between tests, see support.reusable_page
+    SOFT_RESET_PAGES = weakref.WeakSet()
 
-    def __init__(self, page: Page):
+    def __init__(self, page: "Page"):
         self.page = page
+        self._search = ''
+        self._books = {}
+        self.query = {}
 
+    @timed("navigation")
     def goto(self):
-        self.page.goto(self.URL)
+        self._search = ''
+        if self.page in self.SOFT_RESET_PAGES and self.page.url.startswith(self.URL):
+            self._wait_for_books("bookshelf.reset", lambda: self.page.evaluate(SOFT_RESET))
+            return
+        self._wait_for_books("bookshelf.load", lambda: self.page.goto(self.URL))
+        metrics = perf_metrics.current()
+        if metrics:
+            metrics.record("bookshelf.load", self.page.evaluate(LOAD_METRICS))
 
     def get_book_elements(self):
-        # Books are clickable links with Vue data attributes
-        return self.page.query_selector_all('a[data-v-78b5a187]')
+        # Books are clickable links with Vue data attributes; the caller owns the handles and should dispose them
+        return self.page.query_selector_all(self.BOOK_LINKS)
+
+    def snapshot(self):
+        """Returns a BookRecord for every book in the grid, in display order.
+
+        The grid only shows covers, so title, author and rating come from the
+        /api/books response the grid was rendered from.
+        """
+        links = self.page.locator(self.BOOK_LINKS).evaluate_all(GRID_SNAPSHOT)
+        return [
+            BookRecord.from_api(self._books.get(link['id'], {'id': link['id']}), cover=link['cover'])
+            for link in links
+        ]
 
     def get_book_titles(self):
-        # Extract titles from the book links (if available)
-        books = self.get_book_elements()
-        titles = []
-        for book in books:
-            # Try to get title from various attributes or text content
-            title = book.get_attribute('title') or book.get_attribute('alt') or book.text_content()
-            if title and title.strip():
-                titles.append(title.strip())
-        return titles
+        return [book.title.strip() for book in self.snapshot() if book.title and book.title.strip()]
 
+    @timed("network")
     def click_book_by_index(self, index: int):
-        books = self.get_book_elements()
-        if books and len(books) > index:
-            books[index].click()
+        books = self.snapshot()
+        if len(books) > index:
+            book_id = books[index].id
+            with self.page.expect_response(lambda response: _is_book_response(response, book_id)):
+                self.page.locator(self.BOOK_LINKS).nth(index).click()
+            metrics = perf_metrics.current()
+            if metrics:
+                rendered = self.page.wait_for_function(DETAILS_RENDERED)
+                metrics.record_render("details.open", rendered.json_value())
+                rendered.dispose()
 
+    @timed("network")
     def search(self, query: str):
-        self.page.fill('input[is="regexp-input"]', query)
-        self.page.keyboard.press('Enter')
+        def action():
+            # v-model searches on the 'input' event of fill(); pressing Enter would only move the input time
+            self.page.fill('input[is="regexp-input"]', query)
+
+        # The app only requests books for a valid RegExp that differs from the current search
+        if query == self._search or not self._is_valid_regexp(query):
+            action()
+            return
+        self._search = query
+        self._wait_for_books("bookshelf.search", action, search=query)
 
     def is_invalid_feedback_visible(self):
         return self.page.is_visible('.invalid-feedback')
 
+    @timed("network")
     def sort_by(self, value: str):
-        self.page.select_option('select.form-select', value)
+        if self.page.input_value('select.form-select') == value:
+            self.page.select_option('select.form-select', value)
+            return
+        self._wait_for_books("bookshelf.sort_by", lambda: self.page.select_option('select.form-select', value), sort=value)
 
+    @timed("network")
     def go_to_next_page(self):
-        self.page.click('button:has(svg.bi-chevron-right)')
+        offset = (self._page_number() + 1) * self.PAGE_SIZE
+        self._wait_for_books("bookshelf.go_to_next_page", lambda: self.page.click('button:has(svg.bi-chevron-right)'), offset=offset)
 
+    @timed("network")
     def go_to_prev_page(self):
-        self.page.click('button:has(svg.bi-chevron-left)')
+        offset = (self._page_number() - 1) * self.PAGE_SIZE
+        self._wait_for_books("bookshelf.go_to_prev_page", lambda: self.page.click('button:has(svg.bi-chevron-left)'), offset=offset)
+
+    @timed("render")
+    def wait_for_render(self, books):
+        """Waits until the grid shows exactly the given books, in order.
+
+        Returns a handle to when it was rendered and when the last user input arrived.
+        """
+        ids = [str(book['id']) for book in books]
+        rendered = self.page.wait_for_function(GRID_RENDERED, arg=[self.BOOK_LINKS, ids])
+        self._books.update((str(book['id']), book) for book in books)
+        return rendered
+
+    def _wait_for_books(self, flow, action, **params):
+        # Returns once the /api/books response for the given query has arrived and been rendered
+        with self.page.expect_response(lambda response: _is_books_response(response, params)) as response_info:
+            action()
+        response = response_info.value
+        self.query = _query(response.url)
+        rendered = self.wait_for_render(response.json())
+        metrics = perf_metrics.current()
+        if metrics:
+            metrics.record_render(flow, rendered.json_value())
+        # Every handle stays alive in the driver and the page until disposed
+        rendered.dispose()
+
+    def _page_number(self):
+        return int(self.page.text_content('.pager span').split()[-1])
+
+    def _is_valid_regexp(self, query: str):
+        return self.page.evaluate(
+            "query => { try { new RegExp(query); return true; } catch { return false; } }", query
+        )
 
 class BookDetailsPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: "Page"):
         self.page = page
 
+    @timed("render")
+    def snapshot(self):
+        """Returns the displayed book as a BookRecord, read in a single call."""
+        self.page.wait_for_selector('h1[data-v-2dd5deba]')
+        return BookRecord(**self.page.evaluate(DETAILS_SNAPSHOT))
+
     def get_title(self):
         # Title is in h1 element with Vue data attribute
         return self.page.text_content('h1[data-v-2dd5deba]')
@@ -57,4 +214,17 @@ class BookDetailsPage:
         return self.page.text_content('h2 em')
 
     def get_rating(self):
-        return self.page.text_content('div:has-text("User rating")') 
\ No newline at end of file
+        return self.page.text_content('div:has-text("User rating")')
+
+def _is_books_response(response, params):
+    url = urlparse(response.url)
+    if f"{url.scheme}://{url.netloc}{url.path}".rstrip('/') != API_URL or response.request.method != 'GET':
+        return False
+    query = _query(response.url)
+    return all(query.get(key) == str(value) for key, value in params.items())
+
+def _query(url):
+    return {key: values[-1] for key, values in parse_qs(urlparse(url).query, keep_blank_values=True).items()}
+
+def _is_book_response(response, book_id):
+    return response.url.rstrip('/') == f"{API_URL}/{book_id}"
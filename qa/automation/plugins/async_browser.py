@@ -0,0 +1,64 @@
+"""Asyncio fixtures for tests that drive many pages concurrently.
+
+Tests using them are ``async def`` and marked
+``pytest.mark.asyncio(loop_scope="session")`` so they share the loop of
+the session-wide ``async_browser``.
+"""
+import pytest_asyncio
+
+from support.browser_server import browser_endpoint
+from support.perf_metrics import INIT_SCRIPT
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_playwright():
+    from playwright.async_api import async_playwright as start_playwright
+
+    async with start_playwright() as p:
+        yield p
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_browser(pytestconfig, async_playwright):
+    endpoint = browser_endpoint(pytestconfig)
+    if endpoint:
+        browser = await async_playwright.chromium.connect(endpoint)
+    else:
+        browser = await async_playwright.chromium.launch(headless=True)
+    yield browser
+    await browser.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_context_factory(async_browser, books_api, cassette, timeline, perf_metrics, network_profile,
+                                impact, flight_recorder):
+    """Opens fresh browser contexts with the given options; all of them are closed after the test."""
+    contexts = []
+
+    async def new_context(**options):
+        context = await async_browser.new_context(**options)
+        contexts.append(context)
+        if timeline:
+            timeline.watch(context)
+        if impact:
+            await impact.watch_async(context)
+        if flight_recorder:
+            flight_recorder.watch_context(context)
+        if perf_metrics:
+            await context.add_init_script(INIT_SCRIPT)
+        if books_api:
+            await books_api.install_async(context)
+        if cassette:
+            await cassette.install_async(context, include_api=books_api is None)
+        await network_profile.apply_async(context)
+        return context
+
+    yield new_context
+    for context in contexts:
+        await context.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_context(async_context_factory):
+    """A fresh browser context; open as many pages in it as the test needs."""
+    return await async_context_factory()
@@ -0,0 +1,47 @@
+"""Chooses which books API the browser talks to.
+
+``--backend=stub`` (the default) answers ``http://localhost:3000/api/books*``
+from memory, so only the frontend has to be running. ``--backend=live`` lets
+requests through to the Node server for integration runs. ``api_client``
+follows the same switch, serving the stub over a local HTTP port.
+"""
+import pytest
+
+from support.api_client import BooksApiClient
+from support.stub_backend import StubBooksApi
+from support.stub_server import StubServer
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("backend", "books API backend")
+    group.addoption(
+        "--backend",
+        choices=("stub", "live"),
+        default="stub",
+        help="Serve /api/books from an in-memory stub or the real Node server (default: stub).",
+    )
+    group.addoption(
+        "--stub-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the stub backend waits before answering (default: 0).",
+    )
+
+
+@pytest.fixture(scope="session")
+def books_api(pytestconfig):
+    """The in-memory books API, or ``None`` when tests run against the live server."""
+    if pytestconfig.getoption("backend") == "live":
+        return None
+    return StubBooksApi(latency=pytestconfig.getoption("stub_latency"))
+
+
+@pytest.fixture(scope="session")
+def api_client(books_api):
+    """A keep-alive HTTP client for the books API, for tests that do not need a browser."""
+    if books_api is None:
+        with BooksApiClient(pool_size=16) as client:
+            yield client
+        return
+    with StubServer(books_api) as server, BooksApiClient(server.base_url, pool_size=16) as client:
+        yield client
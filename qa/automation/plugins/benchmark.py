@@ -0,0 +1,101 @@
+"""Benchmark mode: ``--benchmark`` collects the ``bench_*.py`` flows in ``benchmarks/``.
+
+Each flow is warmed up and then timed for ``--benchmark-rounds`` rounds
+through the ``benchmark`` fixture. The terminal summary lists min, median
+and p95 per flow, and how the median grows with the catalogue size for
+flows named ``flow@size``. ``--benchmark-save`` stores the results as the
+baseline of the current git revision, for ``python -m support.benchmark compare``.
+"""
+import pytest
+
+from support.benchmark import Benchmark, growth, save
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "user-flow benchmarks")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Also collect the benchmarks in bench_*.py files.",
+    )
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=20,
+        help="Timed rounds per flow (default: 20).",
+    )
+    group.addoption(
+        "--benchmark-warmup",
+        type=int,
+        default=3,
+        help="Untimed warm-up rounds per flow (default: 3).",
+    )
+    group.addoption(
+        "--scale-sizes",
+        default="10000,100000,1000000",
+        help="Catalogue sizes of the scale benchmarks, comma separated (default: 10000,100000,1000000).",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        default=False,
+        help="Store the results as the baseline of the current git revision.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("benchmark"):
+        config.addinivalue_line("python_files", "bench_*.py")
+        config.pluginmanager.register(BenchmarkPlugin(config), "e2e-benchmark")
+
+
+@pytest.fixture
+def benchmark(request, pytestconfig):
+    bench = Benchmark(
+        rounds=pytestconfig.getoption("benchmark_rounds"),
+        warmup=pytestconfig.getoption("benchmark_warmup"),
+    )
+    request.node.benchmark = bench
+    return bench
+
+
+class BenchmarkPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.results = {}
+        self.saved = None
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        bench = getattr(item, "benchmark", None)
+        if call.when == "call" and bench:
+            outcome.get_result().benchmarks = bench.results
+
+    def pytest_runtest_logreport(self, report):
+        results = getattr(report, "benchmarks", None)
+        if results and report.when == "call" and report.passed:
+            self.results.update(results)
+
+    def pytest_sessionfinish(self, session):
+        if not self.is_worker and self.results and self.config.getoption("benchmark_save"):
+            self.saved = save(self.results)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.results:
+            return
+        terminalreporter.section("benchmarks (ms)")
+        terminalreporter.write_line(f"{'flow':<40} {'min':>9} {'median':>9} {'p95':>9} {'rounds':>7}")
+        for name, stats in sorted(self.results.items()):
+            terminalreporter.write_line(
+                f"{name:<40} {stats['min'] * 1000:9.1f} {stats['median'] * 1000:9.1f} "
+                f"{stats['p95'] * 1000:9.1f} {stats['rounds']:7d}"
+            )
+        for flow, sizes in growth(self.results).items():
+            terminalreporter.write_line(
+                f"{flow:<40} " + "  ".join(f"{size}: {median * 1000:.1f} ms (x{ratio:.1f})" for size, median, ratio in sizes)
+            )
+        if self.saved:
+            terminalreporter.write_line(f"baseline saved to {self.saved}")
@@ -0,0 +1,37 @@
+"""Lets every worker use one shared browser instead of launching its own.
+
+``--shared-browser`` starts a browser server once, after collection, and
+hands its websocket endpoint to the worker processes of ``--workers``.
+``--browser-endpoint`` connects to a server that is already running, e.g.
+one started per CI machine with ``python -m playwright launch-server``.
+"""
+import os
+
+from support.browser_server import ENDPOINT_ENV, BrowserServer, browser_endpoint
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("browser server", "shared browser server")
+    group.addoption(
+        "--shared-browser",
+        action="store_true",
+        default=False,
+        help="Launch one browser server and connect all workers to it.",
+    )
+    group.addoption(
+        "--browser-endpoint",
+        default=None,
+        help="Websocket endpoint of a running Playwright browser server to connect to.",
+    )
+
+
+def pytest_collection_finish(session):
+    config = session.config
+    if not config.getoption("shared_browser") or browser_endpoint(config) or config.option.collectonly:
+        return
+    if not session.items:
+        return
+    server = BrowserServer().start()
+    config.add_cleanup(server.stop)
+    os.environ[ENDPOINT_ENV] = server.ws_endpoint
+    config.add_cleanup(lambda: os.environ.pop(ENDPOINT_ENV, None))
@@ -0,0 +1,56 @@
+"""Record/replay of ``/api/books`` responses and cover images, one cassette per test module.
+
+``--cassettes=record`` records every module afresh, ``replay`` serves
+everything from the cassettes (requests missing from them fail as if the
+runner were offline) and ``auto`` replays fresh cassettes while re-recording
+missing ones and those older than ``--cassette-max-age`` hours. API responses
+are only recorded with ``--backend live``; the stub backend is already
+hermetic, so with it only cover images go through the cassettes.
+"""
+from pathlib import Path
+
+import pytest
+
+from support.cassettes import Cassette
+
+CASSETTES_DIR = Path(__file__).resolve().parents[1] / "cassettes"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("cassettes", "network record/replay")
+    group.addoption(
+        "--cassettes",
+        choices=("off", "record", "replay", "auto"),
+        default="off",
+        help="Record or replay network cassettes per test module (default: off).",
+    )
+    group.addoption(
+        "--cassette-max-age",
+        type=float,
+        default=24 * 7,
+        help="Hours after which --cassettes=auto records a module's cassette again (default: 168).",
+    )
+
+
+def cassette_path(module_path):
+    relative = Path(module_path).resolve().relative_to(CASSETTES_DIR.parent)
+    return CASSETTES_DIR / relative.with_suffix(".json.gz")
+
+
+@pytest.fixture(scope="module")
+def cassette(request, pytestconfig):
+    """The cassette of the current test module, or ``None`` when cassettes are off."""
+    mode = pytestconfig.getoption("cassettes")
+    if mode == "off":
+        yield None
+        return
+    path = cassette_path(request.path)
+    if mode == "auto":
+        age = Cassette.age(path)
+        fresh = age is not None and age < pytestconfig.getoption("cassette_max_age") * 3600
+        mode = "replay" if fresh else "record"
+    if mode == "replay" and not path.exists():
+        pytest.fail(f"No cassette at {path}, record one with --cassettes=record", pytrace=False)
+    cassette = Cassette(path, mode)
+    yield cassette
+    cassette.save()
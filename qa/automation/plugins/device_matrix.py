@@ -0,0 +1,99 @@
+"""Device matrix: one test across many devices on the shared browser.
+
+``@pytest.mark.device_matrix("iPhone SE", "Pixel 7", "1366x768")`` gives an
+async test a ``device_matrix`` whose ``run(scenario)`` runs the scenario on
+every listed device concurrently, each in its own context; without names
+the marker uses ``support.device_matrix.DEFAULT_DEVICES``, and ``--devices``
+overrides the list for every test. Screenshots of every device go to
+``--device-screenshots``; the terminal summary lists each device's outcome
+and ``--device-report`` writes all of them to one JSON file.
+"""
+import json
+import re
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from support.device_matrix import DEFAULT_DEVICES, DeviceMatrix, descriptor
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("device matrix", "tests across devices")
+    group.addoption(
+        "--devices",
+        default=None,
+        help="Devices of every device_matrix test, comma separated, e.g. 'iPhone SE,Pixel 7,1366x768'.",
+    )
+    group.addoption(
+        "--device-screenshots",
+        default="device-screenshots",
+        help="Directory for the screenshots of every device (default: device-screenshots).",
+    )
+    group.addoption(
+        "--device-report",
+        default=None,
+        help="Write the results of every device to this JSON file.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "device_matrix(*devices): run the test's scenario on these devices concurrently (default: a phone-to-desktop set)",
+    )
+    config.pluginmanager.register(DeviceMatrixPlugin(config), "e2e-device-matrix")
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def device_matrix(request, pytestconfig, async_playwright, async_context_factory):
+    marker = request.node.get_closest_marker("device_matrix")
+    names = pytestconfig.getoption("devices")
+    names = names.split(",") if names else (marker and marker.args) or DEFAULT_DEVICES
+    try:
+        descriptors = {name.strip(): descriptor(async_playwright.devices, name.strip()) for name in names}
+    except KeyError as error:
+        pytest.fail(f"Unknown device {error}, expected a Playwright device name or WIDTHxHEIGHT")
+    directory = Path(pytestconfig.getoption("device_screenshots")) / re.sub(r"[^A-Za-z0-9_.-]+", "-", request.node.nodeid)
+    matrix = DeviceMatrix(async_context_factory, descriptors, directory)
+    request.node.device_matrix = matrix
+    return matrix
+
+
+class DeviceMatrixPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.results = {}
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        matrix = getattr(item, "device_matrix", None)
+        if call.when == "call" and matrix and matrix.results:
+            outcome.get_result().device_matrix = matrix.to_dict()
+
+    def pytest_runtest_logreport(self, report):
+        results = getattr(report, "device_matrix", None)
+        if results and report.when == "call":
+            self.results[report.nodeid] = results
+
+    def pytest_sessionfinish(self, session):
+        path = self.config.getoption("device_report")
+        if not self.is_worker and path and self.results:
+            Path(path).write_text(json.dumps(self.results, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.results:
+            return
+        terminalreporter.section("device matrix")
+        for nodeid, results in self.results.items():
+            failed = sum(not result["passed"] for result in results)
+            terminalreporter.write_line(f"{nodeid} ({len(results) - failed}/{len(results)} devices passed)")
+            for result in results:
+                viewport = result["viewport"] or {}
+                size = f"{viewport.get('width')}x{viewport.get('height')}" if viewport else "-"
+                outcome = "passed" if result["passed"] else "FAILED"
+                terminalreporter.write_line(
+                    f"  {result['device']:<24} {size:>10} {outcome:<7} {result['duration'] * 1000:8.0f} ms  {result['screenshot'] or ''}"
+                )
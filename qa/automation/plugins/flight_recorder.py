@@ -0,0 +1,106 @@
+"""Failure-only traces: ``--failure-traces DIR`` saves the last moments of failing tests.
+
+Every test keeps its most recent page-object actions, network events,
+console messages and screencast frames in a bounded in-memory buffer (see
+``support.flight_recorder``). When a test fails, in setup, call or
+teardown, the buffer and a final screenshot of its pages are written to
+``DIR/<test id>.zip`` and the archive is named in the failure report; a
+test that fails again, for example when a rerun plugin retries it, gets a
+separate ``-attemptN`` archive. Buffers of passing tests are dropped
+without touching the disk.
+"""
+from pathlib import Path
+
+import pytest
+
+from support.flight_recorder import FlightRecorder, archive_name, current
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("failure traces", "traces of failing tests")
+    group.addoption(
+        "--failure-traces",
+        default=None,
+        metavar="DIR",
+        help="Buffer each test's recent actions, network events and screenshots and save them to DIR when it fails.",
+    )
+    group.addoption(
+        "--trace-events",
+        type=int,
+        default=500,
+        help="Most recent events kept per test (default: 500).",
+    )
+    group.addoption(
+        "--trace-frames",
+        type=int,
+        default=20,
+        help="Most recent screencast frames kept per test (default: 20).",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("failure_traces"):
+        config.pluginmanager.register(FlightRecorderPlugin(config), "e2e-flight-recorder")
+
+
+@pytest.fixture
+def flight_recorder():
+    """The buffer of the running test, or ``None`` without ``--failure-traces``."""
+    return current()
+
+
+class FlightRecorderPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.directory = Path(config.getoption("failure_traces"))
+        self.recorder = FlightRecorder(config.getoption("trace_events"), config.getoption("trace_frames")).start()
+        self.attempts = {}
+        self.archives = []
+        self.failed = False
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        self.recorder.begin()
+        self.attempts[item.nodeid] = self.attempts.get(item.nodeid, 0) + 1
+        self.failed = False
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        # Only the first failing phase is saved; a teardown error after a failure adds nothing new
+        if report.failed and not self.failed:
+            self.failed = True
+            path = self.recorder.save(
+                self.directory / archive_name(item.nodeid, self.attempts.get(item.nodeid, 1)),
+                item.nodeid,
+                f"{call.when} failed",
+                error=_crash_message(report),
+            )
+            report.failure_trace = str(path)
+            report.sections.append(("failure trace", str(path)))
+        if call.when == "teardown":
+            self.recorder.drop()
+
+    def pytest_runtest_logreport(self, report):
+        path = getattr(report, "failure_trace", None)
+        if path:
+            self.archives.append((report.nodeid, path))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.archives:
+            return
+        terminalreporter.section("failure traces")
+        for nodeid, path in self.archives:
+            terminalreporter.write_line(f"{nodeid}: {path}")
+
+    def pytest_unconfigure(self, config):
+        self.recorder.stop()
+
+
+def _crash_message(report):
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message
+    return report.longreprtext.splitlines()[-1] if report.longreprtext else None
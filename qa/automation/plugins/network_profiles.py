@@ -0,0 +1,36 @@
+"""Chooses the network conditions of each test's browser pages.
+
+``@pytest.mark.network_profile("text-only")`` picks a profile from
+``support.network_profiles.PROFILES`` for one test, class or module;
+unmarked tests use ``--network-profile`` (default: ``default``, which
+changes nothing).
+"""
+import pytest
+
+from support.network_profiles import PROFILES
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("network profiles", "network conditions")
+    group.addoption(
+        "--network-profile",
+        choices=sorted(PROFILES),
+        default="default",
+        help="Network profile of tests without a network_profile marker (default: default).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        f"network_profile(name): run the test's pages with one of the network profiles {', '.join(sorted(PROFILES))}",
+    )
+
+
+@pytest.fixture
+def network_profile(request, pytestconfig):
+    marker = request.node.get_closest_marker("network_profile")
+    name = marker.args[0] if marker else pytestconfig.getoption("network_profile")
+    if name not in PROFILES:
+        pytest.fail(f"Unknown network profile '{name}', expected one of {', '.join(sorted(PROFILES))}")
+    return PROFILES[name]
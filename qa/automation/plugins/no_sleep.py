@@ -0,0 +1,66 @@
+"""Fails any test module that waits for a fixed amount of time.
+
+Fixed sleeps make the suite slow and still flake when the backend gets
+slower; page object actions wait for the responses they trigger instead.
+Each test module gets an extra ``no-sleep`` item that lists every
+``wait_for_timeout``, ``time.sleep`` or ``asyncio.sleep`` call in it.
+"""
+import ast
+
+import pytest
+
+BANNED_ATTRIBUTES = {"wait_for_timeout"}
+BANNED_FUNCTIONS = {("time", "sleep"), ("asyncio", "sleep")}
+
+
+def find_sleeps(source):
+    """Returns ``(line, call)`` for every fixed sleep in the given module source."""
+    tree = ast.parse(source)
+    imported = {
+        alias.asname or alias.name: (node.module, alias.name)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom)
+        for alias in node.names
+    }
+    sleeps = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        function = node.func
+        if isinstance(function, ast.Attribute):
+            owner = function.value.id if isinstance(function.value, ast.Name) else None
+            if function.attr in BANNED_ATTRIBUTES or (owner, function.attr) in BANNED_FUNCTIONS:
+                sleeps.append((node.lineno, ast.get_source_segment(source, function)))
+        elif isinstance(function, ast.Name) and imported.get(function.id) in BANNED_FUNCTIONS:
+            sleeps.append((node.lineno, function.id))
+    return sorted(sleeps)
+
+
+def pytest_collect_file(file_path, parent):
+    if file_path.suffix == ".py" and file_path.name.startswith("test_"):
+        return SleepLintFile.from_parent(parent, path=file_path)
+    return None
+
+
+class SleepLintError(Exception):
+    pass
+
+
+class SleepLintFile(pytest.File):
+    def collect(self):
+        yield SleepLintItem.from_parent(self, name="no-sleep")
+
+
+class SleepLintItem(pytest.Item):
+    def runtest(self):
+        sleeps = find_sleeps(self.path.read_text())
+        if sleeps:
+            raise SleepLintError("\n".join(f"{self.path.name}:{line}: {call}()" for line, call in sleeps))
+
+    def repr_failure(self, excinfo):
+        if excinfo.errisinstance(SleepLintError):
+            return f"Fixed sleeps are not allowed, wait for the triggered response instead:\n{excinfo.value}"
+        return super().repr_failure(excinfo)
+
+    def reportinfo(self):
+        return self.path, None, f"{self.path.name}::no-sleep"
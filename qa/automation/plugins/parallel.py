@@ -0,0 +1,156 @@
+"""Runs the e2e suite across several pytest worker processes.
+
+The controller process collects the tests, spreads them over ``--workers``
+shards using the durations recorded by earlier runs (longest tests first,
+each one going to the least loaded worker) and starts one pytest process per
+shard. Every worker launches its own browser and streams its reports back
+through a JSON lines file, which the controller replays so the terminal
+summary, ``--junitxml`` and the exit status cover the whole run.
+"""
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+DURATIONS_KEY = "e2e/durations"
+DEFAULT_DURATION = 5.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("parallel", "parallel e2e runs")
+    group.addoption(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own browser (default: 1).",
+    )
+    group.addoption(
+        "--context-pool-size",
+        type=int,
+        default=2,
+        help="Number of pre-warmed browser contexts kept per worker (default: 2).",
+    )
+    group.addoption(
+        "--merged-report",
+        default=None,
+        help="Write the reports of all workers to this JSON file.",
+    )
+    group.addoption("--shard", default=None, help=argparse.SUPPRESS)
+    group.addoption("--shard-report", default=None, help=argparse.SUPPRESS)
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(ParallelPlugin(config), "e2e-parallel")
+
+
+def schedule(nodeids, durations, workers):
+    """Assigns node ids to at most ``workers`` shards, longest expected duration first."""
+    known = [durations[nodeid] for nodeid in nodeids if nodeid in durations]
+    fallback = sum(known) / len(known) if known else DEFAULT_DURATION
+    expected = {nodeid: durations.get(nodeid, fallback) for nodeid in nodeids}
+
+    shards = [[] for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    for nodeid in sorted(nodeids, key=expected.get, reverse=True):
+        load, index = heapq.heappop(loads)
+        shards[index].append(nodeid)
+        heapq.heappush(loads, (load + expected[nodeid], index))
+    return [shard for shard in shards if shard]
+
+
+class ParallelPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.durations = {}
+        self.reports = []
+        self.is_worker = bool(config.getoption("shard"))
+        self.is_controller = config.getoption("workers") > 1 and not self.is_worker
+
+    def pytest_collection_modifyitems(self, config, items):
+        if not self.is_worker:
+            return
+        shard = set(Path(config.getoption("shard")).read_text().splitlines())
+        deselected = [item for item in items if item.nodeid not in shard]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in shard]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if not self.is_controller:
+            return None
+        if session.testsfailed and not self.config.option.continue_on_collection_errors:
+            raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+        if self.config.option.collectonly:
+            return True
+
+        cache = getattr(self.config, "cache", None)
+        durations = cache.get(DURATIONS_KEY, {}) if cache else {}
+        shards = schedule([item.nodeid for item in session.items], durations, self.config.getoption("workers"))
+        locations = {item.nodeid: item.location for item in session.items}
+
+        with tempfile.TemporaryDirectory(prefix="e2e-workers-") as workdir:
+            workers = [self._start_worker(Path(workdir), index, shard) for index, shard in enumerate(shards)]
+            for process, report_path, log_path in workers:
+                process.wait()
+                self._replay(report_path, locations)
+                if process.returncode not in (pytest.ExitCode.OK, pytest.ExitCode.TESTS_FAILED):
+                    session.testsfailed += 1
+                    sys.stderr.write(log_path.read_text())
+        return True
+
+    def pytest_runtest_logreport(self, report):
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+        if self.is_worker:
+            data = self.config.hook.pytest_report_to_serializable(config=self.config, report=report)
+            with open(self.config.getoption("shard_report"), "a") as stream:
+                stream.write(json.dumps(data) + "\n")
+        elif self.config.getoption("merged_report"):
+            self.reports.append(self.config.hook.pytest_report_to_serializable(config=self.config, report=report))
+
+    def pytest_sessionfinish(self, session):
+        if self.is_worker:
+            return
+        cache = getattr(self.config, "cache", None)
+        if cache and self.durations:
+            durations = cache.get(DURATIONS_KEY, {})
+            durations.update(self.durations)
+            cache.set(DURATIONS_KEY, durations)
+        if self.config.getoption("merged_report"):
+            Path(self.config.getoption("merged_report")).write_text(json.dumps(self.reports, indent=2))
+
+    def _start_worker(self, workdir, index, shard):
+        shard_path = workdir / f"shard-{index}.txt"
+        report_path = workdir / f"reports-{index}.jsonl"
+        log_path = workdir / f"worker-{index}.log"
+        shard_path.write_text("\n".join(shard))
+        report_path.touch()
+
+        args = [
+            sys.executable, "-m", "pytest", *self.config.invocation_params.args,
+            "--workers=1", f"--shard={shard_path}", f"--shard-report={report_path}",
+            "-p", "no:cacheprovider", "-q",
+        ]
+        env = dict(os.environ, E2E_WORKER=str(index))
+        with log_path.open("w") as log:
+            process = subprocess.Popen(
+                args, cwd=self.config.invocation_params.dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+        return process, report_path, log_path
+
+    def _replay(self, report_path, locations):
+        hook = self.config.hook
+        for line in report_path.read_text().splitlines():
+            report = hook.pytest_report_from_serializable(config=self.config, data=json.loads(line))
+            location = locations.get(report.nodeid)
+            if report.when == "setup":
+                hook.pytest_runtest_logstart(nodeid=report.nodeid, location=location)
+            hook.pytest_runtest_logreport(report=report)
+            if report.when == "teardown":
+                hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=location)
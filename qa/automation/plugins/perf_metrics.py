@@ -0,0 +1,75 @@
+"""Collects frontend performance metrics while the e2e tests run.
+
+With ``--perf-metrics PATH`` every page gets ``INIT_SCRIPT`` and the page
+objects record Navigation Timing, paint, LCP and long tasks on load and the
+input-to-render latency of every action. The file gets p50/p95 per flow and
+metric over the whole run, plus the raw samples of every test. Samples
+travel with the test reports, so ``--workers`` runs write one file.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from support.perf_metrics import PerfMetrics, current, summarize
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf metrics", "frontend performance metrics")
+    group.addoption(
+        "--perf-metrics",
+        default=None,
+        help="Collect browser performance metrics and write p50/p95 per flow to this JSON file.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("perf_metrics"):
+        config.pluginmanager.register(PerfMetricsPlugin(config), "e2e-perf-metrics")
+
+
+@pytest.fixture
+def perf_metrics():
+    """The collector the page objects record into, or ``None`` when metrics are off."""
+    return current()
+
+
+class PerfMetricsPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.collector = PerfMetrics().start()
+        self.samples = {}
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when == "call":
+            outcome.get_result().perf_metrics = self.collector.drain()
+
+    def pytest_runtest_logreport(self, report):
+        samples = getattr(report, "perf_metrics", None)
+        if samples and report.when == "call":
+            self.samples[report.nodeid] = [list(sample) for sample in samples]
+
+    def pytest_sessionfinish(self, session):
+        if self.is_worker:
+            return
+        Path(self.config.getoption("perf_metrics")).write_text(json.dumps({
+            "flows": summarize(sample for samples in self.samples.values() for sample in samples),
+            "tests": self.samples,
+        }, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.samples:
+            return
+        terminalreporter.section("perf metrics (ms)")
+        flows = summarize(sample for samples in self.samples.values() for sample in samples)
+        for flow, metrics in flows.items():
+            for name, stats in metrics.items():
+                terminalreporter.write_line(
+                    f"{flow:<28} {name:<26} p50 {stats['p50']:9.1f}  p95 {stats['p95']:9.1f}  n={stats['count']}"
+                )
+
+    def pytest_unconfigure(self, config):
+        self.collector.stop()
@@ -0,0 +1,118 @@
+"""Regex fuzzing mode: ``--regex-fuzz COUNT`` collects the ``fuzz_*.py`` flows in ``benchmarks/``.
+
+The fuzz tests generate ``COUNT`` search patterns from the fixture titles
+and check them, with the catastrophic-backtracking ladders, against an
+oracle: concurrently through the books API and in batches through the
+bookshelf UI. A test fails on any pattern whose results, error or validity
+feedback differ from the oracle, and on any pattern more than
+``--regex-fuzz-slow`` seconds slower than a trivial search. The terminal
+summary lists them; ``--regex-fuzz-report`` writes every pattern's
+outcome and latency to a JSON file.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from support.regex_fuzz import RegexFuzz
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("regex-fuzz", "differential fuzzing of the regex search")
+    group.addoption(
+        "--regex-fuzz",
+        type=int,
+        default=None,
+        metavar="COUNT",
+        help="Also collect the fuzz_*.py flows and check this many generated search patterns.",
+    )
+    group.addoption(
+        "--regex-fuzz-seed",
+        type=int,
+        default=0,
+        help="Seed of the generated patterns (default: 0).",
+    )
+    group.addoption(
+        "--regex-fuzz-concurrency",
+        type=int,
+        default=16,
+        help="Patterns sent to the API at the same time (default: 16).",
+    )
+    group.addoption(
+        "--regex-fuzz-slow",
+        type=float,
+        default=0.5,
+        help="Seconds over a trivial search after which a pattern counts as slow (default: 0.5).",
+    )
+    group.addoption(
+        "--regex-fuzz-ui-sample",
+        type=int,
+        default=100,
+        help="Valid patterns typed into the search box; validity is checked for all of them (default: 100).",
+    )
+    group.addoption(
+        "--regex-fuzz-report",
+        default=None,
+        help="Write the outcome and latency of every pattern to this JSON file.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("regex_fuzz"):
+        config.addinivalue_line("python_files", "fuzz_*.py")
+        config.pluginmanager.register(RegexFuzzPlugin(config), "e2e-regex-fuzz")
+
+
+@pytest.fixture
+def regex_fuzz(request, pytestconfig):
+    fuzz = RegexFuzz(
+        count=pytestconfig.getoption("regex_fuzz") or 1000,
+        seed=pytestconfig.getoption("regex_fuzz_seed"),
+        concurrency=pytestconfig.getoption("regex_fuzz_concurrency"),
+        slow=pytestconfig.getoption("regex_fuzz_slow"),
+        ui_sample=pytestconfig.getoption("regex_fuzz_ui_sample"),
+    )
+    request.node.regex_fuzz = fuzz
+    return fuzz
+
+
+class RegexFuzzPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.results = {}
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        fuzz = getattr(item, "regex_fuzz", None)
+        if call.when == "call" and fuzz and fuzz.reports:
+            outcome.get_result().regex_fuzz = [report.to_dict() for report in fuzz.reports]
+
+    def pytest_runtest_logreport(self, report):
+        result = getattr(report, "regex_fuzz", None)
+        if result and report.when == "call":
+            self.results[report.nodeid] = result
+
+    def pytest_sessionfinish(self, session):
+        path = self.config.getoption("regex_fuzz_report")
+        if not self.is_worker and path:
+            Path(path).write_text(json.dumps(self.results, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.results:
+            return
+        terminalreporter.section("regex fuzz")
+        for nodeid, reports in self.results.items():
+            terminalreporter.write_line(nodeid)
+            for report in reports:
+                terminalreporter.write_line(
+                    f"  {report['channel']}: {len(report['results'])} checks, {report['failures']} failed, "
+                    f"baseline {report['baseline'] * 1000:.0f} ms"
+                )
+                for result in report["results"]:
+                    if result["slow"]:
+                        terminalreporter.write_line(
+                            f"    SLOW {result['latency'] * 1000:8.0f} ms  {result['pattern']!r}"
+                            + (f"  ({result['detail']})" if result["detail"] else "")
+                        )
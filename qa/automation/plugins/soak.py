@@ -0,0 +1,98 @@
+"""Soak mode: ``--soak SECONDS`` collects the ``soak_*.py`` flows in ``benchmarks/``.
+
+Every soak test loops its flow for the given duration on one page that is
+never reloaded, sampling the JS heap, DOM nodes, event listeners and the
+Playwright handles alive in Python every ``--soak-sample-every``
+iterations. The terminal summary lists the growth of every metric, and a
+test fails when one of them keeps growing; ``--soak-report`` writes the
+samples and slopes to a JSON file.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from support.soak import SoakRun
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("soak", "memory and handle-leak soak runs")
+    group.addoption(
+        "--soak",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Also collect the soak_*.py flows and loop each of them for this many seconds.",
+    )
+    group.addoption(
+        "--soak-sample-every",
+        type=int,
+        default=5,
+        help="Iterations between two memory samples (default: 5).",
+    )
+    group.addoption(
+        "--soak-max-growth",
+        type=float,
+        default=0.2,
+        help="Growth over the run a still-growing metric may reach before it counts as a leak (default: 0.2 = 20%%).",
+    )
+    group.addoption(
+        "--soak-report",
+        default=None,
+        help="Write the samples and growth of every soak test to this JSON file.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("soak"):
+        config.addinivalue_line("python_files", "soak_*.py")
+        config.pluginmanager.register(SoakPlugin(config), "e2e-soak")
+
+
+@pytest.fixture
+def soak(request, pytestconfig, page):
+    run = SoakRun(
+        page,
+        duration=pytestconfig.getoption("soak") or 60.0,
+        sample_every=pytestconfig.getoption("soak_sample_every"),
+        max_growth=pytestconfig.getoption("soak_max_growth"),
+    )
+    request.node.soak = run
+    return run
+
+
+class SoakPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.results = {}
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        run = getattr(item, "soak", None)
+        if call.when == "call" and run and run.report:
+            outcome.get_result().soak = run.report.to_dict()
+
+    def pytest_runtest_logreport(self, report):
+        result = getattr(report, "soak", None)
+        if result and report.when == "call":
+            self.results[report.nodeid] = result
+
+    def pytest_sessionfinish(self, session):
+        path = self.config.getoption("soak_report")
+        if not self.is_worker and path:
+            Path(path).write_text(json.dumps(self.results, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.results:
+            return
+        terminalreporter.section("soak")
+        for nodeid, result in self.results.items():
+            terminalreporter.write_line(f"{nodeid} ({len(result['samples'])} samples)")
+            for name, metric in result["metrics"].items():
+                flag = "  LEAK" if metric["unbounded"] else ""
+                terminalreporter.write_line(
+                    f"  {name:<16} {metric['first']:14.0f} -> {metric['last']:14.0f}  {metric['growth']:+8.1%}  "
+                    f"{metric['slope_per_iteration']:+12.1f}/iteration {metric['slope_per_minute']:+12.1f}/min{flag}"
+                )
@@ -0,0 +1,135 @@
+"""Test-impact selection: ``--impact`` runs only the tests a change affects.
+
+Every test that runs records the files it depended on with their content
+hashes (see ``support.test_impact``): the Vue components it mounted, by
+``data-v-*`` scope and source file, the scripts they import, the server
+modules behind the endpoints it called with ``--backend live`` or the
+books fixture the stub answers from, and the Python harness. The records are kept in the pytest cache. On the next run
+with ``--impact``, a test that passed with the same backend and whose files
+are all unchanged is deselected and its cached result reused; new, failed
+and affected tests run and are recorded again. ``--impact-reset`` forgets
+every record and runs the whole selection.
+"""
+import pytest
+
+from support.test_impact import ENDPOINTS, ImpactRecorder, changed, current, dependencies, scopes
+
+IMPACT_KEY = "e2e/impact"
+
+# Tests using any of these open the app in a browser
+BROWSER_FIXTURES = {"page", "reusable_page", "async_context", "async_context_factory", "device_matrix", "soak"}
+# Tests using any of these get their books from the stub backend unless it is live
+STUB_FIXTURES = {"books_api", "api_client"}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("test impact", "run only the tests a change affects")
+    group.addoption(
+        "--impact",
+        action="store_true",
+        default=False,
+        help="Skip tests that passed before and whose frontend, server and test sources are unchanged.",
+    )
+    group.addoption(
+        "--impact-reset",
+        action="store_true",
+        default=False,
+        help="Forget the recorded dependencies and run every selected test.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("impact") or config.getoption("impact_reset"):
+        config.pluginmanager.register(ImpactPlugin(config), "e2e-impact")
+
+
+@pytest.fixture
+def impact():
+    """The recorder pages report their components and requests to, or ``None`` without ``--impact``."""
+    return current()
+
+
+class ImpactPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.recorder = ImpactRecorder().start()
+        self.is_worker = bool(config.getoption("shard"))
+        self.backend = config.getoption("backend")
+        self.cache = getattr(config, "cache", None)
+        self.entries = {} if self.cache is None or config.getoption("impact_reset") else self.cache.get(IMPACT_KEY, {})
+        self.recorded = {}
+        self.reused = []
+        self.changed = set()
+
+    def pytest_collection_modifyitems(self, config, items):
+        # Workers run the shard the controller already selected
+        if self.is_worker or not config.getoption("impact"):
+            return
+        selected = []
+        for item in items:
+            entry = self.entries.get(item.nodeid)
+            files = changed(entry["files"]) if entry else None
+            if entry and entry["outcome"] == "passed" and entry["backend"] == self.backend and not files:
+                self.reused.append(item)
+            else:
+                selected.append(item)
+                self.changed.update(files or ())
+        if self.reused:
+            config.hook.pytest_deselected(items=self.reused)
+            items[:] = selected
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        self.recorder.begin()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when != "call":
+            return
+        fixtures = set(getattr(item, "fixturenames", ()))
+        endpoints = set(self.recorder.endpoints) if self.backend == "live" else set()
+        if self.backend == "live" and "api_client" in fixtures:
+            endpoints.update(ENDPOINTS)
+        outcome.get_result().impact = {
+            "files": dependencies(
+                item.path,
+                self.recorder.components,
+                endpoints,
+                browser=bool(BROWSER_FIXTURES & fixtures),
+                stub=self.backend != "live" and bool(STUB_FIXTURES & fixtures),
+            ),
+            "scopes": scopes(self.recorder.components),
+        }
+
+    def pytest_runtest_logreport(self, report):
+        impact = getattr(report, "impact", None)
+        if report.when == "call" and impact:
+            self.recorded[report.nodeid] = dict(impact, outcome=report.outcome, backend=self.backend)
+        elif report.failed and report.nodeid in self.recorded:
+            # A failing teardown fails the test too
+            self.recorded[report.nodeid]["outcome"] = "failed"
+        elif report.when == "setup" and not report.passed:
+            self.recorded[report.nodeid] = None
+
+    def pytest_sessionfinish(self, session):
+        if self.is_worker or self.cache is None:
+            return
+        for nodeid, entry in self.recorded.items():
+            if entry is None:
+                self.entries.pop(nodeid, None)
+            else:
+                self.entries[nodeid] = entry
+        self.cache.set(IMPACT_KEY, self.entries)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.config.getoption("impact"):
+            return
+        terminalreporter.section("test impact")
+        ran = len(self.recorded)
+        terminalreporter.write_line(f"{ran} test(s) ran, {len(self.reused)} reused the result of an earlier passing run")
+        for path in sorted(self.changed):
+            terminalreporter.write_line(f"  changed: {path}")
+
+    def pytest_unconfigure(self, config):
+        self.recorder.stop()
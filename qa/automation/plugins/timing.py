@@ -0,0 +1,159 @@
+"""Times every page-object action and network response of the e2e tests.
+
+``--timing-report`` writes each test's timeline (actions, responses and the
+time spent in navigation, network, render and idle phases) to a JSON file,
+``--flamegraph`` writes the same time as collapsed stacks for
+``flamegraph.pl`` or speedscope, and ``--time-budget`` flags tests that run
+longer than the budget. ``@pytest.mark.time_budget(seconds)`` overrides the
+budget for one test. The slowest actions and the tests over budget are
+listed in the terminal summary.
+
+Timelines travel with the test reports, so with ``--workers`` the
+controller writes one report for the whole run.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from support.timing import PHASES, Timeline, current
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("timing", "per-action timing")
+    group.addoption(
+        "--timing-report",
+        default=None,
+        help="Write the timeline of every test to this JSON file.",
+    )
+    group.addoption(
+        "--flamegraph",
+        default=None,
+        help="Write the time of every test as collapsed stacks to this file.",
+    )
+    group.addoption(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Flag tests that take longer than this many seconds.",
+    )
+    group.addoption(
+        "--slowest-actions",
+        type=int,
+        default=10,
+        help="Number of slowest actions listed in the timing summary (default: 10).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "time_budget(seconds): flag the test when it runs longer than this")
+    if config.getoption("timing_report") or config.getoption("flamegraph") or config.getoption("time_budget"):
+        config.pluginmanager.register(TimingPlugin(config), "e2e-timing")
+
+
+@pytest.fixture
+def timeline():
+    """The timeline of the running test, or ``None`` when timing is off."""
+    return current()
+
+
+class TimingPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.timelines = []
+        self.timeline = None
+        self.is_worker = bool(config.getoption("shard"))
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        # Started before the fixtures so they can watch pages for the timeline
+        self.timeline = Timeline(item.nodeid).start() if isinstance(item, pytest.Function) else None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        if self.timeline is None:
+            yield
+            return
+        # Only the call is attributed; setup actions such as a reused page's goto are dropped with their time base
+        self.timeline.restart()
+        yield
+        self.timeline.stop()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when != "call" or self.timeline is None or self.timeline.nodeid != item.nodeid:
+            return
+        marker = item.get_closest_marker("time_budget")
+        budget = marker.args[0] if marker else self.config.getoption("time_budget")
+        timing = self.timeline.to_dict()
+        timing["budget"] = budget
+        timing["over_budget"] = budget is not None and self.timeline.duration > budget
+        outcome.get_result().timing = timing
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_runtest_teardown(self, item):
+        # Only still running when setup failed and the call was skipped
+        if self.timeline and current() is self.timeline:
+            self.timeline.stop()
+
+    def pytest_runtest_logreport(self, report):
+        timing = getattr(report, "timing", None)
+        if timing and report.when == "call":
+            self.timelines.append(timing)
+
+    def pytest_sessionfinish(self, session):
+        if self.is_worker:
+            return
+        report_path = self.config.getoption("timing_report")
+        if report_path:
+            Path(report_path).write_text(json.dumps({
+                "budget": self.config.getoption("time_budget"),
+                "phases": self._phase_totals(),
+                "slowest_actions": self._slowest_actions(),
+                "over_budget": [timing["nodeid"] for timing in self.timelines if timing["over_budget"]],
+                "tests": self.timelines,
+            }, indent=2))
+        flamegraph_path = self.config.getoption("flamegraph")
+        if flamegraph_path:
+            stacks = {}
+            for timing in self.timelines:
+                for stack, micros in timing["stacks"].items():
+                    stacks[stack] = stacks.get(stack, 0) + micros
+            Path(flamegraph_path).write_text("".join(f"{stack} {micros}\n" for stack, micros in sorted(stacks.items())))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.timelines:
+            return
+        terminalreporter.section("timing")
+        totals = self._phase_totals()
+        terminalreporter.write_line("  ".join(f"{phase} {totals[phase]:.2f}s" for phase in PHASES))
+        slowest = self._slowest_actions()
+        if slowest:
+            terminalreporter.write_line("slowest actions:")
+            for action in slowest:
+                terminalreporter.write_line(f"  {action['duration']:7.3f}s  {action['name']:<20} {action['nodeid']}")
+        over = [timing for timing in self.timelines if timing["over_budget"]]
+        for timing in over:
+            terminalreporter.write_line(
+                f"OVER BUDGET {timing['nodeid']}: {timing['duration']:.2f}s > {timing['budget']:.2f}s",
+                yellow=True,
+                bold=True,
+            )
+
+    def _phase_totals(self):
+        totals = dict.fromkeys(PHASES, 0.0)
+        for timing in self.timelines:
+            for phase, seconds in timing["phases"].items():
+                totals[phase] += seconds
+        return totals
+
+    def _slowest_actions(self):
+        actions = [
+            {"nodeid": timing["nodeid"], **action}
+            for timing in self.timelines
+            for action in timing["actions"]
+            if action["parent"] is None
+        ]
+        actions.sort(key=lambda action: action["duration"], reverse=True)
+        return actions[:self.config.getoption("slowest_actions")]
@@ -0,0 +1,147 @@
+"""Visual regression: the ``visual`` fixture compares screenshots with stored baselines.
+
+``visual.capture("bookshelf-grid", page.locator(...))`` screenshots a page or
+locator once it has settled and hands the PNG to a process pool shared by
+the session; ``visual.check(name, png)`` does the same for bytes the test
+already has, e.g. from an async page. The test goes on while the pool
+compares. The comparisons are awaited when the test body ends, and a test
+that passed fails when a screenshot differs from its baseline. Compact
+diff images go to ``--visual-diffs``. A test whose baselines are missing is
+skipped, or fails with ``--visual-require-baselines``; ``--visual-update``
+records every baseline the run touches instead.
+"""
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from support.visual import BASELINE_DIR, FAILING, VisualChecker, default_workers, describe
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("visual", "visual regression")
+    group.addoption(
+        "--visual-baselines",
+        default=str(BASELINE_DIR),
+        help="Directory of the baseline screenshots (default: qa/automation/visual-baselines).",
+    )
+    group.addoption(
+        "--visual-diffs",
+        default="visual-diffs",
+        help="Directory for the diff images of screenshots that changed (default: visual-diffs).",
+    )
+    group.addoption(
+        "--visual-update",
+        action="store_true",
+        help="Record the screenshots of this run as the baselines, replacing any there are.",
+    )
+    group.addoption(
+        "--visual-require-baselines",
+        action="store_true",
+        help="Fail tests whose screenshots have no baseline instead of skipping them.",
+    )
+    group.addoption(
+        "--visual-workers",
+        type=int,
+        default=None,
+        help="Processes comparing screenshots (default: one less than the CPU count).",
+    )
+    group.addoption(
+        "--visual-max-diff",
+        type=float,
+        default=0.001,
+        help="Share of changed pixels a screenshot may have and still match (default: 0.001).",
+    )
+    group.addoption(
+        "--visual-report",
+        default=None,
+        help="Write the result of every screenshot comparison to this JSON file.",
+    )
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(VisualPlugin(config), "e2e-visual")
+
+
+@pytest.fixture
+def visual(request, pytestconfig):
+    plugin = pytestconfig.pluginmanager.get_plugin("e2e-visual")
+    checker = VisualChecker(
+        plugin.pool(),
+        baseline_dir=pytestconfig.getoption("visual_baselines"),
+        diff_dir=pytestconfig.getoption("visual_diffs"),
+        update=pytestconfig.getoption("visual_update"),
+        max_diff=pytestconfig.getoption("visual_max_diff"),
+    )
+    request.node.visual = checker
+    return checker
+
+
+class VisualPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.results = {}
+        self.is_worker = bool(config.getoption("shard"))
+        self.require_baselines = config.getoption("visual_require_baselines")
+        self._pool = None
+
+    def pool(self):
+        # Started by the first test that needs it; spawned so workers never inherit the browser's threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.config.getoption("visual_workers") or default_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        checker = getattr(item, "visual", None)
+        if call.when != "call" or not checker:
+            return
+        checker.wait()
+        results = checker.results
+        if not results:
+            return
+        report = outcome.get_result()
+        report.visual = results
+        if not report.passed:
+            return
+        missing = [result for result in results if result["status"] == "missing"]
+        failures = [result for result in results
+                    if result["status"] in FAILING and (result["status"] != "missing" or self.require_baselines)]
+        if failures:
+            report.outcome = "failed"
+            report.longrepr = "Screenshot checks failed:\n" + "\n".join(map(describe, failures))
+        elif missing:
+            # Baselines are recorded on purpose, so a clean checkout without them skips instead of failing
+            path, lineno, _ = item.location
+            report.outcome = "skipped"
+            report.longrepr = (path, lineno + 1, "Skipped: " + "; ".join(map(describe, missing)))
+
+    def pytest_runtest_logreport(self, report):
+        results = getattr(report, "visual", None)
+        if results and report.when == "call":
+            self.results[report.nodeid] = results
+
+    def pytest_sessionfinish(self, session):
+        if self._pool is not None:
+            self._pool.shutdown()
+        path = self.config.getoption("visual_report")
+        if not self.is_worker and path:
+            Path(path).write_text(json.dumps(self.results, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or not self.results:
+            return
+        results = [result for results in self.results.values() for result in results]
+        counts = {status: sum(result["status"] == status for result in results)
+                  for status in ("match", "new", "updated", *FAILING)}
+        terminalreporter.section("visual regression")
+        terminalreporter.write_line(", ".join(f"{count} {status}" for status, count in counts.items() if count))
+        for result in results:
+            if result["status"] in FAILING:
+                terminalreporter.write_line(f"  {describe(result)}")
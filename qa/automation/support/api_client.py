@@ -0,0 +1,99 @@
+"""HTTP client for the books API that does not need a browser.
+
+Connections are kept alive and reused from a pool, ``iter_books`` walks the
+catalogue page by page only as far as it is consumed, and ``get_many``
+fetches many books at once over a bounded thread pool, which is what makes
+fetching the whole catalogue practical with the backend's 1 s delay per
+request.
+"""
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.client import HTTPConnection
+from urllib.parse import urlencode, urlparse
+
+DEFAULT_BASE_URL = "http://localhost:3000"
+
+
+class ApiError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+
+class BooksApiClient:
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=8, timeout=30.0):
+        parts = urlparse(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+
+    def list(self, **params):
+        """One page of ``/api/books``; accepts offset, limit, sort, order and search."""
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        return self._get(f"/api/books?{query}" if query else "/api/books")
+
+    def get(self, book_id):
+        """The book with the given id, or ``None`` when the API has no such book."""
+        return self._get(f"/api/books/{book_id}")
+
+    def iter_books(self, page_size=100, **params):
+        """Yields books page by page, requesting the next page only when it is needed."""
+        offset = params.pop("offset", 0)
+        while True:
+            books = self.list(offset=offset, limit=page_size, **params)
+            yield from books
+            if len(books) < page_size:
+                return
+            offset += page_size
+
+    def get_many(self, book_ids, max_workers=None):
+        """Fetches the given books concurrently, returning them in the order of ``book_ids``."""
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as executor:
+            return list(executor.map(self.get, book_ids))
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get(self, path):
+        # A pooled connection may have been closed by the server meanwhile, so retry once
+        for attempt in range(2):
+            try:
+                with self._connection() as connection:
+                    connection.request("GET", path, headers={"Connection": "keep-alive"})
+                    response = connection.getresponse()
+                    body = response.read().decode("utf-8")
+                break
+            except ConnectionError:
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise ApiError(response.status, body)
+        return json.loads(body) if body else None
+
+    @contextmanager
+    def _connection(self):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            yield connection
+        except Exception:
+            connection.close()
+            raise
+        if self._idle.qsize() < self.pool_size:
+            self._idle.put(connection)
+        else:
+            connection.close()
@@ -0,0 +1,140 @@
+"""Timing of repeated user flows and baselines stored per git revision.
+
+``Benchmark.run`` calls a flow a few times to warm up, then times it for a
+number of rounds; an optional ``setup`` runs before every round outside the
+timed section. Results of a run are saved under ``benchmarks/baselines`` as
+``<revision>.json``, and ``compare`` reports flows whose median got slower
+than the baseline by more than a threshold::
+
+    python -m support.benchmark compare <base-revision> [<revision>] [--threshold 0.1]
+
+exits with status 1 when any flow regressed.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from support.perf_metrics import percentile
+
+BASELINES_DIR = Path(__file__).resolve().parents[1] / "benchmarks" / "baselines"
+
+
+class Benchmark:
+    def __init__(self, rounds=20, warmup=3):
+        self.rounds = rounds
+        self.warmup = warmup
+        self.results = {}
+
+    def run(self, name, flow, setup=None):
+        """Times ``flow`` and returns its stats, which are also kept in ``results`` under ``name``."""
+        for _ in range(self.warmup):
+            if setup:
+                setup()
+            flow()
+        timings = []
+        for _ in range(self.rounds):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            flow()
+            timings.append(time.perf_counter() - start)
+        self.results[name] = stats(timings)
+        return self.results[name]
+
+
+def stats(timings):
+    return {
+        "rounds": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "p95": percentile(timings, 95),
+        "max": max(timings),
+    }
+
+
+def growth(results):
+    """``{flow: [(size, median, ratio to the smallest size)]}`` for results named ``flow@size``."""
+    sizes = {}
+    for name, result in results.items():
+        flow, _, size = name.rpartition("@")
+        if flow and size.isdigit():
+            sizes.setdefault(flow, []).append((int(size), result["median"]))
+    table = {}
+    for flow, medians in sorted(sizes.items()):
+        medians.sort()
+        smallest = medians[0][1]
+        table[flow] = [(size, median, median / smallest if smallest else 0.0) for size, median in medians]
+    return table
+
+
+def revision(cwd=None):
+    """The short hash of HEAD, with ``-dirty`` appended when the tree has local changes."""
+    head = _git("rev-parse", "--short", "HEAD", cwd=cwd)
+    return f"{head}-dirty" if _git("status", "--porcelain", "--untracked-files=no", cwd=cwd) else head
+
+
+def save(results, name=None, directory=BASELINES_DIR):
+    name = name or revision()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps({
+        "revision": name,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "flows": dict(sorted(results.items())),
+    }, indent=2))
+    return path
+
+
+def load(name, directory=BASELINES_DIR):
+    """The flows stored for a revision; any git revision name resolves to its short hash."""
+    path = directory / f"{name}.json"
+    if not path.exists():
+        path = directory / f"{_git('rev-parse', '--short', name)}.json"
+    return json.loads(path.read_text())["flows"]
+
+
+def compare(base, head, threshold=0.1, metric="median"):
+    """Returns ``(flow, base, head, change)`` rows and the flows slower than ``threshold`` allows."""
+    rows = []
+    regressions = []
+    for flow in sorted(base.keys() & head.keys()):
+        before = base[flow][metric]
+        after = head[flow][metric]
+        change = (after - before) / before if before else 0.0
+        rows.append((flow, before, after, change))
+        if change > threshold:
+            regressions.append(flow)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m support.benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compare_parser = commands.add_parser("compare", help="Compare the baselines of two revisions.")
+    compare_parser.add_argument("base", help="Revision of the baseline to compare against.")
+    compare_parser.add_argument("head", nargs="?", default=None, help="Revision to check (default: the working tree).")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown (default: 0.1 = 10%%).")
+    compare_parser.add_argument("--metric", choices=["min", "median", "p95"], default="median")
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(load(args.base), load(args.head or revision()), args.threshold, args.metric)
+    for flow, before, after, change in rows:
+        flag = "  REGRESSION" if flow in regressions else ""
+        print(f"{flow:<40} {before * 1000:10.1f} ms -> {after * 1000:10.1f} ms  {change:+7.1%}{flag}")
+    if regressions:
+        print(f"{len(regressions)} flow(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""A Chromium started once with Playwright's ``launch-server`` and shared over a websocket.
+
+Workers ``connect()`` to ``ws_endpoint`` instead of launching a browser of
+their own, so only the first one pays for the launch.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ENDPOINT_ENV = "E2E_BROWSER_ENDPOINT"
+
+
+def browser_endpoint(config):
+    """The endpoint the browser fixtures should connect to, or ``None`` to launch a browser."""
+    return config.getoption("browser_endpoint") or os.environ.get(ENDPOINT_ENV)
+
+
+class BrowserServer:
+    def __init__(self, headless=True, browser="chromium"):
+        self.headless = headless
+        self.browser = browser
+        self.ws_endpoint = None
+        self._process = None
+        self._config = None
+
+    def start(self):
+        config = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        with config:
+            json.dump({"headless": self.headless}, config)
+        self._config = Path(config.name)
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "playwright", "launch-server", "--browser", self.browser, "--config", config.name],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.ws_endpoint = self._process.stdout.readline().strip()
+        if not self.ws_endpoint.startswith("ws"):
+            self.stop()
+            raise RuntimeError("Playwright launch-server did not report a websocket endpoint")
+        return self
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+        if self._config:
+            self._config.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
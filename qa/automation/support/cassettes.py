@@ -0,0 +1,112 @@
+"""Records network responses to gzipped cassettes and replays them.
+
+Interactions are keyed by method, host and path plus the query string with
+its parameters sorted, so ``?sort=title&offset=12`` and
+``?offset=12&sort=title`` share one entry. Bodies are stored base64 encoded,
+which keeps cover images byte-for-byte identical on replay.
+"""
+import base64
+import gzip
+import json
+import re
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from support.stub_backend import API_ROUTE
+
+IMAGE_URL = re.compile(r"\.(jpe?g|png|gif|webp|svg)([?#]|$)", re.IGNORECASE)
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "date"}
+
+
+def request_key(method, url):
+    parts = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {parts.netloc}{parts.path}?{query}"
+
+
+class Cassette:
+    def __init__(self, path, mode="replay"):
+        self.path = Path(path)
+        self.mode = mode
+        self.recorded_at = None
+        self.interactions = {}
+        if mode == "replay":
+            self._load()
+
+    @classmethod
+    def age(cls, path):
+        """Seconds since the cassette at ``path`` was recorded, or ``None`` if there is none."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as stream:
+            return time.time() - json.load(stream)["recorded_at"]
+
+    def install(self, page_or_context, include_api=True):
+        page_or_context.route(self._matcher(include_api), self.record if self.mode == "record" else self.replay)
+
+    async def install_async(self, page_or_context, include_api=True):
+        handler = self.record_async if self.mode == "record" else self.replay_async
+        await page_or_context.route(self._matcher(include_api), handler)
+
+    def record(self, route):
+        response = route.fetch()
+        self._store(route.request, response, response.body())
+        route.fulfill(response=response)
+
+    async def record_async(self, route):
+        response = await route.fetch()
+        self._store(route.request, response, await response.body())
+        await route.fulfill(response=response)
+
+    def replay(self, route):
+        interaction = self._lookup(route.request)
+        if interaction is None:
+            route.abort("internetdisconnected")
+            return
+        route.fulfill(**interaction)
+
+    async def replay_async(self, route):
+        interaction = self._lookup(route.request)
+        if interaction is None:
+            await route.abort("internetdisconnected")
+            return
+        await route.fulfill(**interaction)
+
+    def save(self):
+        if self.mode != "record":
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as stream:
+            json.dump({"recorded_at": time.time(), "interactions": self.interactions}, stream)
+
+    def _matcher(self, include_api):
+        def matches(url):
+            return IMAGE_URL.search(url) is not None or (include_api and API_ROUTE.match(url) is not None)
+
+        return matches
+
+    def _store(self, request, response, body):
+        self.interactions[request_key(request.method, request.url)] = {
+            "status": response.status,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS},
+            "body": base64.b64encode(body).decode("ascii"),
+        }
+
+    def _lookup(self, request):
+        """Keyword arguments of ``route.fulfill`` for the recorded response, or ``None``."""
+        interaction = self.interactions.get(request_key(request.method, request.url))
+        if interaction is None:
+            return None
+        return {
+            "status": interaction["status"],
+            "headers": interaction["headers"],
+            "body": base64.b64decode(interaction["body"]),
+        }
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as stream:
+            data = json.load(stream)
+        self.recorded_at = data["recorded_at"]
+        self.interactions = data["interactions"]
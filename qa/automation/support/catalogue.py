@@ -0,0 +1,78 @@
+"""Reads the books served by the Node backend, without running Node.
+
+``dev-books.js`` is a JavaScript module, not JSON: it has trailing commas,
+single-quoted strings and a few entries use ``undefined`` on purpose. Such
+keys are dropped, just like ``JSON.stringify`` drops them in the API
+responses, while ``null`` values are kept.
+"""
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+DEV_BOOKS = Path(__file__).resolve().parents[2] / "packages" / "server" / "lib" / "fixtures" / "dev-books.js"
+
+_UNDEFINED = "\0undefined"
+
+
+def load_books(path=DEV_BOOKS):
+    """Returns the fixture books with the ``id`` the backend gives them (their index)."""
+    source = Path(path).read_text(encoding="utf-8")
+    array = source[source.index("["):source.rindex("]") + 1]
+    array = re.sub(r":\s*undefined(?=\s*[,}])", lambda _: f": {json.dumps(_UNDEFINED)}", array)
+    array = re.sub(r",(\s*[}\]])", r"\1", array)
+    array = re.sub(r":\s*'((?:[^'\\]|\\.)*)'", lambda match: f": {json.dumps(match.group(1))}", array)
+    books = json.loads(array, object_pairs_hook=lambda pairs: {k: v for k, v in pairs if v != _UNDEFINED})
+    return [{"id": index, **book} for index, book in enumerate(books)]
+
+
+def js_string(value):
+    """Converts a value the way a JavaScript template literal would."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def field_string(book, field):
+    """Returns ``${book?.[field]}``: missing fields read as ``"undefined"``."""
+    return js_string(book[field]) if field in book else "undefined"
+
+
+def js_regexp(pattern):
+    """Compiles ``new RegExp(pattern, 'i')`` as closely as Python's ``re`` can.
+
+    Without the ``u`` flag ``\\w``, ``\\d``, ``\\s`` and ``\\b`` only know
+    ASCII, so ``Långstrump`` is not one word. The price is that only ASCII
+    letters match regardless of case, where JavaScript folds ``å`` and
+    ``Å`` too. Raises ``re.error`` for an invalid pattern.
+    """
+    return re.compile(pattern, re.IGNORECASE | re.ASCII)
+
+
+def collation_key(text):
+    """Approximates ``String.prototype.localeCompare`` ordering for a sort key.
+
+    Like the default ICU collation, punctuation sorts before digits, digits
+    before letters, letters compare without case and accents first, and
+    lowercase wins a tie against uppercase.
+    """
+    primary, tertiary = [], []
+    for char in unicodedata.normalize("NFD", text):
+        if unicodedata.combining(char):
+            continue
+        folded = char.casefold()
+        if char.isspace():
+            group = 0
+        elif not char.isalnum():
+            group = 1
+        elif char.isdigit():
+            group = 2
+        else:
+            group = 3
+        primary.append((group, folded))
+        tertiary.append(char != folded)
+    return primary, tertiary
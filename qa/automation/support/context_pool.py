@@ -0,0 +1,39 @@
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Page
+
+
+class ContextPool:
+    """Keeps a few browser contexts, each with a blank page, ready for the next tests.
+
+    Every test still gets an isolated context: a used context is closed on
+    release and a fresh one is created in its place, so the cost of opening
+    it is paid during teardown of the previous test instead of setup.
+    """
+
+    def __init__(self, browser: "Browser", size: int = 2, **context_options):
+        self.browser = browser
+        self.size = max(size, 1)
+        self.context_options = context_options
+        self._ready = deque()
+        self._fill()
+
+    def acquire(self) -> "Page":
+        if not self._ready:
+            self._fill()
+        return self._ready.popleft()
+
+    def release(self, page: "Page"):
+        page.context.close()
+        self._fill()
+
+    def close(self):
+        while self._ready:
+            self._ready.popleft().context.close()
+
+    def _fill(self):
+        while len(self._ready) < self.size:
+            context: "BrowserContext" = self.browser.new_context(**self.context_options)
+            self._ready.append(context.new_page())
@@ -0,0 +1,118 @@
+"""Runs one scenario on many devices at once, each in its own browser context.
+
+A device is the name of a Playwright device descriptor (``"iPhone SE"``,
+``"Pixel 7"``, ``"iPad Mini"``...) or a bare viewport such as ``"375x667"``.
+``DeviceMatrix.run`` opens a context per device on the shared browser, runs
+``scenario(page, device)`` in all of them concurrently and screenshots every
+page when its scenario ends, failed or not. Failures do not stop the other
+devices; every device gets a ``DeviceResult`` with its outcome, duration,
+screenshot and whatever the scenario returned.
+"""
+import asyncio
+import re
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+VIEWPORT = re.compile(r"^(\d+)x(\d+)$")
+
+# Phones, tablets and desktops from 320 to 1920 pixels wide
+DEFAULT_DEVICES = [
+    "iPhone SE",
+    "iPhone 8",
+    "iPhone 14 Pro Max",
+    "Galaxy S9+",
+    "Pixel 5",
+    "Pixel 7",
+    "Galaxy S8",
+    "iPad Mini",
+    "iPad Pro 11",
+    "Desktop Chrome",
+    "1366x768",
+    "1920x1080",
+]
+
+
+@dataclass
+class DeviceResult:
+    device: str
+    viewport: dict
+    passed: bool
+    duration: float
+    error: Optional[str] = None
+    screenshot: Optional[str] = None
+    value: Any = None
+
+
+def descriptor(devices, name):
+    """Context options for a device name or a ``WIDTHxHEIGHT`` viewport; raises KeyError for unknown names."""
+    viewport = VIEWPORT.match(name)
+    if viewport:
+        return {"viewport": {"width": int(viewport[1]), "height": int(viewport[2])}}
+    options = dict(devices[name])
+    # Every device runs on the shared browser, whatever engine it would default to
+    options.pop("default_browser_type", None)
+    return options
+
+
+def overlaps(box, other):
+    """Whether two bounding boxes (as returned by ``bounding_box()``) share any area."""
+    return (
+        box["x"] < other["x"] + other["width"] and other["x"] < box["x"] + box["width"]
+        and box["y"] < other["y"] + other["height"] and other["y"] < box["y"] + box["height"]
+    )
+
+
+class DeviceMatrix:
+    def __init__(self, new_context, descriptors, screenshot_dir=None):
+        """``new_context(**options)`` opens a configured browser context; ``descriptors`` maps devices to options."""
+        self.new_context = new_context
+        self.descriptors = descriptors
+        self.screenshot_dir = Path(screenshot_dir) if screenshot_dir else None
+        self.results = []
+
+    @property
+    def failures(self):
+        return [result for result in self.results if not result.passed]
+
+    async def run(self, scenario):
+        """Runs ``scenario(page, device)`` on every device concurrently and returns their results in order."""
+        if self.screenshot_dir:
+            self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        results = await asyncio.gather(*(self._run(device, options, scenario) for device, options in self.descriptors.items()))
+        self.results.extend(results)
+        return results
+
+    async def _run(self, device, options, scenario):
+        context = await self.new_context(**options)
+        page = await context.new_page()
+        result = DeviceResult(device=device, viewport=page.viewport_size, passed=True, duration=0.0)
+        start = time.perf_counter()
+        try:
+            result.value = await scenario(page, device)
+        except Exception as error:
+            result.passed = False
+            result.error = "".join(traceback.format_exception_only(type(error), error)).strip()
+        result.duration = time.perf_counter() - start
+        if self.screenshot_dir:
+            path = self.screenshot_dir / f"{_slug(device)}.png"
+            try:
+                await page.screenshot(path=str(path), full_page=True)
+                result.screenshot = str(path)
+            except Exception:
+                # A crashed or closed page has nothing left to show
+                pass
+        await context.close()
+        return result
+
+    def describe(self):
+        return "\n".join(f"{result.device}: {result.error}" for result in self.failures)
+
+    def to_dict(self):
+        return [asdict(result) for result in self.results]
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower()
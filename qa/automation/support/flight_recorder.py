@@ -0,0 +1,163 @@
+"""Keeps the last moments of a test in memory and saves them only when it fails.
+
+``FlightRecorder`` holds two bounded ring buffers per test: events
+(page-object actions with their outcome, requests, responses, failed
+requests, console messages, page errors and navigations) and screenshots,
+which come from the DevTools screencast as small JPEG frames whenever the
+page repaints, so taking them does not block the test. Old entries fall
+off the end. ``save`` writes the buffers plus a final screenshot of every
+page to a zip archive::
+
+    trace.json          test id, outcome, error and every event in order
+    frames/000.jpg ...  the last screencast frames, named in trace.json
+    final-0.png ...     each page as it looked when the test failed
+
+``drop`` throws the buffers away, which is all a passing test costs. Pages
+of async contexts are watched for events only, without screenshots.
+"""
+import base64
+import json
+import re
+import time
+import traceback
+import weakref
+import zipfile
+from collections import deque
+from pathlib import Path
+
+from support import timing
+
+SCREENCAST = {"format": "jpeg", "quality": 40, "maxWidth": 800, "maxHeight": 800, "everyNthFrame": 2}
+
+_current = None
+
+
+class FlightRecorder:
+    def __init__(self, max_events=500, max_frames=20):
+        self.events = deque(maxlen=max_events)
+        self.frames = deque(maxlen=max_frames)
+        self.pages = []
+        self.dropped = 0
+        self._origin = time.perf_counter()
+        self._watched = weakref.WeakSet()
+
+    def start(self):
+        global _current
+        _current = self
+        timing.set_listener(self)
+        return self
+
+    def stop(self):
+        global _current
+        if _current is self:
+            _current = None
+            timing.set_listener(None)
+
+    def begin(self):
+        """Starts the buffers of the next test."""
+        self.drop()
+        self.dropped = 0
+        self._origin = time.perf_counter()
+
+    def drop(self):
+        self.events.clear()
+        self.frames.clear()
+        self.pages = []
+
+    def now(self):
+        return time.perf_counter() - self._origin
+
+    def record(self, kind, **details):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append({"time": round(self.now(), 4), "kind": kind, **details})
+
+    def action_started(self, name, phase):
+        self.record("action", name=name, phase=phase)
+
+    def action_finished(self, name, phase, error):
+        if error is None:
+            self.record("action done", name=name, phase=phase)
+        else:
+            self.record("action failed", name=name, phase=phase, error=_describe(error))
+
+    def watch(self, page):
+        """Records the events and repaints of a page for the running test; listeners are only added once."""
+        self.pages.append(page)
+        if page in self._watched:
+            return
+        self._watched.add(page)
+        self._listen(page)
+        page.on("framenavigated", lambda frame: frame.parent_frame is None and self.record("navigated", url=frame.url))
+        cdp = page.context.new_cdp_session(page)
+
+        def add_frame(frame):
+            self.frames.append((round(self.now(), 4), base64.b64decode(frame["data"])))
+            # Chrome sends the next frame only once this one is acknowledged
+            cdp.send("Page.screencastFrameAck", {"sessionId": frame["sessionId"]})
+
+        cdp.on("Page.screencastFrame", add_frame)
+        cdp.send("Page.startScreencast", SCREENCAST)
+
+    def watch_context(self, context):
+        """Records the events of every page of a context, for the async tests; they get no screenshots."""
+        self._listen(context)
+
+    def save(self, path, nodeid, outcome, error=None):
+        """Writes the buffers and a final screenshot of every open page to a zip archive."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            frames = []
+            for index, (moment, data) in enumerate(self.frames):
+                name = f"frames/{index:03d}.jpg"
+                archive.writestr(name, data)
+                frames.append({"time": moment, "file": name})
+            finals = []
+            for index, page in enumerate(self.pages):
+                image = _final_screenshot(page)
+                if image:
+                    archive.writestr(f"final-{index}.png", image)
+                    finals.append(f"final-{index}.png")
+            archive.writestr("trace.json", json.dumps({
+                "nodeid": nodeid,
+                "outcome": outcome,
+                "error": error,
+                "dropped_events": self.dropped,
+                "events": list(self.events),
+                "frames": frames,
+                "final_screenshots": finals,
+            }, indent=2))
+        return path
+
+    def _listen(self, target):
+        target.on("request", lambda request: self.record(
+            "request", method=request.method, url=request.url, resource=request.resource_type))
+        target.on("response", lambda response: self.record("response", status=response.status, url=response.url))
+        target.on("requestfailed", lambda request: self.record(
+            "request failed", method=request.method, url=request.url, failure=request.failure))
+        target.on("console", lambda message: self.record("console", type=message.type, text=message.text))
+        if hasattr(target, "main_frame"):
+            target.on("pageerror", lambda error: self.record("page error", error=str(error)))
+
+
+def current():
+    return _current
+
+
+def archive_name(nodeid, attempt=1):
+    """A file name for the archive of a test's attempt."""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "-", nodeid).strip("-")
+    return f"{name}.zip" if attempt == 1 else f"{name}-attempt{attempt}.zip"
+
+
+def _final_screenshot(page):
+    try:
+        return page.screenshot()
+    except Exception:
+        # The page or its browser is already gone
+        return None
+
+
+def _describe(error):
+    return "".join(traceback.format_exception_only(type(error), error)).strip()
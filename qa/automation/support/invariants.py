@@ -0,0 +1,106 @@
+"""Catalogue-wide checks of sorting and pagination.
+
+A sweep collects every page for one sort/search combination, either from the
+bookshelf grid or straight from the API, as ``(offset, records)`` pairs.
+``check_pagination`` compares those pages with the expected catalogue order,
+which the API returns when a single page holds every matching book, and
+reports every broken invariant instead of stopping at the first one.
+"""
+from urllib.parse import urlencode
+
+from pages.pages import API_URL, BookRecord
+
+ALL_BOOKS = 1_000_000
+FETCH_JSON = "urls => Promise.all(urls.map(url => fetch(url).then(response => response.json())))"
+
+
+def expected_order(page, sort="id", order=None, search=""):
+    """The matching books in catalogue order, fetched through the page so routing applies."""
+    return _fetch(page, [_query(0, ALL_BOOKS, sort, order, search)])[0]
+
+
+def sweep_ui(shelf, sort="id", search=""):
+    """Walks the bookshelf from its first page until a page comes back empty.
+
+    The UI has no control for the sort order, so it is always ascending.
+    """
+    shelf.goto()
+    if search:
+        shelf.search(search)
+    shelf.sort_by(sort)
+    pages = []
+    while True:
+        records = shelf.snapshot()
+        if not records:
+            return pages
+        pages.append((int(shelf.query.get('offset', 0)), records))
+        shelf.go_to_next_page()
+
+
+def sweep_api(page, sort="id", order=None, search="", page_size=12, total=None):
+    """Fetches every page of ``page_size`` books concurrently, in one browser call."""
+    if total is None:
+        total = len(expected_order(page, sort, order, search))
+    offsets = list(range(0, total + page_size, page_size))
+    responses = _fetch(page, [_query(offset, page_size, sort, order, search) for offset in offsets])
+    return [(offset, [BookRecord.from_api(book) for book in books]) for offset, books in zip(offsets, responses) if books]
+
+
+def check_pagination(pages, expected, page_size=12):
+    """Returns a description of every way ``pages`` differ from the ``expected`` books.
+
+    Books can be given as ``BookRecord``s or as books decoded from the API.
+    """
+    expected = [_as_record(book) for book in expected]
+    pages = [(offset, [_as_record(book) for book in records]) for offset, records in pages]
+    position = {book.id: index for index, book in enumerate(expected)}
+    violations = []
+
+    next_offset = 0
+    for offset, records in pages:
+        if offset > next_offset:
+            violations.append(f"Gap: books {next_offset}-{offset - 1} are on no page")
+        elif offset < next_offset:
+            violations.append(f"Overlap: page at offset {offset} repeats books before {next_offset}")
+        if [book.id for book in records] != [book.id for book in expected[offset:offset + len(records)]]:
+            shown = [book.title for book in records]
+            wanted = [book.title for book in expected[offset:offset + len(records)]]
+            violations.append(f"Page at offset {offset} shows {shown}, expected {wanted}")
+        next_offset = offset + page_size
+
+    seen = {}
+    previous = None
+    for offset, records in pages:
+        for book in records:
+            if book.id in seen:
+                violations.append(f"Duplicate: '{book.title}' (id {book.id}) is on pages {seen[book.id]} and {offset}")
+            seen.setdefault(book.id, offset)
+        if previous and records and position.get(records[0].id, -1) < position.get(previous.id, -1):
+            violations.append(
+                f"Order: page at offset {offset} starts with '{records[0].title}', "
+                f"which sorts before '{previous.title}' that ended the previous page"
+            )
+        if records:
+            previous = records[-1]
+
+    missing = [book for book in expected if book.id not in seen]
+    if missing:
+        violations.append(f"Missing: {len(missing)} books are on no page, e.g. '{missing[0].title}'")
+    return violations
+
+
+def _query(offset, limit, sort, order, search):
+    params = {"offset": offset, "limit": limit, "sort": sort}
+    if order:
+        params["order"] = order
+    if search:
+        params["search"] = search
+    return f"{API_URL}?{urlencode(params)}"
+
+
+def _fetch(page, urls):
+    return page.evaluate(FETCH_JSON, urls)
+
+
+def _as_record(book):
+    return BookRecord.from_api(book) if isinstance(book, dict) else book
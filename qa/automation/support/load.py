@@ -0,0 +1,243 @@
+"""Load generator: many virtual users driving the bookshelf at the same time.
+
+Every virtual user gets its own browser context, spread round-robin over a
+few browsers, and repeats a weighted mix of page-object actions with think
+time in between until the run ends::
+
+    python -m support.load --users 50 --browsers 4 --duration 120 --mix browse --report load.json
+
+Each action is timed from the input until the page shows its result, and
+every request the browsers make is timed and grouped by endpoint. The
+report lists throughput, errors and latency percentiles per action and per
+endpoint.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlparse
+
+from pages.async_pages import AsyncBookshelfPage
+from pages.pages import API_URL
+from support.browser_server import ENDPOINT_ENV
+from support.perf_metrics import percentile
+
+SORTS = ["id", "title", "author", "rating"]
+SEARCH_PATTERNS = ["The", "Harry", "^A", "s$", "\\d", "The.*Golden", "(Saga|Series)", "a.*e.*i", "zzz", ""]
+PERCENTILES = (50, 90, 95, 99)
+
+# Relative weights of the actions a virtual user picks from
+MIXES = {
+    "browse": {"go_to_next_page": 4, "sort_by": 2, "click_book_by_index": 2, "search": 1},
+    "search": {"search": 5, "go_to_next_page": 2, "sort_by": 1, "click_book_by_index": 1},
+    "sort": {"sort_by": 5, "go_to_next_page": 3, "search": 1, "click_book_by_index": 1},
+}
+
+BOOK_PATH = re.compile(r"^/api/books/[^/]+$")
+
+
+@dataclass
+class Recorder:
+    actions: dict = field(default_factory=lambda: defaultdict(list))
+    errors: Counter = field(default_factory=Counter)
+    requests: dict = field(default_factory=lambda: defaultdict(list))
+    failed_requests: Counter = field(default_factory=Counter)
+
+    def add_action(self, name, seconds):
+        self.actions[name].append(seconds)
+
+    def add_request(self, request):
+        timing = request.timing
+        if timing.get("responseEnd", -1) >= 0:
+            self.requests[endpoint(request.method, request.url, request.resource_type)].append(timing["responseEnd"] / 1000)
+
+    def add_failed_request(self, request):
+        self.failed_requests[endpoint(request.method, request.url, request.resource_type)] += 1
+
+    def summary(self, elapsed):
+        return {
+            "elapsed": elapsed,
+            "actions": _summarize(self.actions, self.errors, elapsed),
+            "endpoints": _summarize(self.requests, self.failed_requests, elapsed),
+        }
+
+
+def endpoint(method, url, resource_type="fetch"):
+    """Groups requests: API calls by route, everything else by resource type."""
+    parts = urlparse(url)
+    path = parts.path.rstrip("/")
+    if f"{parts.scheme}://{parts.netloc}{path}".startswith(API_URL):
+        return f"{method} /api/books/:id" if BOOK_PATH.match(path) else f"{method} /api/books"
+    return f"{method} {resource_type}"
+
+
+class VirtualUser:
+    def __init__(self, index, context, recorder, mix, think_time, seed=None):
+        self.index = index
+        self.context = context
+        self.recorder = recorder
+        self.actions, self.weights = zip(*MIXES[mix].items())
+        self.think_time = think_time
+        self.rng = random.Random(None if seed is None else seed + index)
+        self.shelf = None
+
+    async def run(self, deadline):
+        page = await self.context.new_page()
+        self.shelf = AsyncBookshelfPage(page)
+        await self._perform("goto")
+        while time.monotonic() < deadline:
+            await self._perform(self.rng.choices(self.actions, self.weights)[0])
+            # Think time, the pause a real user takes between two actions
+            await asyncio.sleep(self.think_time * self.rng.uniform(0.5, 1.5))
+
+    async def _perform(self, name):
+        """Runs and times one action, then the action it asks for next, timed on its own."""
+        start = time.perf_counter()
+        try:
+            follow_up = await getattr(self, name)()
+        except _EmptyShelf:
+            await self._perform("goto")
+            return
+        except Exception:
+            self.recorder.errors[name] += 1
+            if name != "goto":
+                # Start over from a freshly loaded bookshelf after a failed action
+                await self._perform("goto")
+            return
+        self.recorder.add_action(name, time.perf_counter() - start)
+        if follow_up:
+            await self._perform(follow_up)
+
+    async def goto(self):
+        await self.shelf.goto()
+
+    async def search(self):
+        await self.shelf.search(self.rng.choice(SEARCH_PATTERNS))
+
+    async def sort_by(self):
+        current = self.shelf.query.get("sort", "id")
+        await self.shelf.sort_by(self.rng.choice([sort for sort in SORTS if sort != current]))
+
+    async def go_to_next_page(self):
+        if not await self.shelf.snapshot():
+            raise _EmptyShelf
+        await self.shelf.go_to_next_page()
+
+    async def click_book_by_index(self):
+        books = await self.shelf.snapshot()
+        if not books:
+            raise _EmptyShelf
+        await self.shelf.click_book_by_index(self.rng.randrange(len(books)))
+        # The bookshelf starts over on its first page when the user comes back
+        return "goto"
+
+
+class _EmptyShelf(Exception):
+    """The action needs books on the shelf; the user reloads it instead, which is timed as a ``goto``."""
+
+
+async def run(users=10, browsers=2, duration=60.0, mix="browse", think_time=1.0, ramp_up=5.0,
+              seed=None, browser_endpoint=None, books_api=None, headless=True):
+    from playwright.async_api import async_playwright
+
+    recorder = Recorder()
+    async with async_playwright() as p:
+        if browser_endpoint:
+            launched = [await p.chromium.connect(browser_endpoint) for _ in range(browsers)]
+        else:
+            launched = [await p.chromium.launch(headless=headless) for _ in range(browsers)]
+
+        async def user(index):
+            # Users start spread over the ramp-up so they do not all load the page at once
+            await asyncio.sleep(ramp_up * index / max(users, 1))
+            context = await launched[index % browsers].new_context()
+            context.on("requestfinished", recorder.add_request)
+            context.on("requestfailed", recorder.add_failed_request)
+            if books_api:
+                await books_api.install_async(context)
+            try:
+                await VirtualUser(index, context, recorder, mix, think_time, seed).run(deadline)
+            finally:
+                await context.close()
+
+        start = time.monotonic()
+        deadline = start + ramp_up + duration
+        await asyncio.gather(*(user(index) for index in range(users)))
+        elapsed = time.monotonic() - start
+        for browser in launched:
+            await browser.close()
+    return recorder.summary(elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m support.load")
+    parser.add_argument("--users", type=int, default=10, help="Number of concurrent virtual users (default: 10).")
+    parser.add_argument("--browsers", type=int, default=2, help="Browsers the users' contexts are spread over (default: 2).")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds every user keeps going after ramp-up (default: 60).")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which the users start (default: 5).")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="browse", help="Weighted mix of actions (default: browse).")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean pause between actions in seconds (default: 1).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible action sequences.")
+    parser.add_argument("--backend", choices=["live", "stub"], default="live", help="Load the real server or the in-browser stub.")
+    parser.add_argument("--browser-endpoint", default=None, help="Connect to a running Playwright browser server.")
+    parser.add_argument("--report", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    books_api = None
+    if args.backend == "stub":
+        from support.stub_backend import StubBooksApi
+
+        books_api = StubBooksApi()
+    summary = asyncio.run(run(
+        users=args.users,
+        browsers=args.browsers,
+        duration=args.duration,
+        mix=args.mix,
+        think_time=args.think_time,
+        ramp_up=args.ramp_up,
+        seed=args.seed,
+        browser_endpoint=args.browser_endpoint or os.environ.get(ENDPOINT_ENV),
+        books_api=books_api,
+    ))
+    summary.update(users=args.users, browsers=args.browsers, mix=args.mix)
+    print(format_summary(summary))
+    if args.report:
+        Path(args.report).write_text(json.dumps(summary, indent=2))
+    return 1 if not summary["actions"] else 0
+
+
+def format_summary(summary):
+    header = f"{'':<32} {'count':>7} {'errors':>6} {'per s':>7}" + "".join(f" {f'p{p}':>8}" for p in PERCENTILES)
+    lines = []
+    for title, rows in (("action", summary["actions"]), ("endpoint", summary["endpoints"])):
+        lines.append(f"{title:<32}" + header[32:])
+        for name, stats in rows.items():
+            lines.append(
+                f"{name:<32} {stats['count']:7d} {stats['errors']:6d} {stats['throughput']:7.2f}"
+                + "".join(f" {stats[f'p{p}'] * 1000:6.0f}ms" if stats['count'] else f" {'-':>8}" for p in PERCENTILES)
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _summarize(latencies, errors, elapsed):
+    summary = {}
+    for name in sorted(latencies.keys() | errors.keys()):
+        values = latencies.get(name, [])
+        stats = {"count": len(values), "errors": errors.get(name, 0), "throughput": len(values) / elapsed if elapsed else 0.0}
+        for p in PERCENTILES:
+            stats[f"p{p}"] = percentile(values, p) if values else None
+        stats["max"] = max(values) if values else None
+        summary[name] = stats
+    return summary
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Named network conditions for browser pages.
+
+A profile can block resources by type (covers, fonts, media), answer cover
+requests with a local placeholder image instead of downloading them from
+Goodreads, and emulate a slow link and a slow CPU through the Chrome
+DevTools Protocol. Blocking and placeholders are routes, installed after
+the stub backend and cassettes so they take precedence over them; the
+throttling presets follow the ones of Chrome DevTools and Lighthouse.
+"""
+import base64
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from support.cassettes import IMAGE_URL
+
+FONT_URL = re.compile(r"\.(woff2?|ttf|otf|eot)([?#]|$)", re.IGNORECASE)
+MEDIA_URL = re.compile(r"\.(mp4|webm|ogg|mp3|wav)([?#]|$)", re.IGNORECASE)
+RESOURCE_URLS = {"image": IMAGE_URL, "font": FONT_URL, "media": MEDIA_URL}
+
+# A 1x1 grey PNG that stands in for every cover
+PLACEHOLDER_COVER = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkaAAAAIYAg2PvKmEAAAAASUVORK5CYII="
+)
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    name: str
+    block: frozenset = field(default_factory=frozenset)
+    placeholder_covers: bool = False
+    latency: float = 0.0
+    download_kbps: Optional[float] = None
+    upload_kbps: Optional[float] = None
+    cpu_slowdown: float = 1.0
+
+    @property
+    def throttled(self):
+        return bool(self.latency or self.download_kbps or self.upload_kbps) or self.cpu_slowdown > 1
+
+    def apply(self, page):
+        """Installs the routes and throttling of this profile on a page."""
+        if self.block or self.placeholder_covers:
+            page.route(self._matches, self._handle)
+        if self.throttled:
+            cdp = page.context.new_cdp_session(page)
+            for method, params in self._cdp_commands():
+                cdp.send(method, params)
+
+    async def apply_async(self, context):
+        """Installs the routes of this profile on an async context and throttles every page it opens."""
+        if self.block or self.placeholder_covers:
+            await context.route(self._matches, self._handle_async)
+        if not self.throttled:
+            return
+        new_page = context.new_page
+
+        async def new_throttled_page(*args, **kwargs):
+            # Throttled before it is returned, so the test's first navigation is throttled too
+            page = await new_page(*args, **kwargs)
+            await self.throttle_async(page)
+            return page
+
+        context.new_page = new_throttled_page
+        # Pages the app opens itself, such as popups, are throttled in a task as soon as they exist
+        context.on("page", self.throttle_async)
+
+    async def throttle_async(self, page):
+        if self.throttled:
+            cdp = await page.context.new_cdp_session(page)
+            for method, params in self._cdp_commands():
+                await cdp.send(method, params)
+
+    def _matches(self, url):
+        if self.placeholder_covers and IMAGE_URL.search(url):
+            return True
+        return any(RESOURCE_URLS[kind].search(url) for kind in self.block)
+
+    def _handle(self, route):
+        if self.placeholder_covers and IMAGE_URL.search(route.request.url):
+            route.fulfill(status=200, content_type="image/png", body=PLACEHOLDER_COVER)
+        else:
+            route.abort("blockedbyclient")
+
+    async def _handle_async(self, route):
+        if self.placeholder_covers and IMAGE_URL.search(route.request.url):
+            await route.fulfill(status=200, content_type="image/png", body=PLACEHOLDER_COVER)
+        else:
+            await route.abort("blockedbyclient")
+
+    def _cdp_commands(self):
+        yield "Network.enable", {}
+        yield "Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": self.latency,
+            "downloadThroughput": _bytes_per_second(self.download_kbps),
+            "uploadThroughput": _bytes_per_second(self.upload_kbps),
+        }
+        yield "Emulation.setCPUThrottlingRate", {"rate": self.cpu_slowdown}
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in [
+        NetworkProfile("default"),
+        NetworkProfile("text-only", block=frozenset({"image", "font", "media"})),
+        NetworkProfile("placeholder-covers", placeholder_covers=True),
+        NetworkProfile("slow-3g", latency=2000, download_kbps=400, upload_kbps=400, cpu_slowdown=4),
+        NetworkProfile("fast-3g", latency=562.5, download_kbps=1440, upload_kbps=675, cpu_slowdown=4),
+        NetworkProfile("slow-4g", latency=150, download_kbps=1600, upload_kbps=750, cpu_slowdown=4),
+    ]
+}
+
+
+def _bytes_per_second(kbps):
+    # DevTools treats -1 as "not throttled"
+    return kbps * 1000 / 8 if kbps else -1
@@ -0,0 +1,56 @@
+"""Runs the Node backend of ``qa/packages/server`` in a subprocess.
+
+Used where a test needs its own server, e.g. one per generated catalogue
+in the scale benchmarks; ``fixture`` becomes ``BOOKS_FIXTURE`` and replaces
+``dev-books.js``. Without a ``port`` the server gets a free one, so
+parallel workers do not collide.
+"""
+import os
+import socket
+import subprocess
+
+from support.catalogue import DEV_BOOKS
+
+SERVER_DIR = DEV_BOOKS.parents[2]
+
+
+class NodeServer:
+    def __init__(self, fixture=None, port=None):
+        self.fixture = fixture
+        self.port = port or free_port()
+        self._process = None
+
+    @property
+    def base_url(self):
+        return f"http://localhost:{self.port}"
+
+    def start(self):
+        env = dict(os.environ, PORT=str(self.port))
+        if self.fixture:
+            env["BOOKS_FIXTURE"] = str(self.fixture)
+        self._process = subprocess.Popen(
+            ["node", "index.js"], cwd=SERVER_DIR, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        # The server logs one line once it listens, after the catalogue is loaded
+        if "listening" not in self._process.stdout.readline():
+            self.stop()
+            raise RuntimeError("The Node backend did not start")
+        return self
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def free_port():
+    """A port nothing listens on right now, picked by the OS."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
@@ -0,0 +1,134 @@
+"""Browser performance metrics collected by the page objects.
+
+``INIT_SCRIPT`` runs before the app in every page and keeps what the
+Performance API only reports as it happens: the largest contentful paint,
+long tasks, when the first book link was rendered, when the last user
+input (click, key press, text input or select change) arrived and when the
+grid links or the details title last changed. The page objects read it
+back after ``goto`` and after every action that re-renders a view, and add
+the values to the active ``PerfMetrics`` under a flow name such as
+``bookshelf.load`` or ``bookshelf.sort_by``. All times are milliseconds.
+"""
+from collections import defaultdict
+
+_current = None
+
+INIT_SCRIPT = """(() => {
+    const perf = window.__e2ePerf = {lcp: null, longTasks: [], firstBookLink: null, lastInput: null, rendered: null};
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(callback)).observe({type, buffered: true});
+        } catch {}
+    };
+    observe('largest-contentful-paint', entry => { perf.lcp = entry.startTime; });
+    observe('longtask', entry => { perf.longTasks.push(entry.duration); });
+    // fill() fires 'input', which is what v-model fetches on
+    for (const type of ['pointerdown', 'keydown', 'input', 'change']) {
+        addEventListener(type, event => { perf.lastInput = event.timeStamp; }, true);
+    }
+    // Book links and the details title; cover swaps only change a link's style, so they do not count
+    const RENDERED = 'a[data-v-78b5a187], h1[data-v-2dd5deba]';
+    const touches = node => node.nodeType === Node.ELEMENT_NODE
+        ? node.matches(RENDERED) || !!node.querySelector(RENDERED)
+        : !!node.parentElement?.matches(RENDERED);
+    new MutationObserver(records => {
+        const now = performance.now();
+        if (perf.firstBookLink === null && document.querySelector('a[data-v-78b5a187]')) {
+            perf.firstBookLink = now;
+        }
+        const changed = records.some(record => record.type === 'childList'
+            ? [...record.addedNodes, ...record.removedNodes].some(touches)
+            : touches(record.target));
+        if (changed) {
+            perf.rendered = now;
+        }
+    }).observe(document, {childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['href']});
+})()"""
+
+# Navigation Timing, paint, LCP and long tasks of the current document
+LOAD_METRICS = """() => {
+    const [nav] = performance.getEntriesByType('navigation');
+    const paint = Object.fromEntries(performance.getEntriesByType('paint').map(entry => [entry.name, entry.startTime]));
+    const perf = window.__e2ePerf || {longTasks: []};
+    return {
+        ttfb: nav ? nav.responseStart - nav.requestStart : null,
+        dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+        load: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+        first_paint: paint['first-paint'] ?? null,
+        first_contentful_paint: paint['first-contentful-paint'] ?? null,
+        largest_contentful_paint: perf.lcp,
+        first_book_link: perf.firstBookLink,
+        long_tasks: perf.longTasks.length,
+        long_task_time: perf.longTasks.reduce((sum, duration) => sum + duration, 0),
+    };
+}"""
+
+# Truthy once rendered, so ``wait_for_function`` predicates can return it. The render time is when the
+# DOM last changed, not when the predicate was polled; without a change since the input, it is the poll.
+RENDERED_AT = """((perf = window.__e2ePerf || {}) => ({
+    rendered: perf.rendered !== null && perf.rendered >= perf.lastInput ? perf.rendered : performance.now(),
+    input: perf.lastInput ?? null,
+}))()"""
+
+DETAILS_RENDERED = f"() => document.querySelector('h1[data-v-2dd5deba]') && {RENDERED_AT}"
+
+
+class PerfMetrics:
+    """Samples per flow and metric; ``drain`` hands over those of the running test."""
+
+    def __init__(self):
+        self.samples = []
+
+    def start(self):
+        global _current
+        _current = self
+        return self
+
+    def stop(self):
+        global _current
+        if _current is self:
+            _current = None
+
+    def record(self, flow, metrics):
+        self.samples.extend((flow, name, value) for name, value in metrics.items() if value is not None)
+
+    def record_render(self, flow, rendered):
+        """Records the time from the last user input until ``rendered``, a ``RENDERED_AT`` value."""
+        if rendered and rendered["input"] is not None:
+            self.record(flow, {"render_latency": max(rendered["rendered"] - rendered["input"], 0.0)})
+
+    def drain(self):
+        samples, self.samples = self.samples, []
+        return samples
+
+
+def current():
+    return _current
+
+
+def summarize(samples):
+    """``{flow: {metric: {count, p50, p95, max}}}`` for ``(flow, metric, value)`` samples."""
+    grouped = defaultdict(lambda: defaultdict(list))
+    for flow, name, value in samples:
+        grouped[flow][name].append(value)
+    return {
+        flow: {
+            name: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": max(values),
+            }
+            for name, values in sorted(metrics.items())
+        }
+        for flow, metrics in sorted(grouped.items())
+    }
+
+
+def percentile(values, percent):
+    """Linearly interpolated percentile, matching numpy's default method."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
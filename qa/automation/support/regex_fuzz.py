@@ -0,0 +1,412 @@
+"""Differential fuzzing of the regex search, against the API and through the UI.
+
+``generate`` derives thousands of patterns from the fixture titles: valid
+ones (literal fragments, wildcards, anchors, alternations, quantifiers,
+classes, lookarounds, backreferences) and invalid ones (unbalanced groups
+and classes, nothing to repeat, reversed ranges and counts, trailing
+backslashes). Every pattern is checked against an oracle, the ids of the
+fixture books whose titles it matches (``js_regexp``), and timed.
+
+``ladders`` builds catastrophic-backtracking shapes, such as
+``^(?:\\w|\\w){0,n}$``, whose cost grows exponentially with ``n``. Each
+carries a linear-time equivalent for the oracle. A ladder is climbed one
+size at a time. It stops at the first size that is slow, or once its
+growth says the next size would stall for ``MAX_STALL`` times longer than
+that. Either way, a probe stalls the server's event loop for a bounded
+time.
+
+``RegexFuzz.run_api`` sends the generated patterns concurrently, invalid
+ones last, because an error may take the server down. A pattern is slow
+when it takes ``slow`` seconds longer than a trivial search. A stall
+delays every request in flight, so slow patterns are measured again on
+their own, and ladders only ever run alone. ``RegexFuzz.run_ui`` checks
+the ``regexp-input`` validity of every pattern in batches of one browser
+call. It then types a sample of the valid patterns into the search box,
+reloading the bookshelf between batches, and compares the first page of
+the grid with the oracle.
+"""
+import random
+import re
+import statistics
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from pages.pages import BookshelfPage
+from support.api_client import ApiError
+from support.catalogue import field_string, js_regexp, load_books
+
+ALL_BOOKS = 1_000_000
+# Sizes a ladder climbs: the exponential shapes double in cost per step of n, the polynomial one
+# multiplies it by the length of a title
+EXPONENTIAL = tuple(range(2, 31, 2))
+POLYNOMIAL = (1, 2, 3, 4, 5, 6, 7, 8)
+# A ladder also stops once the next size is expected to stall for this many times ``slow``
+MAX_STALL = 10
+VALIDITY_BATCH = 250
+# Matches no title, so the server does the least work possible for it
+BASELINE_PATTERN = "\\x00"
+SPECIALS = set("\\^$.|?*+()[]{}")
+
+# Ladder shapes: (name, pattern, linear-time equivalent, sizes) for an atom, an end and a size
+SHAPES = [
+    ("overlapping alternation", "^(?:{x}|{x}){{0,{n}}}{end}", "^{x}{{0,{n}}}{end}", EXPONENTIAL),
+    ("optional prefix", "^(?:{x}?){{{n}}}{x}{{{n}}}{end}", "^{x}{{{n},{twice}}}{end}", EXPONENTIAL),
+    ("nested repeat", "^(?:{x}{{1,2}}){{0,{n}}}{end}", "^{x}{{0,{twice}}}{end}", EXPONENTIAL),
+    ("star of plus", "^(?:{x}+){{1,{n}}}{end}", "^{x}+{end}", POLYNOMIAL),
+]
+ATOMS = ["\\w", "[\\w ]", ".", "[a-z ]"]
+ENDS = ["$", "\\x00"]
+
+# Every pattern in one call, on detached copies of the custom element so nothing is searched
+VALIDITY = """patterns => patterns.map(pattern => {
+    const input = document.createElement('input', {is: 'regexp-input'});
+    input.value = pattern;
+    input.dispatchEvent(new Event('input'));
+    return input.checkValidity();
+})"""
+
+
+@dataclass(frozen=True)
+class Pattern:
+    text: str
+    family: str
+    valid: bool = True
+    # A linear-time equivalent for the oracle, for the catastrophic shapes
+    oracle: Optional[str] = None
+    size: Optional[int] = None
+
+
+@dataclass
+class Result:
+    pattern: str
+    family: str
+    check: str
+    latency: float
+    outcome: str
+    detail: str = ""
+    slow: bool = False
+    size: Optional[int] = None
+
+    @property
+    def failed(self):
+        return self.outcome != "ok" or self.slow
+
+
+@dataclass
+class FuzzReport:
+    channel: str
+    baseline: float
+    results: list
+
+    @property
+    def failures(self):
+        return [result for result in self.results if result.failed]
+
+    @property
+    def slow(self):
+        return [result for result in self.results if result.slow]
+
+    def describe(self, limit=20):
+        failures = self.failures
+        lines = [f"{self.channel}: {len(self.results)} checks, {len(failures)} failed, "
+                 f"{len(self.slow)} slow (baseline {self.baseline * 1000:.0f} ms)"]
+        for result in failures[:limit]:
+            problem = (result.detail or "slow") if result.outcome == "ok" else f"{result.outcome}: {result.detail}"
+            lines.append(f"  {result.pattern!r} ({result.family}, {result.check}) "
+                         f"{result.latency * 1000:.0f} ms {problem}")
+        if len(failures) > limit:
+            lines.append(f"  ... and {len(failures) - limit} more")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "channel": self.channel,
+            "baseline": self.baseline,
+            "failures": len(self.failures),
+            "slow": [result.pattern for result in self.slow],
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+def expected_ids(pattern, books):
+    """Ids of the books ``BookStore.list`` returns for a search, in catalogue order."""
+    regexp = js_regexp(pattern or ".+")
+    return [book["id"] for book in books if regexp.search(field_string(book, "title"))]
+
+
+def generate(count, seed=0, books=None):
+    """``count`` distinct patterns, about a quarter of them invalid, always the same for a seed."""
+    books = load_books() if books is None else books
+    titles = [book["title"] for book in books if book.get("title")]
+    rng = random.Random(seed)
+    patterns = {"": Pattern("", "empty")}
+    attempts = 0
+    while len(patterns) < count and attempts < count * 20:
+        attempts += 1
+        pattern = _invalid(rng, titles) if rng.random() < 0.25 else _valid(rng, titles)
+        if pattern.text not in patterns and _compiles(pattern.text) == pattern.valid:
+            patterns[pattern.text] = pattern
+    return list(patterns.values())[:count]
+
+
+def ladders(sizes=None):
+    """``{shape: [pattern per size]}`` of the catastrophic-backtracking shapes; ``sizes`` overrides their own."""
+    shapes = {}
+    for name, template, oracle, shape_sizes in SHAPES:
+        for atom in ATOMS:
+            for end in ENDS:
+                shapes[f"{name} {atom}{end}"] = [
+                    Pattern(
+                        template.format(x=atom, n=n, end=end), "redos",
+                        oracle=oracle.format(x=atom, n=n, twice=2 * n, end=end), size=n,
+                    )
+                    for n in sizes or shape_sizes
+                ]
+    return shapes
+
+
+class RegexFuzz:
+    def __init__(self, count=1000, seed=0, concurrency=16, slow=0.5, sizes=None, ui_sample=100, ui_batch=25,
+                 books=None):
+        self.count = count
+        self.seed = seed
+        self.concurrency = concurrency
+        self.slow = slow
+        self.sizes = sizes
+        self.ui_sample = ui_sample
+        self.ui_batch = ui_batch
+        self.books = load_books() if books is None else books
+        self.patterns = generate(count, seed, self.books)
+        self.reports = []
+
+    def expected(self, pattern):
+        return set(expected_ids(pattern.oracle or pattern.text, self.books))
+
+    def run_api(self, client):
+        """Checks every pattern and ladder against the books API behind ``client``."""
+        baseline = statistics.median(self._timed(client, BASELINE_PATTERN)[0] for _ in range(3))
+        results = self._check_batch(client, [pattern for pattern in self.patterns if pattern.valid], baseline)
+        for shape in ladders(self.sizes).values():
+            results.extend(self._climb(client, shape, baseline))
+        # Invalid patterns after the ladders: an unhandled error can take the server down with it
+        results.extend(self._check_batch(client, [pattern for pattern in self.patterns if not pattern.valid], baseline))
+        return self._report("api", baseline, results)
+
+    def run_ui(self, page):
+        """Checks validity feedback for every pattern and the grid for a sample of the valid ones."""
+        shelf = BookshelfPage(page)
+        shelf.goto()
+        start = time.perf_counter()
+        shelf.search(BASELINE_PATTERN)
+        baseline = time.perf_counter() - start
+
+        results = []
+        patterns = self.patterns + [shape[0] for shape in ladders(self.sizes).values()]
+        for offset in range(0, len(patterns), VALIDITY_BATCH):
+            batch = patterns[offset:offset + VALIDITY_BATCH]
+            start = time.perf_counter()
+            validity = page.evaluate(VALIDITY, [pattern.text for pattern in batch])
+            latency = (time.perf_counter() - start) / len(batch)
+            for pattern, valid in zip(batch, validity):
+                outcome = "ok" if valid == pattern.valid else "mismatch"
+                detail = "" if valid == pattern.valid else f"regexp-input says {'valid' if valid else 'invalid'}"
+                results.append(Result(pattern.text, pattern.family, "validity", latency, outcome, detail))
+
+        searchable = [pattern for pattern in self.patterns if pattern.valid]
+        sample = random.Random(self.seed).sample(searchable, min(self.ui_sample, len(searchable)))
+        for offset in range(0, len(sample), self.ui_batch):
+            shelf.goto()
+            for pattern in sample[offset:offset + self.ui_batch]:
+                result = self._check_ui(shelf, pattern)
+                result.slow = result.latency - baseline > self.slow
+                results.append(result)
+                if result.outcome == "error":
+                    shelf.goto()
+        return self._report("ui", baseline, results)
+
+    def _check_batch(self, client, patterns, baseline):
+        """Checks ``patterns`` concurrently, then times the slow ones again on their own."""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(lambda pattern: self._check_api(client, pattern), patterns))
+        for index, result in enumerate(results):
+            if result.latency - baseline > self.slow:
+                # Measured alone, so a stall caused by another pattern does not count
+                results[index] = self._check_api(client, patterns[index])
+                results[index].slow = results[index].latency - baseline > self.slow
+        return results
+
+    def _climb(self, client, shape, baseline):
+        """Checks a ladder size by size until a size is slow or the next one would stall for too long."""
+        results = []
+        previous = None
+        for pattern in shape:
+            result = self._check_api(client, pattern)
+            results.append(result)
+            excess = result.latency - baseline
+            result.slow = excess > self.slow
+            if result.slow or result.outcome != "ok":
+                break
+            if previous and previous > 0.01 and excess > previous:
+                projected = excess * excess / previous
+                if projected > self.slow * MAX_STALL:
+                    result.slow = True
+                    result.detail = f"{excess / previous:.0f}x slower per step, about {projected:.0f} s at the next size"
+                    break
+            previous = excess
+        return results
+
+    def _check_api(self, client, pattern):
+        latency, books, error = self._timed(client, pattern.text)
+        if not pattern.valid:
+            if isinstance(error, ApiError):
+                return Result(pattern.text, pattern.family, "api", latency, "ok", size=pattern.size)
+            detail = "no response" if error else "accepted an invalid pattern"
+            return Result(pattern.text, pattern.family, "api", latency, "mismatch" if books is not None else "error",
+                          detail, size=pattern.size)
+        if error:
+            outcome = "mismatch" if isinstance(error, ApiError) else "error"
+            return Result(pattern.text, pattern.family, "api", latency, outcome, str(error), size=pattern.size)
+        return Result(pattern.text, pattern.family, "api", latency,
+                      *_compare({book["id"] for book in books}, self.expected(pattern)), size=pattern.size)
+
+    def _check_ui(self, shelf, pattern):
+        start = time.perf_counter()
+        try:
+            shelf.search(pattern.text)
+            shown = {int(book.id) for book in shelf.snapshot()}
+        except Exception as error:
+            return Result(pattern.text, pattern.family, "search", time.perf_counter() - start, "error",
+                          str(error).splitlines()[0])
+        latency = time.perf_counter() - start
+        # The page the grid asked for, not the first one: the bookshelf starts at offset 12, a known bug
+        offset = int(shelf.query.get("offset", 0))
+        limit = int(shelf.query.get("limit", BookshelfPage.PAGE_SIZE))
+        expected = expected_ids(pattern.oracle or pattern.text, self.books)[offset:offset + limit]
+        return Result(pattern.text, pattern.family, "search", latency, *_compare(shown, set(expected)))
+
+    def _timed(self, client, text):
+        start = time.perf_counter()
+        try:
+            books, error = client.list(search=text, limit=ALL_BOOKS), None
+        except (ApiError, OSError) as caught:
+            books, error = None, caught
+        return time.perf_counter() - start, books, error
+
+    def _report(self, channel, baseline, results):
+        report = FuzzReport(channel, baseline, results)
+        self.reports.append(report)
+        return report
+
+
+def _compare(actual, expected):
+    if actual == expected:
+        return "ok", ""
+    missing, unexpected = sorted(expected - actual), sorted(actual - expected)
+    return "mismatch", f"missing {missing[:10]}, unexpected {unexpected[:10]}"
+
+
+def _compiles(text):
+    with warnings.catch_warnings():
+        # Python warns about "[[" and similar, which JavaScript reads literally
+        warnings.simplefilter("ignore")
+        try:
+            js_regexp(text)
+        except re.error:
+            return False
+    return True
+
+
+def _escape(text):
+    return "".join(f"\\{char}" if char in SPECIALS else char for char in text)
+
+
+def _escape_in_class(char):
+    return f"\\{char}" if char in "\\]^-" else char
+
+
+def _fragment(rng, titles, shortest=2, longest=8):
+    title = rng.choice(titles)
+    length = rng.randint(shortest, min(longest, len(title)))
+    start = rng.randint(0, len(title) - length)
+    return title[start:start + length]
+
+
+def _shuffle_case(rng, text):
+    return "".join(char.swapcase() if char.isascii() and rng.random() < 0.3 else char for char in text)
+
+
+def _class_of(rng, char):
+    if char.isascii() and char.isdigit():
+        return "\\d"
+    if char == " ":
+        return "\\s"
+    if char.isascii() and char.isalpha():
+        return rng.choice(["\\w", "[a-z]"])
+    return "."
+
+
+def _valid(rng, titles):
+    family = rng.choice(["literal", "wildcard", "anchor", "alternation", "quantifier", "class", "lookaround",
+                         "backreference", "absent"])
+    fragment = _fragment(rng, titles)
+    if family == "literal":
+        text = _escape(_shuffle_case(rng, fragment))
+    elif family == "wildcard":
+        positions = set(rng.sample(range(len(fragment)), min(2, len(fragment))))
+        text = "".join(rng.choice([".", _class_of(rng, char)]) if index in positions else _escape(char)
+                       for index, char in enumerate(fragment))
+    elif family == "anchor":
+        title = rng.choice(titles)
+        length = rng.randint(1, min(10, len(title)))
+        text = "^" + _escape(title[:length]) if rng.random() < 0.5 else _escape(title[-length:]) + "$"
+    elif family == "alternation":
+        options = [_escape(_fragment(rng, titles)) for _ in range(rng.randint(2, 3))]
+        text = "|".join(options) if rng.random() < 0.5 else f"(?:{'|'.join(options)})\\b"
+    elif family == "quantifier":
+        index = rng.randrange(len(fragment))
+        quantifier = rng.choice(["?", "*", "+", "{1,2}", "{0,3}"])
+        text = _escape(fragment[:index + 1]) + quantifier + _escape(fragment[index + 1:])
+    elif family == "class":
+        chars = sorted(set(fragment))
+        choice = rng.random()
+        if choice < 0.4:
+            text = "[" + "".join(_escape_in_class(char) for char in chars) + "]{2}"
+        elif choice < 0.7:
+            text = "[^" + "".join(_escape_in_class(char) for char in chars) + "]" + _escape(fragment[-1])
+        else:
+            word = rng.choice(re.findall(r"[A-Za-z0-9]+", rng.choice(titles)) or ["the"])
+            text = f"\\b{_escape(word)}\\b"
+    elif family == "lookaround":
+        title = rng.choice(titles)
+        first, second = _fragment(rng, [title]), _fragment(rng, [title])
+        choice = rng.random()
+        if choice < 0.4:
+            text = f"^(?=.*{_escape(first)})(?=.*{_escape(second)})"
+        elif choice < 0.7:
+            text = f"{_escape(first)}(?!{_escape(second)})"
+        else:
+            text = f"(?<={_escape(first[:-1])}){_escape(first[-1])}"
+    elif family == "backreference":
+        text = rng.choice(["(\\w)\\1", "([aeiou])\\1", "(\\w)(\\w)\\2\\1", "(.).*\\1", "(\\w+) \\1"])
+    else:
+        text = "".join(rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(rng.randint(4, 7)))
+    return Pattern(text, family)
+
+
+def _invalid(rng, titles):
+    fragment = _escape(_fragment(rng, titles))
+    family, text = rng.choice([
+        ("unclosed group", "(" + fragment),
+        ("unopened group", fragment + ")"),
+        ("unclosed class", "[" + fragment),
+        ("nothing to repeat", rng.choice("*+?") + fragment),
+        ("double quantifier", fragment + "**"),
+        ("trailing backslash", fragment + "\\"),
+        ("reversed range", fragment + "[z-a]"),
+        ("reversed count", fragment + "{3,1}"),
+        ("unknown group", "(?@" + fragment + ")"),
+    ])
+    return Pattern(text, family, valid=False)
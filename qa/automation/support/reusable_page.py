@@ -0,0 +1,67 @@
+"""A browser page shared by the tests of a module instead of one page per test.
+
+Tests in modules marked ``pytest.mark.reuse_page`` get the module's page
+back after the previous test. The app is only loaded once: on a shared page
+``BookshelfPage.goto()`` remounts the bookshelf through the Vue router and
+resets the Pinia stores and web storage (``pages.SOFT_RESET``) instead of
+reloading. Before every test a guard compares the page with how it looked
+after loading (``FINGERPRINT``); when a test left anything behind that the
+soft reset cannot undo, such as an extra element, a cookie, a new global or
+a different viewport, the page is replaced with a fresh one.
+"""
+from pages.pages import BookshelfPage
+
+# State that survives a soft reset and must therefore not change between tests
+FINGERPRINT = """() => ({
+    app: Boolean(document.querySelector('#app')?.__vue_app__),
+    head: document.head.children.length,
+    body: document.body.children.length,
+    globals: Object.keys(window).length,
+    cookie: document.cookie,
+    viewport: [window.innerWidth, window.innerHeight],
+})"""
+
+
+class ReusablePage:
+    def __init__(self, pool):
+        self.pool = pool
+        self.page = None
+        self.profile = None
+        self.baseline = None
+        self.fallbacks = 0
+
+    def checkout(self, prepare, profile):
+        """The shared page, replaced first when it leaked state or the network profile differs.
+
+        ``prepare(page)`` installs routes and scripts on a new page.
+        """
+        if self.page is not None and (self.profile != profile or self._leaked()):
+            self.fallbacks += 1
+            self._discard()
+        if self.page is None:
+            page = self.pool.acquire()
+            prepare(page)
+            profile.apply(page)
+            BookshelfPage(page).goto()
+            self.page, self.profile = page, profile
+            self.baseline = page.evaluate(FINGERPRINT)
+            BookshelfPage.SOFT_RESET_PAGES.add(page)
+        return self.page
+
+    def close(self):
+        if self.page is not None:
+            self._discard()
+
+    def _leaked(self):
+        if self.page.is_closed() or not self.page.url.startswith(BookshelfPage.URL):
+            return True
+        try:
+            return self.page.evaluate(FINGERPRINT) != self.baseline
+        except Exception:
+            # A crashed or navigating page cannot be trusted either
+            return True
+
+    def _discard(self):
+        BookshelfPage.SOFT_RESET_PAGES.discard(self.page)
+        self.pool.release(self.page)
+        self.page = None
@@ -0,0 +1,164 @@
+"""Soak runs: the bookshelf flows in a loop, watching memory and handles.
+
+``SoakRun`` repeats a flow until its duration is up and takes a ``Sample``
+every few iterations: the JS heap after a forced garbage collection, DOM
+nodes, event listeners and documents from the DevTools ``Performance``
+domain, plus the number of Playwright objects (pages, element and JS
+handles, requests...) the Python driver keeps alive. ``analyze`` fits a
+line through every metric; a metric grows without bound when the fitted
+growth over the run exceeds ``max_growth`` of its first value and it is
+still growing in the second half of the run, so memory that levels off
+after warming up does not count.
+"""
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from pages.pages import BookDetailsPage, BookshelfPage
+
+METRICS = ("js_heap_used", "dom_nodes", "listeners", "documents", "python_handles")
+CDP_METRICS = {"JSHeapUsedSize": "js_heap_used", "Nodes": "dom_nodes", "JSEventListeners": "listeners", "Documents": "documents"}
+
+SORTS = ["title", "author", "rating", "id"]
+SEARCHES = ["The", "^A", "s$", ""]
+
+
+@dataclass
+class Sample:
+    iteration: int
+    elapsed: float
+    js_heap_used: float
+    dom_nodes: float
+    listeners: float
+    documents: float
+    python_handles: Optional[int]
+
+
+class Sampler:
+    def __init__(self, page):
+        self.page = page
+        self.cdp = page.context.new_cdp_session(page)
+        self.cdp.send("Performance.enable")
+
+    def sample(self, iteration, elapsed):
+        # Only memory that survives a collection can be a leak
+        self.cdp.send("HeapProfiler.collectGarbage")
+        metrics = {CDP_METRICS[metric["name"]]: metric["value"]
+                   for metric in self.cdp.send("Performance.getMetrics")["metrics"]
+                   if metric["name"] in CDP_METRICS}
+        return Sample(iteration=iteration, elapsed=elapsed, python_handles=python_handles(self.page), **metrics)
+
+
+def python_handles(page):
+    """Playwright objects alive on the Python side of the connection of ``page``."""
+    connection = getattr(getattr(page, "_impl_obj", None), "_connection", None)
+    return len(connection._objects) if connection is not None else None
+
+
+def bookshelf_flow(shelf, iteration):
+    """One round of a kiosk session: sort, paginate, search and open a book, all without reloading."""
+    shelf.goto()
+    shelf.sort_by(SORTS[iteration % len(SORTS)])
+    shelf.go_to_next_page()
+    shelf.go_to_next_page()
+    shelf.search(SEARCHES[iteration % len(SEARCHES)])
+    # Reads the grid the way the tests do, keeping the handles, so a handle leak shows in python_handles
+    if shelf.get_book_elements():
+        shelf.click_book_by_index(0)
+        BookDetailsPage(shelf.page).snapshot()
+
+
+class SoakRun:
+    def __init__(self, page, duration, sample_every=5, max_growth=0.2):
+        self.page = page
+        self.duration = duration
+        self.sample_every = sample_every
+        self.max_growth = max_growth
+        self.report = None
+
+    def run(self, flow=None):
+        """Loops ``flow(iteration)`` (the bookshelf flow by default) and returns the analysis."""
+        shelf = BookshelfPage(self.page)
+        if flow is None:
+            shelf.goto()
+            # From here on goto() navigates inside the app, like a kiosk that is never reloaded
+            BookshelfPage.SOFT_RESET_PAGES.add(self.page)
+            flow = lambda iteration: bookshelf_flow(shelf, iteration)
+        sampler = Sampler(self.page)
+        samples = []
+        start = time.monotonic()
+        iteration = 0
+        while True:
+            elapsed = time.monotonic() - start
+            done = elapsed >= self.duration
+            if done or iteration % self.sample_every == 0:
+                samples.append(sampler.sample(iteration, elapsed))
+            if done:
+                break
+            flow(iteration)
+            iteration += 1
+        self.report = SoakReport(samples, analyze(samples, self.max_growth))
+        return self.report
+
+
+@dataclass
+class SoakReport:
+    samples: list
+    metrics: dict
+
+    @property
+    def leaks(self):
+        return [name for name, metric in self.metrics.items() if metric["unbounded"]]
+
+    def describe(self):
+        return "\n".join(
+            f"{name}: {metric['first']:.0f} -> {metric['last']:.0f} "
+            f"({metric['growth']:+.0%}, {metric['slope_per_iteration']:+.1f}/iteration)"
+            + (" grows without bound" if metric["unbounded"] else "")
+            for name, metric in self.metrics.items()
+        )
+
+    def to_dict(self):
+        return {
+            "metrics": self.metrics,
+            "leaks": self.leaks,
+            "samples": [asdict(sample) for sample in self.samples],
+        }
+
+
+def analyze(samples, max_growth=0.2):
+    """Growth of every metric over the samples; needs at least 4 samples for a verdict."""
+    analysis = {}
+    for name in METRICS:
+        points = [(sample.iteration, getattr(sample, name)) for sample in samples if getattr(sample, name) is not None]
+        if len(points) < 2:
+            continue
+        iterations = [x for x, _ in points]
+        values = [y for _, y in points]
+        slope_per_iteration = slope(iterations, values)
+        times = [sample.elapsed for sample in samples if getattr(sample, name) is not None]
+        first = values[0]
+        growth = slope_per_iteration * (iterations[-1] - iterations[0]) / max(abs(first), 1)
+        second_half = points[len(points) // 2:]
+        still_growing = len(points) >= 4 and slope(*zip(*second_half)) > 0.5 * slope_per_iteration > 0
+        analysis[name] = {
+            "first": first,
+            "last": values[-1],
+            "slope_per_iteration": slope_per_iteration,
+            "slope_per_minute": slope(times, values) * 60,
+            "growth": growth,
+            "unbounded": growth > max_growth and still_growing,
+        }
+    return analysis
+
+
+def slope(xs, ys):
+    """Least-squares slope of ``ys`` over ``xs``."""
+    xs = list(xs)
+    ys = list(ys)
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
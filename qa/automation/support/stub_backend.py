@@ -0,0 +1,101 @@
+"""In-process stand-in for the books API of ``qa/packages/server``.
+
+``StubBooksApi`` answers ``/api/books`` and ``/api/books/:id`` the way
+``BookStore`` does, including its quirks (the page is sliced before it is
+sorted, missing fields compare as ``"undefined"``), so the bug tests fail
+against the stub exactly as they do against the real server. Requests are
+served from memory through Playwright routing; a ``latency`` can be set to
+reproduce the delay of the real backend.
+"""
+import asyncio
+import json
+import re
+import time
+from functools import lru_cache
+from urllib.parse import parse_qs, urlparse
+
+from support.catalogue import collation_key, field_string, js_regexp, load_books
+
+API_ROUTE = re.compile(r"^http://localhost:3000/api/books(/[^?#]*)?([?#].*)?$")
+CORS_HEADERS = {"Access-Control-Allow-Origin": "http://localhost:5173"}
+CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+class StubBooksApi:
+    def __init__(self, books=None, latency: float = 0.0):
+        self.books = load_books() if books is None else books
+        self.latency = latency
+        self._keys = {}
+
+    def list(self, offset=None, limit=None, sort=None, order=None, search=None):
+        offset = _to_int(offset or 0)
+        limit = _to_int(limit or 100)
+        sort = sort or "id"
+        search = search or ".+"
+
+        regexp = _compile(search)
+        matches = [book for book in self.books if regexp.search(field_string(book, "title"))]
+        page = matches[offset:offset + limit]
+        descending = order is not None and order != "asc"
+        return sorted(page, key=lambda book: self._sort_key(book, sort), reverse=descending)
+
+    def get(self, book_id):
+        if not re.fullmatch(r"0|[1-9]\d*", str(book_id)) or int(book_id) >= len(self.books):
+            return None
+        return self.books[int(book_id)]
+
+    def respond(self, url):
+        """Returns ``(status, body)`` for a GET of ``url``, after the configured latency."""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(url)
+
+    def _respond(self, url):
+        url = urlparse(url)
+        book_id = url.path[len("/api/books"):].strip("/")
+        if book_id:
+            body = self.get(book_id)
+        else:
+            query = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+            try:
+                body = self.list(**{key: query.get(key) for key in ("offset", "limit", "sort", "order", "search")})
+            except re.error as error:
+                return 500, str(error)
+        return 200, "" if body is None else json.dumps(body, ensure_ascii=False)
+
+    def handle(self, route):
+        """Playwright route handler answering every request to the books API."""
+        status, body = self.respond(route.request.url)
+        route.fulfill(status=status, headers=CORS_HEADERS, content_type=CONTENT_TYPE, body=body)
+
+    async def handle_async(self, route):
+        """Async API counterpart of ``handle``; waits for the latency without blocking the loop."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        status, body = self._respond(route.request.url)
+        await route.fulfill(status=status, headers=CORS_HEADERS, content_type=CONTENT_TYPE, body=body)
+
+    def install(self, page_or_context):
+        page_or_context.route(API_ROUTE, self.handle)
+
+    async def install_async(self, page_or_context):
+        await page_or_context.route(API_ROUTE, self.handle_async)
+
+    def _sort_key(self, book, field):
+        key = (book["id"], field)
+        if key not in self._keys:
+            self._keys[key] = collation_key(field_string(book, field))
+        return self._keys[key]
+
+
+@lru_cache(maxsize=256)
+def _compile(search):
+    return js_regexp(search)
+
+
+def _to_int(value):
+    # Mirrors the unary plus plus slice() coercion: non-numbers behave like 0
+    try:
+        return int(float(value))
+    except (OverflowError, TypeError, ValueError):
+        return 0
@@ -0,0 +1,62 @@
+"""Serves a ``StubBooksApi`` over HTTP from a background thread.
+
+Lets clients that do not go through a browser, such as ``BooksApiClient``,
+run against the stub backend too.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from support.stub_backend import CONTENT_TYPE, CORS_HEADERS
+
+
+class StubServer:
+    def __init__(self, api, host="127.0.0.1", port=0):
+        self.api = api
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler(self):
+        api = self.api
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path.split("?")[0].rstrip("/") == "/api/books" or self.path.startswith("/api/books/"):
+                    status, body = api.respond(f"http://localhost:3000{self.path}")
+                else:
+                    status, body = 404, "Not Found"
+                data = body.encode("utf-8")
+                self.send_response(status)
+                for name, value in CORS_HEADERS.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
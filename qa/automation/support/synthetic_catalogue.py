@@ -0,0 +1,100 @@
+"""Generates catalogues of any size that look like ``dev-books.js``.
+
+Books are produced one at a time from a seeded generator, so the same seed
+always gives the same catalogue and a million books can be written without
+holding them in memory. Titles mix a few patterns (with and without a
+series suffix like ``(The Ember Saga, #2)``), ratings cluster around 4 like
+the real ones, and a small share of books has a ``null`` author or rating,
+as in the dev fixture. ``write_fixture`` writes a module the server loads
+in place of ``dev-books.js`` when started with ``BOOKS_FIXTURE``::
+
+    python -m support.synthetic_catalogue 100000 --seed 1 --out /tmp/books-100k.js
+    BOOKS_FIXTURE=/tmp/books-100k.js node qa/packages/server/index.js
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+ADJECTIVES = [
+    "Silent", "Golden", "Broken", "Hidden", "Last", "Lost", "Burning", "Secret", "Midnight", "Crimson",
+    "Forgotten", "Wild", "Glass", "Iron", "Little", "Dark", "Bright", "Winter", "Summer", "Hollow",
+]
+NOUNS = [
+    "Garden", "River", "Crown", "House", "Queen", "Storm", "Library", "Mountain", "Promise", "Kingdom",
+    "Shadow", "Letter", "Island", "Child", "Fire", "Road", "Sea", "Witch", "Orchard", "Star",
+]
+PLACES = ["Avalon", "Paris", "the North", "Brooklyn", "Winterfell", "the Valley", "Kyoto", "the Moors", "Eden", "Rome"]
+SERIES = ["Saga", "Chronicles", "Trilogy", "Series", "Cycle", "Quartet"]
+FIRST_NAMES = [
+    "Anna", "James", "Maria", "John", "Elena", "David", "Sofia", "Michael", "Laura", "Peter",
+    "Chloé", "Jürgen", "Ngozi", "Hiroshi", "Zoë", "Mateo", "Aoife", "Lars", "Priya", "Kwame",
+]
+LAST_NAMES = [
+    "Smith", "García", "Müller", "Rossi", "Novak", "Kowalski", "Okafor", "Tanaka", "O'Brien", "Dubois",
+    "Andersen", "Silva", "Nakamura", "Petrov", "Haddad", "Byrne", "Costa", "Ivanova", "Larsen", "Moreau",
+]
+COVER_URL = "https://i.gr-assets.com/images/S/compressed.photo.goodreads.com/books/{stamp}i/{id}._SY75_.jpg"
+PATH_URL = "https://www.goodreads.com/book/show/{id}.{slug}"
+
+# Share of books with a null author or rating, roughly as in the dev fixture
+NULL_AUTHOR = 0.01
+NULL_RATING = 0.02
+
+
+def generate_books(count, seed=0):
+    """Yields ``count`` books without ids, the same ones for the same seed."""
+    rng = random.Random(seed)
+    for index in range(count):
+        title = _title(rng)
+        book_id = 1_000_000 + index
+        yield {
+            "title": title,
+            "author": None if rng.random() < NULL_AUTHOR else f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "cover": COVER_URL.format(stamp=1_300_000_000 + rng.randrange(400_000_000), id=book_id),
+            "path": PATH_URL.format(id=book_id, slug="_".join(title.split()[:4])),
+            "rating": None if rng.random() < NULL_RATING else round(min(max(rng.gauss(4.0, 0.35), 1.0), 5.0), 2),
+        }
+
+
+def write_fixture(path, count, seed=0):
+    """Streams ``count`` books into a module in the format of ``dev-books.js``."""
+    with open(path, "w", encoding="utf-8") as fixture:
+        fixture.write("export const BOOKS = [\n")
+        for book in generate_books(count, seed):
+            fixture.write(json.dumps(book, ensure_ascii=False))
+            fixture.write(",\n")
+        fixture.write("];\n")
+    return Path(path)
+
+
+def _title(rng):
+    pattern = rng.random()
+    if pattern < 0.3:
+        title = f"The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    elif pattern < 0.5:
+        title = f"{rng.choice(NOUNS)} of {rng.choice(PLACES)}"
+    elif pattern < 0.7:
+        title = f"A {rng.choice(NOUNS)} for the {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    elif pattern < 0.85:
+        title = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}s"
+    else:
+        title = f"{rng.randrange(1, 1000)} {rng.choice(NOUNS)}s"
+    if rng.random() < 0.25:
+        title += f" (The {rng.choice(ADJECTIVES)} {rng.choice(SERIES)}, #{rng.randrange(1, 8)})"
+    return title
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m support.synthetic_catalogue")
+    parser.add_argument("count", type=int, help="Number of books to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator (default: 0).")
+    parser.add_argument("--out", required=True, help="Path of the module to write.")
+    args = parser.parse_args(argv)
+    print(write_fixture(args.out, args.count, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
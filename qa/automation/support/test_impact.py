@@ -0,0 +1,241 @@
+"""Which sources every test exercised, for running only the tests a change affects.
+
+While a test runs, ``ImpactRecorder`` collects the Vue components its pages
+mounted and the API endpoints they called. Components are reported by a
+stand-in for the Vue devtools hook (``COMPONENT_HOOK``), which the dev build
+of Vue notifies of every mounted component with its ``data-v-*`` scope and
+source file. ``dependencies`` turns that into files with content hashes:
+
+- every mounted component under ``qa/packages/frontend/src`` plus the
+  scripts it imports, following ``import`` statements but not into other
+  components, which count only when they were mounted themselves;
+- the app shell (``index.html``, ``src/main.js`` and its imports, the
+  frontend's package and build config) for tests that opened a page;
+- with the live backend, the server modules behind each endpoint called.
+  Every module imported from ``index.js`` counts for every endpoint except
+  the ones in ``ENDPOINT_ONLY``, which only run for some of them;
+- with the stub backend, the dev fixture (``catalogue.DEV_BOOKS``) it
+  answers every API call from;
+- the test module itself and every other Python file of the harness.
+
+A test is affected when any of its files changed or disappeared.
+"""
+import hashlib
+import re
+from pathlib import Path
+
+from pages.pages import API_URL
+from support.catalogue import DEV_BOOKS
+
+AUTOMATION_DIR = Path(__file__).resolve().parents[1]
+PACKAGES_DIR = AUTOMATION_DIR.parent / "packages"
+FRONTEND_DIR = PACKAGES_DIR / "frontend"
+FRONTEND_SRC = FRONTEND_DIR / "src"
+SERVER_DIR = PACKAGES_DIR / "server"
+REPO_DIR = AUTOMATION_DIR.parents[1]
+
+FRONTEND_CONFIG = ["index.html", "package.json", "vite.config.js"]
+FRONTEND_ENTRY = "src/main.js"
+SERVER_ENTRY = "index.js"
+
+# Server modules that only some endpoints run, although every endpoint's module imports them
+ENDPOINT_ONLY = {
+    "lib/utils/sort-by.js": {"GET /api/books"},
+}
+ENDPOINTS = ["GET /api/books", "GET /api/books/:id"]
+
+IMPORT = re.compile(r"""(?:\bimport|\bexport)\s*(?:[^'"`;]*?\bfrom\s*)?['"]([^'"]+)['"]""")
+BOOK_PATH = re.compile(r"^/api/books/[^/]+$")
+
+# Installed before the app loads, so Vue picks it up as the devtools hook
+COMPONENT_HOOK = """(() => {
+    const previous = window.__VUE_DEVTOOLS_GLOBAL_HOOK__;
+    window.__VUE_DEVTOOLS_GLOBAL_HOOK__ = {
+        ...previous,
+        emit(event, ...args) {
+            const type = event === 'component:added' && args[3]?.type;
+            if (type && (type.__file || type.__name) && window.__e2eComponentMounted) {
+                window.__e2eComponentMounted({scope: type.__scopeId || null, file: type.__file || null, name: type.__name || null});
+            }
+            previous?.emit?.(event, ...args);
+        },
+        on(...args) { previous?.on?.(...args); },
+        once(...args) { previous?.once?.(...args); },
+        off(...args) { previous?.off?.(...args); },
+    };
+})()"""
+
+_current = None
+
+
+class ImpactRecorder:
+    def __init__(self):
+        self.components = set()
+        self.endpoints = set()
+
+    def start(self):
+        global _current
+        _current = self
+        return self
+
+    def stop(self):
+        global _current
+        if _current is self:
+            _current = None
+
+    def begin(self):
+        """Forgets what the previous test used."""
+        self.components = set()
+        self.endpoints = set()
+
+    def watch(self, page):
+        """Records the components and requests of a page that has not loaded the app yet."""
+        page.expose_binding("__e2eComponentMounted", lambda source, component: self.add_component(component))
+        page.add_init_script(COMPONENT_HOOK)
+        page.on("request", self.add_request)
+
+    async def watch_async(self, context):
+        await context.expose_binding("__e2eComponentMounted", lambda source, component: self.add_component(component))
+        await context.add_init_script(COMPONENT_HOOK)
+        context.on("request", self.add_request)
+
+    def add_component(self, component):
+        self.components.add((component.get("scope"), component.get("file"), component.get("name")))
+
+    def add_request(self, request):
+        name = endpoint(request.method, request.url)
+        if name:
+            self.endpoints.add(name)
+
+
+def current():
+    return _current
+
+
+def endpoint(method, url):
+    """``GET /api/books`` or ``GET /api/books/:id`` for API requests, ``None`` for anything else."""
+    if not url.startswith(API_URL):
+        return None
+    path = "/" + url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0].rstrip("/")
+    return f"{method} /api/books/:id" if BOOK_PATH.match(path) else f"{method} /api/books"
+
+
+def component_source(file, name):
+    """The path under ``frontend/src`` of a mounted component, from its ``__file`` or its name."""
+    if file and "/src/" in file.replace("\\", "/"):
+        path = FRONTEND_SRC / file.replace("\\", "/").split("/src/", 1)[1]
+        if path.exists():
+            return path
+    if name:
+        return next(iter(sorted(FRONTEND_SRC.rglob(f"{name}.vue"))), None)
+    return None
+
+
+def imports(path):
+    """The local modules ``path`` imports, resolving ``@/`` to ``src`` and directories to their index."""
+    found = []
+    for specifier in IMPORT.findall(path.read_text(encoding="utf-8")):
+        if specifier.startswith("@/"):
+            target = FRONTEND_SRC / specifier[2:]
+        elif specifier.startswith("."):
+            target = path.parent / specifier
+        else:
+            # A package from node_modules
+            continue
+        for candidate in (target, target.with_name(target.name + ".js"), target / "index.js"):
+            if candidate.is_file():
+                found.append(candidate.resolve())
+                break
+    return found
+
+
+def script_closure(path, follow_components=False):
+    """``path`` and every script it imports, directly or not; components are followed only if asked to."""
+    seen = set()
+    pending = [Path(path).resolve()]
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        pending.extend(
+            imported for imported in imports(module)
+            if follow_components or imported.suffix != ".vue"
+        )
+    return seen
+
+
+def frontend_files(components):
+    """The app shell, root component included, plus every mounted component with the scripts it imports."""
+    files = {FRONTEND_DIR / name for name in FRONTEND_CONFIG if (FRONTEND_DIR / name).exists()}
+    files |= script_closure(FRONTEND_DIR / FRONTEND_ENTRY)
+    # The root component mounts once per page; a soft reset keeps it, so later tests never see it mount
+    for root in imports(FRONTEND_DIR / FRONTEND_ENTRY):
+        if root.suffix == ".vue":
+            files |= script_closure(root)
+    for scope, file, name in components:
+        source = component_source(file, name)
+        if source:
+            files |= script_closure(source)
+    return files
+
+
+def server_files(endpoints):
+    """The server modules that run for the given endpoints."""
+    if not endpoints:
+        return set()
+    files = {SERVER_DIR / "package.json"}
+    for module in script_closure(SERVER_DIR / SERVER_ENTRY, follow_components=True):
+        only = ENDPOINT_ONLY.get(module.relative_to(SERVER_DIR).as_posix())
+        if only is None or only & set(endpoints):
+            files.add(module)
+    return files
+
+
+def harness_files():
+    """The Python files every test runs through: everything outside ``tests`` and ``benchmarks``."""
+    return {
+        path for path in AUTOMATION_DIR.rglob("*.py")
+        if path.relative_to(AUTOMATION_DIR).parts[0] not in ("tests", "benchmarks")
+    } | {AUTOMATION_DIR / "requirements.txt"}
+
+
+def dependencies(test_file, components=(), endpoints=(), browser=False, stub=False):
+    """``{path relative to the repo: content hash}`` of everything a test depended on."""
+    files = harness_files() | {Path(test_file).resolve()}
+    if browser or components:
+        files |= frontend_files(components)
+    files |= server_files(endpoints)
+    if stub:
+        files.add(DEV_BOOKS)
+    return {_relative(path): file_hash(path) for path in sorted(files) if path.exists()}
+
+
+def scopes(components):
+    """``{data-v-* scope: source}`` of the mounted components that have a scope."""
+    mapping = {}
+    for scope, file, name in components:
+        source = component_source(file, name)
+        if scope and source:
+            mapping[scope] = _relative(source)
+    return mapping
+
+
+def changed(files):
+    """The files among ``{path: hash}`` whose content is different now or that are gone."""
+    return sorted(path for path, digest in files.items() if file_hash(REPO_DIR / path) != digest)
+
+
+_hashes = {}
+
+
+def file_hash(path):
+    """SHA-256 of a file's content, computed once per run; ``None`` for a missing file."""
+    path = Path(path).resolve()
+    if path not in _hashes:
+        _hashes[path] = hashlib.sha256(path.read_bytes()).hexdigest() if path.is_file() else None
+    return _hashes[path]
+
+
+def _relative(path):
+    return Path(path).resolve().relative_to(REPO_DIR).as_posix()
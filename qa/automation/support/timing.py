@@ -0,0 +1,234 @@
+"""Per-test timelines of page-object actions and network responses.
+
+Page-object methods are decorated with ``timed(phase)``. While a ``Timeline``
+is active every call is recorded as a span, nested spans keep their parent
+so time can be attributed to the innermost one, and ``watch`` adds the
+requests of a page or browser context. ``set_listener`` reports the same
+actions to one more observer, such as the flight recorder of
+``support.flight_recorder``. When neither is active the decorator only
+costs two global lookups.
+
+Time inside a test is split into phases: ``navigation`` (loading a URL),
+``network`` (an action waiting for the API response it triggered),
+``render`` (waiting for the grid or details view to show the data) and
+``idle`` (time spent outside any action).
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+PHASES = ("navigation", "network", "render", "idle")
+
+_current = None
+_listener = None
+_stack = contextvars.ContextVar("timing_stack", default=())
+
+
+@dataclass
+class Span:
+    name: str
+    phase: str
+    start: float
+    duration: float = 0.0
+    parent: Optional[int] = None
+    children: float = 0.0
+
+    @property
+    def self_time(self):
+        return max(self.duration - self.children, 0.0)
+
+
+@dataclass
+class Response:
+    url: str
+    method: str
+    status: Optional[int]
+    start: float
+    duration: float
+
+
+@dataclass
+class Timeline:
+    nodeid: str
+    spans: list = field(default_factory=list)
+    responses: list = field(default_factory=list)
+    duration: float = 0.0
+    _origin: float = field(default_factory=time.perf_counter, repr=False)
+    _wall_origin: float = field(default_factory=time.time, repr=False)
+    _statuses: dict = field(default_factory=dict, repr=False)
+
+    def start(self):
+        global _current
+        self._origin = time.perf_counter()
+        self._wall_origin = time.time()
+        _current = self
+        return self
+
+    def restart(self):
+        """Starts measuring again from now, dropping what was recorded so far, e.g. during setup."""
+        self.spans.clear()
+        self.responses.clear()
+        return self.start()
+
+    def stop(self):
+        global _current
+        self.duration = self.now()
+        if _current is self:
+            _current = None
+
+    def now(self):
+        return time.perf_counter() - self._origin
+
+    def watch(self, target):
+        """Records every request finished or failed by a page or browser context."""
+        target.on("response", self._add_status)
+        target.on("requestfinished", self._add_response)
+        target.on("requestfailed", self._add_response)
+
+    def unwatch(self, target):
+        target.remove_listener("response", self._add_status)
+        target.remove_listener("requestfinished", self._add_response)
+        target.remove_listener("requestfailed", self._add_response)
+
+    def phases(self):
+        totals = dict.fromkeys(PHASES, 0.0)
+        for span in self.spans:
+            totals[span.phase] += span.self_time
+        totals["idle"] = max(self.duration - _covered([span for span in self.spans if span.parent is None]), 0.0)
+        return totals
+
+    def stacks(self):
+        """Self time per ``test;action;...`` stack, in microseconds."""
+        root = self.nodeid.replace(";", ",")
+        stacks = {}
+        for index, span in enumerate(self.spans):
+            frames = []
+            while index is not None:
+                frames.append(self.spans[index].name)
+                index = self.spans[index].parent
+            key = ";".join([root, *reversed(frames)])
+            stacks[key] = stacks.get(key, 0) + int(span.self_time * 1e6)
+        stacks[f"{root};(idle)"] = int(self.phases()["idle"] * 1e6)
+        return {key: value for key, value in stacks.items() if value > 0}
+
+    def to_dict(self):
+        return {
+            "nodeid": self.nodeid,
+            "duration": self.duration,
+            "phases": self.phases(),
+            "actions": [
+                {"name": span.name, "phase": span.phase, "start": span.start, "duration": span.duration,
+                 "self": span.self_time, "parent": span.parent}
+                for span in self.spans
+            ],
+            "responses": [asdict(response) for response in self.responses],
+            "stacks": self.stacks(),
+        }
+
+    def _add_status(self, response):
+        self._statuses[response.request] = response.status
+
+    def _add_response(self, request):
+        timing = request.timing
+        start = timing["startTime"] / 1000 - self._wall_origin if timing.get("startTime", -1) > 0 else self.now()
+        end = timing.get("responseEnd", -1)
+        self.responses.append(Response(
+            url=request.url,
+            method=request.method,
+            status=self._statuses.pop(request, None),
+            start=start,
+            duration=end / 1000 if end >= 0 else max(self.now() - start, 0.0),
+        ))
+
+
+def current():
+    return _current
+
+
+def timed(phase):
+    """Records calls of the decorated page-object method as spans of ``phase``."""
+
+    def decorator(method):
+        name = method.__name__
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(*args, **kwargs):
+                if _current is None and _listener is None:
+                    return await method(*args, **kwargs)
+                with _recording(name, phase):
+                    return await method(*args, **kwargs)
+        else:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                if _current is None and _listener is None:
+                    return method(*args, **kwargs)
+                with _recording(name, phase):
+                    return method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_listener(listener):
+    """Also reports every action to ``listener.action_started(name, phase)`` and
+    ``listener.action_finished(name, phase, error)``; ``None`` removes it."""
+    global _listener
+    _listener = listener
+
+
+@contextlib.contextmanager
+def _recording(name, phase):
+    timeline = _current
+    listener = _listener
+    if listener is not None:
+        listener.action_started(name, phase)
+    if timeline is not None:
+        span, token = _enter(timeline, name, phase)
+    error = None
+    try:
+        yield
+    except BaseException as raised:
+        error = raised
+        raise
+    finally:
+        if timeline is not None:
+            _exit(timeline, span, token)
+        if listener is not None:
+            listener.action_finished(name, phase, error)
+
+
+def _enter(timeline, name, phase):
+    stack = _stack.get()
+    parent = stack[-1] if stack else None
+    timeline.spans.append(Span(name, phase, timeline.now(), parent=parent))
+    index = len(timeline.spans) - 1
+    return index, _stack.set(stack + (index,))
+
+
+def _exit(timeline, index, token):
+    _stack.reset(token)
+    span = timeline.spans[index]
+    span.duration = timeline.now() - span.start
+    if span.parent is not None:
+        timeline.spans[span.parent].children += span.duration
+
+
+def _covered(spans):
+    """Total length of the union of the spans' intervals, for overlapping async actions."""
+    total = 0.0
+    end = None
+    for span in sorted(spans, key=lambda span: span.start):
+        stop = span.start + span.duration
+        if end is None or span.start > end:
+            total += span.duration
+            end = stop
+        elif stop > end:
+            total += stop - end
+            end = stop
+    return total
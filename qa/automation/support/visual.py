@@ -0,0 +1,253 @@
+"""Screenshot comparison against stored baselines, tile by tile.
+
+Both images are cut into ``TILE`` x ``TILE`` tiles and every tile gets a
+perceptual signature in one pass over the image: an ``CELLS`` x ``CELLS``
+thumbnail of luminance means and a 64-bit hash of which cells are brighter
+than the tile's mean. A tile is unchanged when its hash differs in at most
+``HASH_DISTANCE`` bits and no thumbnail cell moved by more than
+``CELL_TOLERANCE`` levels. Anti-aliasing and subpixel noise stay under
+both, so most tiles are rejected at this step. Only the remaining tiles
+are compared pixel by pixel, all in one array operation: a pixel changed
+when one of its channels moved by more than ``PIXEL_THRESHOLD``.
+
+``compare_files`` is what the process pool runs. It decodes both PNGs
+(the baseline is cached per worker) and compares them. Baselines are only
+written when asked to update them; a missing one fails and the screenshot
+is kept next to the diffs. When the images differ, it writes a compact
+artifact: the bounding box of the changed tiles, as baseline, actual and
+the changes in red side by side.
+"""
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+AUTOMATION_DIR = Path(__file__).resolve().parents[1]
+BASELINE_DIR = AUTOMATION_DIR / "visual-baselines"
+
+TILE = 64
+CELLS = 8
+HASH_DISTANCE = 2
+CELL_TOLERANCE = 2.0
+# A cell is "bright" only this many levels above its tile's mean, so flat tiles hash the same despite noise
+HASH_CONTRAST = 4.0
+PIXEL_THRESHOLD = 24
+FAILING = ("missing", "changed", "size", "error")
+
+# Waits until web fonts are in and two frames were painted after the last style change
+SETTLED = """() => document.fonts.ready.then(() => new Promise(resolve =>
+    requestAnimationFrame(() => requestAnimationFrame(resolve))))"""
+
+
+@dataclass
+class Signature:
+    hashes: np.ndarray
+    thumbnails: np.ndarray
+
+
+@dataclass
+class Comparison:
+    status: str
+    size: tuple
+    tiles: int = 0
+    candidates: int = 0
+    changed_tiles: list = field(default_factory=list)
+    changed_pixels: int = 0
+    ratio: float = 0.0
+
+    @property
+    def box(self):
+        """``(top, left, bottom, right)`` in pixels around every changed tile, or ``None``."""
+        if not self.changed_tiles:
+            return None
+        rows = [row for row, _ in self.changed_tiles]
+        columns = [column for _, column in self.changed_tiles]
+        height, width = self.size
+        return (min(rows) * TILE, min(columns) * TILE,
+                min((max(rows) + 1) * TILE, height), min((max(columns) + 1) * TILE, width))
+
+
+def luminance(image):
+    return image[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def signature(image):
+    """Hashes ``(rows, columns)`` and thumbnails ``(rows, columns, CELLS, CELLS)`` of every tile."""
+    gray = _tiled(luminance(image))
+    rows, columns = gray.shape[0] // TILE, gray.shape[1] // TILE
+    block = TILE // CELLS
+    thumbnails = gray.reshape(rows, CELLS, block, columns, CELLS, block).mean(axis=(2, 5)).transpose(0, 2, 1, 3)
+    bright = thumbnails > thumbnails.mean(axis=(2, 3), keepdims=True) + HASH_CONTRAST
+    hashes = np.packbits(bright.reshape(rows, columns, CELLS * CELLS), axis=-1).view(">u8")[..., 0]
+    return Signature(hashes, thumbnails)
+
+
+def candidate_tiles(baseline, actual):
+    """Tiles whose signatures differ: a boolean ``(rows, columns)`` array."""
+    differing_bits = np.unpackbits((baseline.hashes ^ actual.hashes).astype(">u8").view(np.uint8).reshape(
+        *baseline.hashes.shape, 8), axis=-1).sum(axis=-1)
+    drift = np.abs(baseline.thumbnails - actual.thumbnails).max(axis=(2, 3))
+    return (differing_bits > HASH_DISTANCE) | (drift > CELL_TOLERANCE)
+
+
+def changed_pixels(baseline, actual):
+    """Boolean mask of the pixels where a channel moved by more than ``PIXEL_THRESHOLD``."""
+    return (np.abs(baseline.astype(np.int16) - actual.astype(np.int16)) > PIXEL_THRESHOLD).any(axis=-1)
+
+
+def compare(baseline, actual, max_diff=0.001, baseline_signature=None):
+    """Compares two ``(height, width, channels)`` images; fails above ``max_diff`` changed pixels."""
+    if baseline.shape[:2] != actual.shape[:2]:
+        return Comparison("size", actual.shape[:2])
+    baseline, actual = baseline[..., :3], actual[..., :3]
+    candidates = candidate_tiles(baseline_signature or signature(baseline), signature(actual))
+    rows, columns = np.nonzero(candidates)
+    counts = changed_pixels(_tiles(baseline)[rows, columns], _tiles(actual)[rows, columns]).sum(axis=(1, 2))
+    changed = [(int(row), int(column)) for row, column, count in zip(rows, columns, counts) if count]
+    pixels = int(counts.sum())
+    ratio = pixels / (actual.shape[0] * actual.shape[1])
+    return Comparison(
+        "changed" if changed and ratio > max_diff else "match", actual.shape[:2],
+        tiles=candidates.size, candidates=len(rows), changed_tiles=changed, changed_pixels=pixels, ratio=ratio,
+    )
+
+
+def artifact(baseline, actual, comparison):
+    """Baseline, actual and the changed pixels in red, cropped to the changed tiles, side by side."""
+    top, left, bottom, right = comparison.box
+    before, after = baseline[top:bottom, left:right, :3], actual[top:bottom, left:right, :3]
+    highlight = np.repeat((luminance(after) * 0.3 + 170).astype(np.uint8)[..., None], 3, axis=-1)
+    highlight[changed_pixels(before, after)] = (255, 0, 0)
+    gap = np.full((bottom - top, 4, 3), 255, dtype=np.uint8)
+    return np.concatenate([before, gap, after, gap, highlight], axis=1)
+
+
+def compare_files(name, actual_png, baseline_dir, diff_dir, update=False, max_diff=0.001):
+    """Compares a screenshot with its baseline, in a pool worker; returns a JSON-able result."""
+    baseline_path = Path(baseline_dir) / f"{file_name(name)}.png"
+    if update:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        existed = baseline_path.exists()
+        baseline_path.write_bytes(actual_png)
+        return {"name": name, "status": "updated" if existed else "new", "baseline": str(baseline_path)}
+    if not baseline_path.exists():
+        path = Path(diff_dir) / f"{file_name(name)}.actual.png"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(actual_png)
+        return {"name": name, "status": "missing", "baseline": str(baseline_path), "artifact": str(path)}
+    stat = baseline_path.stat()
+    baseline, baseline_signature = _baseline(str(baseline_path), stat.st_mtime_ns, stat.st_size)
+    actual = decode(actual_png)
+    comparison = compare(baseline, actual, max_diff, baseline_signature)
+    result = {"name": name, "baseline": str(baseline_path), **asdict(comparison)}
+    if comparison.status in FAILING:
+        diff_dir = Path(diff_dir)
+        diff_dir.mkdir(parents=True, exist_ok=True)
+        if comparison.status == "size":
+            path = diff_dir / f"{file_name(name)}.actual.png"
+            path.write_bytes(actual_png)
+        else:
+            path = diff_dir / f"{file_name(name)}.diff.png"
+            path.write_bytes(encode(artifact(baseline, actual, comparison)))
+        result["artifact"] = str(path)
+        (diff_dir / f"{file_name(name)}.json").write_text(json.dumps(result, indent=2))
+    return result
+
+
+def file_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-")
+
+
+def describe(result):
+    if result["status"] == "error":
+        return f"{result['name']}: comparison failed, {result['detail']}"
+    if result["status"] == "missing":
+        return (f"{result['name']}: no baseline at {result['baseline']}, record it with --visual-update "
+                f"(screenshot in {result['artifact']})")
+    if result["status"] == "size":
+        return f"{result['name']}: size changed to {result['size'][1]}x{result['size'][0]}, see {result['artifact']}"
+    return (f"{result['name']}: {result['changed_pixels']} pixels ({result['ratio']:.2%}) changed in "
+            f"{len(result['changed_tiles'])} of {result['tiles']} tiles, see {result['artifact']}")
+
+
+def decode(png):
+    from PIL import Image
+
+    with Image.open(BytesIO(png)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def encode(array):
+    from PIL import Image
+
+    output = BytesIO()
+    Image.fromarray(array).save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+@lru_cache(maxsize=32)
+def _baseline(path, mtime_ns, size):
+    image = decode(Path(path).read_bytes())
+    return image, signature(image)
+
+
+def _tiled(array):
+    """``array`` padded with zeros to whole tiles."""
+    height, width = array.shape[:2]
+    padding = [(0, -height % TILE), (0, -width % TILE)] + [(0, 0)] * (array.ndim - 2)
+    return np.pad(array, padding)
+
+
+def _tiles(image):
+    """A ``(rows, columns, TILE, TILE, channels)`` view of a padded image."""
+    padded = _tiled(image)
+    rows, columns = padded.shape[0] // TILE, padded.shape[1] // TILE
+    return padded.reshape(rows, TILE, columns, TILE, padded.shape[2]).transpose(0, 2, 1, 3, 4)
+
+
+class VisualChecker:
+    """Screenshot checks of one test; comparisons run in the pool while the test goes on."""
+
+    def __init__(self, pool, baseline_dir=BASELINE_DIR, diff_dir="visual-diffs", update=False, max_diff=0.001):
+        self.pool = pool
+        self.baseline_dir = str(baseline_dir)
+        self.diff_dir = str(diff_dir)
+        self.update = update
+        self.max_diff = max_diff
+        self.pending = []
+        self.results = []
+
+    def check(self, name, png):
+        """Compares PNG bytes with the baseline ``name``, without waiting for the result."""
+        self.pending.append((name, self.pool.submit(
+            compare_files, name, png, self.baseline_dir, self.diff_dir, self.update, self.max_diff,
+        )))
+
+    def capture(self, name, target, **options):
+        """Screenshots a page or locator once it has settled and checks it."""
+        page = getattr(target, "page", target)
+        page.wait_for_load_state("networkidle")
+        page.evaluate(SETTLED)
+        self.check(name, target.screenshot(animations="disabled", caret="hide", **options))
+
+    def wait(self):
+        """Results of every check so far, in the order they were made."""
+        results = []
+        for name, future in self.pending:
+            try:
+                results.append(future.result())
+            except Exception as error:
+                results.append({"name": name, "status": "error", "detail": f"{type(error).__name__}: {error}"})
+        self.pending = []
+        self.results.extend(results)
+        return results
+
+
+def default_workers():
+    # One core stays with the browser and the test itself
+    return max(1, (os.cpu_count() or 2) - 1)
@@ -0,0 +1,22 @@
+class TestBooksApiContract:
+    """Contract tests of /api/books, run without a browser"""
+
+    def test_get_returns_the_book_with_that_id(self, api_client):
+        book = api_client.get(3)
+        assert book["id"] == 3
+
+    def test_get_unknown_book_returns_empty_body(self, api_client):
+        assert api_client.get(100_000) is None
+
+    def test_list_respects_limit(self, api_client):
+        assert len(api_client.list(limit=5)) == 5
+
+    def test_paging_visits_every_titled_book_once(self, api_client):
+        ids = [book["id"] for book in api_client.iter_books(page_size=12)]
+        assert len(ids) == len(set(ids)), "No book should be listed twice"
+        assert len(ids) > 12, "Paging should go past the first page"
+
+    def test_bulk_get_matches_single_gets(self, api_client):
+        ids = [book["id"] for book in api_client.iter_books(page_size=50)]
+        books = api_client.get_many(ids)
+        assert [book["id"] for book in books] == ids
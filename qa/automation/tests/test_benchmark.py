@@ -0,0 +1,43 @@
+import json
+
+from support.benchmark import Benchmark, compare, growth, load, save, stats
+
+
+def test_warmup_rounds_are_not_timed():
+    calls = []
+    bench = Benchmark(rounds=5, warmup=2)
+    result = bench.run("flow", lambda: calls.append("flow"), setup=lambda: calls.append("setup"))
+    assert calls == ["setup", "flow"] * 7
+    assert result["rounds"] == 5
+    assert bench.results == {"flow": result}
+
+
+def test_stats():
+    assert stats([0.3, 0.1, 0.2, 0.5, 0.4]) == {"rounds": 5, "min": 0.1, "median": 0.3, "p95": 0.48, "max": 0.5}
+
+
+def test_baselines_round_trip(tmp_path):
+    path = save({"load_bookshelf": stats([0.2])}, name="abc1234", directory=tmp_path)
+    assert json.loads(path.read_text())["revision"] == "abc1234"
+    assert load("abc1234", directory=tmp_path) == {"load_bookshelf": stats([0.2])}
+
+
+def test_only_slowdowns_beyond_the_threshold_regress():
+    base = {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}, "gone": {"median": 1.0}}
+    head = {"a": {"median": 1.05}, "b": {"median": 1.2}, "c": {"median": 0.5}, "new": {"median": 1.0}}
+    rows, regressions = compare(base, head, threshold=0.1)
+    assert [row[0] for row in rows] == ["a", "b", "c"]
+    assert regressions == ["b"]
+
+
+def test_growth_is_relative_to_the_smallest_catalogue():
+    results = {
+        "search@100000": {"median": 0.5},
+        "search@10000": {"median": 0.1},
+        "sort_by[title]@10000": {"median": 0.2},
+        "load_bookshelf": {"median": 1.0},
+    }
+    assert growth(results) == {
+        "search": [(10000, 0.1, 1.0), (100000, 0.5, 5.0)],
+        "sort_by[title]": [(10000, 0.2, 1.0)],
+    }
@@ -21,7 +21,7 @@ class TestBookIDDisplayBug:
         page.wait_for_load_state('networkidle')
         
         # Get the first book and click on it
-        books = shelf.get_book_elements()
+        books = shelf.snapshot()
         
         # Skip test if no books are loaded (backend issue)
         if len(books) == 0:
@@ -41,14 +41,13 @@ class TestBookIDDisplayBug:
         assert book_id.isdigit(), f"Book ID should be a number, got: {book_id}"
         
         # Get book information from frontend
-        title = page.text_content('h1[data-v-2dd5deba]')
-        author = page.text_content('h2 em')
-        rating = page.text_content('div:has-text("User rating")')
+        book = BookDetailsPage(page).snapshot()
+        title, author, rating = book.title, book.author, book.rating
         
         # Check that basic information is displayed
-        assert title and title.strip() != '', "Book title should be displayed"
-        assert author and author.strip() != '', "Book author should be displayed"
-        assert rating and 'User rating' in rating, "Book rating should be displayed"
+        assert title, "Book title should be displayed"
+        assert author, "Book author should be displayed"
+        assert rating is not None, "Book rating should be displayed"
         
         # THE ACTUAL BUG: Book ID is not displayed on the frontend
         # Check for ID information in the page content
@@ -80,7 +79,7 @@ class TestBookIDDisplayBug:
         page.wait_for_load_state('networkidle')
         
         # Get the first book and click on it
-        books = shelf.get_book_elements()
+        books = shelf.snapshot()
         
         # Skip test if no books are loaded (backend issue)
         if len(books) == 0:
@@ -115,7 +114,7 @@ class TestBookIDDisplayBug:
         page.wait_for_load_state('networkidle')
         
         # Get the first book and click on it
-        books = shelf.get_book_elements()
+        books = shelf.snapshot()
         
         # Skip test if no books are loaded (backend issue)
         if len(books) == 0:
@@ -128,14 +127,12 @@ class TestBookIDDisplayBug:
         page.wait_for_url("**/books/*")
         
         # Get book information from frontend
-        title = page.text_content('h1[data-v-2dd5deba]')
-        author = page.text_content('h2 em')
-        rating = page.text_content('div:has-text("User rating")')
+        book = BookDetailsPage(page).snapshot()
         
         # Check that all expected information sections are present
-        assert title and title.strip() != '', "Book title should be displayed"
-        assert author and author.strip() != '', "Book author should be displayed"
-        assert rating and 'User rating' in rating, "Book rating should be displayed"
+        assert book.title, "Book title should be displayed"
+        assert book.author, "Book author should be displayed"
+        assert book.rating is not None, "Book rating should be displayed"
         
         # Check for additional information that should be present
         page_content = page.content()
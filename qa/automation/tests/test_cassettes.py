@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+from support.cassettes import Cassette, request_key
+
+
+class FakeRoute:
+    def __init__(self, url, body=b""):
+        self.request = SimpleNamespace(method="GET", url=url)
+        self.response = SimpleNamespace(status=200, headers={"content-type": "image/jpeg", "content-length": "3"}, body=lambda: body)
+        self.fulfilled = None
+        self.aborted = None
+
+    def fetch(self):
+        return self.response
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+    def abort(self, error_code=None):
+        self.aborted = error_code
+
+
+class AsyncRoute(FakeRoute):
+    async def fetch(self):
+        return SimpleNamespace(status=200, headers={"content-type": "image/jpeg"}, body=self._body)
+
+    async def _body(self):
+        return self.response.body()
+
+    async def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, matcher, handler):
+        self.routes.append((matcher, handler))
+
+
+def test_query_parameters_are_sorted_in_keys():
+    first = request_key("get", "http://localhost:3000/api/books?sort=title&offset=12")
+    second = request_key("GET", "http://localhost:3000/api/books?offset=12&sort=title")
+    assert first == second == "GET localhost:3000/api/books?offset=12&sort=title"
+
+
+def test_recorded_responses_are_replayed(tmp_path):
+    path = tmp_path / "cassette.json.gz"
+    recorder = Cassette(path, "record")
+    recorder.record(FakeRoute("https://i.gr-assets.com/cover.jpg", b"\xff\xd8\xff"))
+    recorder.save()
+
+    assert Cassette.age(path) is not None
+    route = FakeRoute("https://i.gr-assets.com/cover.jpg")
+    Cassette(path, "replay").replay(route)
+    assert route.fulfilled["body"] == b"\xff\xd8\xff"
+    assert "content-length" not in route.fulfilled["headers"]
+
+
+def test_unrecorded_requests_fail_like_offline(tmp_path):
+    path = tmp_path / "cassette.json.gz"
+    Cassette(path, "record").save()
+    route = FakeRoute("https://i.gr-assets.com/other.jpg")
+    Cassette(path, "replay").replay(route)
+    assert route.aborted == "internetdisconnected"
+
+
+def test_async_contexts_record_and_replay_cover_images(tmp_path):
+    path = tmp_path / "cassette.json.gz"
+    recorder, context = Cassette(path, "record"), FakeContext()
+    asyncio.run(recorder.install_async(context, include_api=False))
+    matches, handler = context.routes[0]
+    assert matches("https://i.gr-assets.com/cover.jpg") and not matches("http://localhost:3000/api/books")
+    asyncio.run(handler(AsyncRoute("https://i.gr-assets.com/cover.jpg", b"\xff\xd8\xff")))
+    recorder.save()
+
+    context = FakeContext()
+    asyncio.run(Cassette(path, "replay").install_async(context))
+    route = AsyncRoute("https://i.gr-assets.com/cover.jpg")
+    asyncio.run(context.routes[0][1](route))
+    assert route.fulfilled["body"] == b"\xff\xd8\xff"
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from pages.async_pages import AsyncBookDetailsPage, AsyncBookshelfPage
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+# Upper bound of pages open at the same time in one context
+MAX_OPEN_PAGES = 16
+
+SEARCH_PATTERNS = ["The", "Harry", "^A", "s$", "\\d", "The.*Golden", "(Saga|Series)", "zzz"]
+
+async def run_bounded(context, scenario, items):
+    """Runs ``scenario(page, item)`` for every item, each on its own page, at most MAX_OPEN_PAGES at once."""
+    semaphore = asyncio.Semaphore(MAX_OPEN_PAGES)
+
+    async def run(item):
+        async with semaphore:
+            page = await context.new_page()
+            try:
+                return await scenario(page, item)
+            finally:
+                await page.close()
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+class TestConcurrentPages:
+    """Catalogue-wide checks that open many pages concurrently"""
+
+    async def test_every_details_page_shows_its_book(self, async_context, api_client):
+        books = list(api_client.iter_books())
+
+        async def open_details(page, book):
+            details = AsyncBookDetailsPage(page)
+            await details.goto(book['id'])
+            return await details.snapshot()
+
+        records = await run_bounded(async_context, open_details, books)
+        mismatches = [
+            f"Book {book['id']}: shows '{record.title}', expected '{book.get('title') or ''}'"
+            for book, record in zip(books, records)
+            if record.title != (book.get('title') or '').strip()
+        ]
+        assert not mismatches, "\n".join(mismatches)
+
+    async def test_searches_show_what_the_api_returns(self, async_context, api_client):
+        async def search(page, pattern):
+            shelf = AsyncBookshelfPage(page)
+            await shelf.goto()
+            await shelf.search(pattern)
+            return [book.id for book in await shelf.snapshot()], shelf.query
+
+        results = await run_bounded(async_context, search, SEARCH_PATTERNS)
+        for pattern, (ids, query) in zip(SEARCH_PATTERNS, results):
+            expected = [str(book['id']) for book in api_client.list(**query)]
+            assert ids == expected, f"Search '{pattern}' should show the books the API returns"
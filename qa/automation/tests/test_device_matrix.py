@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from support.device_matrix import DeviceMatrix, descriptor, overlaps
+
+DEVICES = {
+    "iPhone SE": {
+        "user_agent": "iPhone",
+        "viewport": {"width": 320, "height": 568},
+        "is_mobile": True,
+        "default_browser_type": "webkit",
+    },
+}
+
+
+def test_descriptors_come_from_device_names_or_viewports():
+    assert descriptor(DEVICES, "iPhone SE") == {"user_agent": "iPhone", "viewport": {"width": 320, "height": 568}, "is_mobile": True}
+    assert "default_browser_type" in DEVICES["iPhone SE"]
+    assert descriptor(DEVICES, "375x667") == {"viewport": {"width": 375, "height": 667}}
+    with pytest.raises(KeyError):
+        descriptor(DEVICES, "Nokia 3310")
+
+
+def test_boxes_overlap_only_when_they_share_area():
+    box = {"x": 0, "y": 0, "width": 100, "height": 40}
+    assert overlaps(box, {"x": 90, "y": 30, "width": 100, "height": 40})
+    assert not overlaps(box, {"x": 100, "y": 0, "width": 100, "height": 40})
+    assert not overlaps(box, {"x": 0, "y": 40, "width": 100, "height": 40})
+
+
+class FakePage:
+    def __init__(self, options):
+        self.viewport_size = options.get("viewport")
+
+    async def screenshot(self, path, full_page):
+        with open(path, "wb") as image:
+            image.write(b"png")
+
+
+class FakeContext:
+    def __init__(self, options, events):
+        self.options = options
+        self.events = events
+
+    async def new_page(self):
+        return FakePage(self.options)
+
+    async def close(self):
+        self.events.append(("close", self.options["viewport"]["width"]))
+
+
+def test_every_device_runs_concurrently_in_its_own_context(tmp_path):
+    events = []
+    # asyncio.Barrier needs Python 3.11
+    started = []
+    everyone_started = asyncio.Event()
+
+    async def new_context(**options):
+        return FakeContext(options, events)
+
+    async def scenario(page, device):
+        # Every scenario waits until all of them have started
+        started.append(device)
+        if len(started) == 3:
+            everyone_started.set()
+        await everyone_started.wait()
+        assert page.viewport_size["width"] >= 375, "too narrow"
+        return page.viewport_size["width"]
+
+    matrix = DeviceMatrix(new_context, {name: descriptor(DEVICES, name) for name in ["iPhone SE", "375x667", "1366x768"]}, tmp_path)
+    results = asyncio.run(matrix.run(scenario))
+
+    assert [result.device for result in results] == ["iPhone SE", "375x667", "1366x768"]
+    assert [result.passed for result in results] == [False, True, True]
+    assert results[0].error.startswith("AssertionError: too narrow")
+    assert [result.value for result in results] == [None, 375, 1366]
+    assert (tmp_path / "iphone-se.png").read_bytes() == b"png"
+    assert all(result.screenshot for result in results)
+    assert sorted(events) == [("close", 320), ("close", 375), ("close", 1366)]
+    assert [result.device for result in matrix.failures] == ["iPhone SE"]
+    assert matrix.describe().startswith("iPhone SE: AssertionError: too narrow")
+    assert matrix.to_dict()[1]["viewport"] == {"width": 375, "height": 667}
@@ -0,0 +1,87 @@
+import json
+import zipfile
+
+import pytest
+
+from support import timing
+from support.flight_recorder import FlightRecorder, archive_name
+
+
+class FakeShelf:
+    @timing.timed("network")
+    def sort_by(self, value):
+        if value == "colour":
+            raise ValueError("no such sort")
+
+
+class FakePage:
+    def __init__(self, image=b"png"):
+        self.image = image
+
+    def screenshot(self):
+        if self.image is None:
+            raise RuntimeError("Target closed")
+        return self.image
+
+
+@pytest.fixture
+def recorder():
+    recorder = FlightRecorder(max_events=3, max_frames=2).start()
+    yield recorder
+    recorder.stop()
+
+
+def test_actions_are_reported_to_the_active_recorder(recorder):
+    shelf = FakeShelf()
+    shelf.sort_by("title")
+    with pytest.raises(ValueError):
+        shelf.sort_by("colour")
+
+    assert [(event["kind"], event["name"]) for event in recorder.events] == [
+        ("action done", "sort_by"), ("action", "sort_by"), ("action failed", "sort_by"),
+    ]
+    assert recorder.events[-1]["error"] == "ValueError: no such sort"
+    assert recorder.dropped == 1
+
+
+def test_stopped_recorders_hear_nothing(recorder):
+    recorder.stop()
+    FakeShelf().sort_by("title")
+    assert not recorder.events
+
+
+def test_buffers_are_bounded_and_dropped_per_test(recorder):
+    for index in range(5):
+        recorder.record("console", text=str(index))
+        recorder.frames.append((index, b"jpg"))
+    assert [event["text"] for event in recorder.events] == ["2", "3", "4"]
+    assert [moment for moment, _ in recorder.frames] == [3, 4]
+
+    recorder.begin()
+    assert not recorder.events and not recorder.frames and recorder.dropped == 0
+
+
+def test_saved_archive_has_events_frames_and_final_screenshots(recorder, tmp_path):
+    recorder.record("request", method="GET", url="http://localhost:3000/api/books")
+    recorder.frames.append((0.5, b"jpg"))
+    recorder.pages = [FakePage(), FakePage(image=None)]
+
+    path = recorder.save(tmp_path / "traces" / archive_name("tests/test_x.py::test_sort[title]"), "tests/test_x.py::test_sort[title]",
+                         "call failed", error="AssertionError: unsorted")
+
+    assert path.name == "tests-test_x.py-test_sort-title.zip"
+    with zipfile.ZipFile(path) as archive:
+        trace = json.loads(archive.read("trace.json"))
+        assert archive.read("frames/000.jpg") == b"jpg"
+        assert archive.read("final-0.png") == b"png"
+        assert "final-1.png" not in archive.namelist()
+    assert trace["outcome"] == "call failed"
+    assert trace["error"] == "AssertionError: unsorted"
+    assert trace["events"][0]["kind"] == "request"
+    assert trace["frames"] == [{"time": 0.5, "file": "frames/000.jpg"}]
+    assert trace["final_screenshots"] == ["final-0.png"]
+
+
+def test_retries_get_their_own_archive():
+    assert archive_name("tests/test_x.py::test_a", attempt=2) == "tests-test_x.py-test_a-attempt2.zip"
+
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from support.catalogue import DEV_BOOKS
+from support.test_impact import (
+    FRONTEND_SRC, SERVER_DIR, ImpactRecorder, changed, dependencies, endpoint, file_hash, frontend_files,
+    script_closure, scopes, server_files,
+)
+
+SORT = (None, "/home/ci/qa/packages/frontend/src/components/Sort.vue", "Sort")
+BOOKSHELF = ("data-v-5a1b2c3d", None, "BookshelfView")
+
+
+def test_api_requests_are_grouped_by_endpoint():
+    assert endpoint("GET", "http://localhost:3000/api/books?offset=12&sort=title") == "GET /api/books"
+    assert endpoint("GET", "http://localhost:3000/api/books/42") == "GET /api/books/:id"
+    assert endpoint("GET", "http://localhost:5173/src/components/Sort.vue") is None
+
+
+def test_components_bring_their_scripts_but_not_other_components():
+    closure = script_closure(FRONTEND_SRC / "views" / "BookshelfView.vue")
+    assert FRONTEND_SRC / "stores" / "books.js" in closure
+    assert FRONTEND_SRC / "components" / "Sort.vue" not in closure
+
+
+def test_frontend_files_are_the_shell_and_the_mounted_components():
+    files = frontend_files([SORT, BOOKSHELF])
+    assert FRONTEND_SRC / "main.js" in files
+    assert FRONTEND_SRC / "router" / "index.js" in files
+    assert FRONTEND_SRC / "components" / "Sort.vue" in files
+    assert FRONTEND_SRC / "views" / "BookshelfView.vue" in files
+    assert FRONTEND_SRC / "components" / "Search.vue" not in files
+
+
+def test_the_root_component_is_part_of_the_shell():
+    # Reused pages only remount the router view, so no test after the first would see App.vue mount
+    files = frontend_files([])
+    assert FRONTEND_SRC / "App.vue" in files
+    assert FRONTEND_SRC / "views" / "BookshelfView.vue" not in files
+
+
+def test_only_the_list_endpoint_depends_on_sorting():
+    sort_by = SERVER_DIR / "lib" / "utils" / "sort-by.js"
+    assert sort_by in server_files(["GET /api/books"])
+    details = server_files(["GET /api/books/:id"])
+    assert sort_by not in details
+    assert SERVER_DIR / "lib" / "store" / "books.js" in details
+    assert server_files([]) == set()
+
+
+def test_dependencies_hash_every_file_relative_to_the_repo():
+    files = dependencies(__file__, [SORT], ["GET /api/books/:id"])
+    assert files["qa/automation/tests/test_impact.py"] == file_hash(__file__)
+    assert "qa/packages/frontend/src/components/Sort.vue" in files
+    assert "qa/packages/server/lib/controllers/books.js" in files
+    assert "qa/packages/server/lib/utils/sort-by.js" not in files
+    assert "qa/automation/conftest.py" in files
+    assert not any(path.startswith("qa/packages") for path in dependencies(__file__))
+
+
+def test_stub_backed_tests_depend_on_the_books_fixture():
+    fixture = "qa/packages/server/lib/fixtures/dev-books.js"
+    assert dependencies(__file__, stub=True)[fixture] == file_hash(DEV_BOOKS)
+    assert fixture not in dependencies(__file__, browser=True)
+
+
+def test_changed_files_differ_or_are_gone():
+    path = "qa/automation/tests/test_impact.py"
+    assert changed({path: file_hash(__file__)}) == []
+    assert changed({path: "0" * 64, "qa/packages/frontend/src/Gone.vue": "1" * 64}) == [
+        path, "qa/packages/frontend/src/Gone.vue",
+    ]
+
+
+def test_recorder_collects_components_and_endpoints_per_test():
+    recorder = ImpactRecorder()
+    recorder.add_component({"scope": "data-v-5a1b2c3d", "file": None, "name": "BookshelfView"})
+    recorder.add_request(SimpleNamespace(method="GET", url="http://localhost:3000/api/books"))
+    recorder.add_request(SimpleNamespace(method="GET", url="http://localhost:5173/"))
+    assert recorder.components == {BOOKSHELF}
+    assert recorder.endpoints == {"GET /api/books"}
+    assert scopes(recorder.components) == {"data-v-5a1b2c3d": "qa/packages/frontend/src/views/BookshelfView.vue"}
+
+    recorder.begin()
+    assert recorder.components == set() and recorder.endpoints == set()
@@ -0,0 +1,28 @@
+from support.invariants import check_pagination
+from support.stub_backend import StubBooksApi
+
+
+def paginate(list_books, total, page_size=12, first_offset=0):
+    return [(offset, list_books(offset, page_size)) for offset in range(first_offset, total, page_size)]
+
+
+def test_slices_of_the_catalogue_order_pass():
+    expected = StubBooksApi().list(sort="title", limit="1000")
+    pages = paginate(lambda offset, limit: expected[offset:offset + limit], len(expected))
+    assert check_pagination(pages, expected) == []
+
+
+def test_sorting_after_slicing_is_reported():
+    api = StubBooksApi()
+    expected = api.list(sort="title", limit="1000")
+    pages = paginate(lambda offset, limit: api.list(offset=offset, limit=limit, sort="title"), len(expected))
+    violations = check_pagination(pages, expected)
+    assert any(violation.startswith("Order:") for violation in violations), violations
+
+
+def test_skipped_first_page_is_reported():
+    expected = StubBooksApi().list(limit="1000")
+    pages = paginate(lambda offset, limit: expected[offset:offset + limit], len(expected), first_offset=12)
+    violations = check_pagination(pages, expected)
+    assert violations[0] == "Gap: books 0-11 are on no page"
+    assert violations[-1].startswith("Missing: 12 books")
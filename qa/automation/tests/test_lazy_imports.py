@@ -0,0 +1,17 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_collecting_does_not_import_playwright():
+    script = (
+        "import sys\n"
+        "import conftest, pages.pages, pages.async_pages, support.context_pool\n"
+        "import plugins.async_browser, plugins.browser_server, plugins.device_matrix, plugins.soak, plugins.test_impact\n"
+        "import plugins.flight_recorder, plugins.regex_fuzz, plugins.visual\n"
+        "print('playwright' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,74 @@
+import asyncio
+import types
+
+import support.load
+
+from support.load import MIXES, Recorder, VirtualUser, endpoint, format_summary
+
+
+def test_requests_are_grouped_by_endpoint():
+    assert endpoint("GET", "http://localhost:3000/api/books?offset=12&sort=id") == "GET /api/books"
+    assert endpoint("GET", "http://localhost:3000/api/books/") == "GET /api/books"
+    assert endpoint("GET", "http://localhost:3000/api/books/42") == "GET /api/books/:id"
+    assert endpoint("GET", "http://localhost:5173/src/main.js", "script") == "GET script"
+
+
+def test_summary_has_throughput_and_percentiles():
+    recorder = Recorder()
+    for seconds in [0.1, 0.2, 0.3, 0.4]:
+        recorder.add_action("sort_by", seconds)
+    recorder.errors["search"] += 1
+
+    summary = recorder.summary(elapsed=2.0)
+
+    assert summary["actions"]["sort_by"]["count"] == 4
+    assert summary["actions"]["sort_by"]["throughput"] == 2.0
+    assert summary["actions"]["sort_by"]["p50"] == 0.25
+    assert summary["actions"]["search"] == {
+        "count": 0, "errors": 1, "throughput": 0.0, "p50": None, "p90": None, "p95": None, "p99": None, "max": None,
+    }
+    assert "sort_by" in format_summary(summary)
+
+
+def test_seeded_users_repeat_their_action_sequence():
+    def sequence(index):
+        user = VirtualUser(index, None, Recorder(), "browse", 0, seed=7)
+        return [user.rng.choices(user.actions, user.weights)[0] for _ in range(20)]
+
+    assert sequence(0) == sequence(0)
+    assert sequence(0) != sequence(1)
+    assert set(sequence(0)) <= set(MIXES["browse"])
+
+
+class FakeShelf:
+    """Every call advances a fake clock: loading the shelf takes 1 s, opening a book 0.25 s."""
+
+    def __init__(self, clock, books):
+        self.clock = clock
+        self.books = books
+
+    async def snapshot(self):
+        return self.books
+
+    async def goto(self):
+        self.clock.now += 1.0
+        self.books = ["book"] * 12
+
+    async def click_book_by_index(self, index):
+        self.clock.now += 0.25
+
+
+def test_coming_back_to_the_shelf_is_timed_as_its_own_action(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(support.load, "time", types.SimpleNamespace(perf_counter=lambda: clock.now))
+    recorder = Recorder()
+    user = VirtualUser(0, None, recorder, "browse", 0, seed=1)
+    user.shelf = FakeShelf(clock, books=["book"] * 12)
+
+    asyncio.run(user._perform("click_book_by_index"))
+    assert recorder.actions == {"click_book_by_index": [0.25], "goto": [1.0]}
+
+    user.shelf.books = []
+    asyncio.run(user._perform("click_book_by_index"))
+    assert recorder.actions == {"click_book_by_index": [0.25], "goto": [1.0, 1.0]}
+    assert not recorder.errors
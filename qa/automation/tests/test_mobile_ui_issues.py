@@ -0,0 +1,35 @@
+import pytest
+from pages.async_pages import AsyncBookshelfPage
+from support.device_matrix import overlaps
+
+pytestmark = [pytest.mark.asyncio(loop_scope="session"), pytest.mark.device_matrix()]
+
+SORT_CONTROL = 'select.form-select'
+SEARCH_BOX = 'input[is="regexp-input"]'
+
+
+async def controls(page, device):
+    """Loads the bookshelf and returns the bounding boxes of the sort control and the search box."""
+    shelf = AsyncBookshelfPage(page)
+    await shelf.goto()
+    return await page.locator(SORT_CONTROL).bounding_box(), await page.locator(SEARCH_BOX).bounding_box()
+
+
+async def test_sort_control_does_not_overlap_the_search_box(device_matrix):
+    async def check(page, device):
+        sort, search = await controls(page, device)
+        assert not overlaps(sort, search), f"Sort control {sort} overlaps the search box {search}"
+        return {"sort": sort, "search": search}
+
+    await device_matrix.run(check)
+    assert not device_matrix.failures, device_matrix.describe()
+
+
+async def test_controls_fit_in_the_viewport(device_matrix):
+    async def check(page, device):
+        width = page.viewport_size["width"]
+        for box in await controls(page, device):
+            assert box["x"] >= 0 and box["x"] + box["width"] <= width, f"{box} does not fit in {width} px"
+
+    await device_matrix.run(check)
+    assert not device_matrix.failures, device_matrix.describe()
@@ -0,0 +1,90 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+from pages.pages import BookshelfPage
+from support.network_profiles import PROFILES
+
+COVER = "https://i.gr-assets.com/images/S/compressed.photo.goodreads.com/books/1598823299i/42844155._SX50_.jpg"
+
+
+def test_text_only_blocks_covers_and_fonts_but_not_the_api():
+    profile = PROFILES["text-only"]
+    assert profile._matches(COVER)
+    assert profile._matches("http://localhost:5173/fonts/bootstrap-icons.woff2?v=1")
+    assert not profile._matches("http://localhost:3000/api/books?offset=12")
+    assert not profile.throttled
+
+
+def test_throttling_profiles_send_devtools_commands():
+    commands = dict(PROFILES["slow-4g"]._cdp_commands())
+    assert commands["Network.emulateNetworkConditions"] == {
+        "offline": False, "latency": 150, "downloadThroughput": 200_000.0, "uploadThroughput": 93_750.0,
+    }
+    assert commands["Emulation.setCPUThrottlingRate"] == {"rate": 4}
+    assert not PROFILES["placeholder-covers"].throttled
+
+
+@pytest.mark.network_profile("placeholder-covers")
+def test_covers_switch_to_the_large_image_once_it_loaded(page):
+    shelf = BookshelfPage(page)
+    shelf.goto()
+    # BookCover swaps the thumbnail for the large image after fetchImage resolves
+    page.wait_for_function(
+        "selector => [...document.querySelectorAll(selector)].every(link => !/\\._[^/]+_\\./.test(link.style.backgroundImage))",
+        arg=shelf.BOOK_LINKS,
+    )
+    covers = [book.cover for book in shelf.snapshot() if book.cover]
+    assert covers and not any(re.search(r"\._.+_", cover) for cover in covers)
+
+
+@pytest.mark.network_profile("slow-4g")
+def test_bookshelf_renders_on_a_slow_mobile_network(page):
+    shelf = BookshelfPage(page)
+    shelf.goto()
+    assert len(shelf.snapshot()) == shelf.PAGE_SIZE
+
+
+class FakeCdp:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def send(self, method, params):
+        self.sent.append(method)
+
+
+class FakeContext:
+    def __init__(self):
+        self.listeners = {}
+        self.routes = []
+        self.sent = []
+
+    def on(self, event, listener):
+        self.listeners[event] = listener
+
+    async def route(self, matches, handler):
+        self.routes.append(matches)
+
+    async def new_cdp_session(self, page):
+        return FakeCdp(self.sent)
+
+    async def new_page(self):
+        return SimpleNamespace(context=self)
+
+
+def test_async_contexts_throttle_every_page_they_open():
+    context = FakeContext()
+    asyncio.run(PROFILES["slow-3g"].apply_async(context))
+    page = asyncio.run(context.new_page())
+    # Before new_page returns, so nothing the test does on the page goes out unthrottled
+    assert page.context is context
+    assert context.sent == ["Network.enable", "Network.emulateNetworkConditions", "Emulation.setCPUThrottlingRate"]
+
+    asyncio.run(context.listeners["page"](SimpleNamespace(context=context)))
+    assert len(context.sent) == 6, "Pages the app opens are throttled too"
+
+    unthrottled = FakeContext()
+    asyncio.run(PROFILES["text-only"].apply_async(unthrottled))
+    assert "page" not in unthrottled.listeners and len(unthrottled.routes) == 1
+    assert unthrottled.new_page.__func__ is FakeContext.new_page
@@ -0,0 +1,17 @@
+from plugins.no_sleep import find_sleeps
+
+
+def test_fixed_sleeps_are_found():
+    source = (
+        "import time\n"
+        "from asyncio import sleep as pause\n"
+        "page.wait_for_timeout(2000)\n"
+        "time.sleep(1)\n"
+        "pause(1)\n"
+    )
+    assert [line for line, _ in find_sleeps(source)] == [3, 4, 5]
+
+
+def test_event_driven_waits_are_allowed():
+    source = "page.wait_for_load_state('networkidle')\npage.wait_for_url('**/books/*')\n"
+    assert find_sleeps(source) == []
@@ -0,0 +1,18 @@
+from plugins.parallel import schedule
+
+
+def test_longest_tests_are_spread_over_workers():
+    durations = {"a": 9.0, "b": 7.0, "c": 3.0, "d": 2.0, "e": 1.0}
+    shards = schedule(list(durations), durations, 2)
+    loads = sorted(sum(durations[nodeid] for nodeid in shard) for shard in shards)
+    assert loads == [11.0, 11.0], f"Shards should be balanced, got: {shards}"
+
+
+def test_unknown_tests_use_average_duration():
+    durations = {"a": 4.0, "b": 2.0}
+    shards = schedule(["a", "b", "new"], durations, 2)
+    assert ["a"] in shards, f"Longest known test should get its own worker, got: {shards}"
+
+
+def test_no_empty_shards():
+    assert schedule(["a"], {}, 4) == [["a"]]
@@ -0,0 +1,24 @@
+from support.perf_metrics import PerfMetrics, percentile, summarize
+
+
+def test_percentiles_interpolate_between_samples():
+    values = [10, 20, 30, 40, 50]
+    assert percentile(values, 50) == 30
+    assert percentile(values, 95) == 48
+    assert percentile([7], 95) == 7
+
+
+def test_samples_are_summarized_per_flow_and_metric():
+    metrics = PerfMetrics()
+    metrics.record("bookshelf.load", {"first_book_link": 300.0, "largest_contentful_paint": None})
+    metrics.record("bookshelf.load", {"first_book_link": 500.0})
+    metrics.record_render("bookshelf.sort_by", {"rendered": 1250.0, "input": 1000.0})
+    metrics.record_render("bookshelf.sort_by", {"rendered": 900.0, "input": None})
+
+    summary = summarize(metrics.drain())
+
+    assert summary == {
+        "bookshelf.load": {"first_book_link": {"count": 2, "p50": 400.0, "p95": 490.0, "max": 500.0}},
+        "bookshelf.sort_by": {"render_latency": {"count": 1, "p50": 250.0, "p95": 250.0, "max": 250.0}},
+    }
+    assert metrics.drain() == []
@@ -0,0 +1,156 @@
+import re
+import types
+from collections import Counter
+
+import pytest
+
+import support.regex_fuzz
+
+from support.api_client import ApiError, BooksApiClient
+from support.catalogue import load_books
+from support.regex_fuzz import Pattern, RegexFuzz, expected_ids, generate, ladders
+from support.stub_backend import StubBooksApi
+from support.stub_server import StubServer
+
+
+def test_generated_patterns_are_reproducible_and_mixed():
+    patterns = generate(500, seed=3)
+
+    assert patterns == generate(500, seed=3)
+    assert patterns != generate(500, seed=4)
+    assert len({pattern.text for pattern in patterns}) == 500
+    families = Counter(pattern.family for pattern in patterns)
+    assert families["empty"] == 1 and families["literal"] > 10 and families["lookaround"] > 10
+    invalid = [pattern for pattern in patterns if not pattern.valid]
+    assert 75 < len(invalid) < 175
+    for pattern in invalid:
+        with pytest.raises(re.error):
+            re.compile(pattern.text)
+
+
+def test_oracle_reads_titles_like_javascript():
+    books = load_books()
+    assert [books[index]["title"] for index in expected_ids("the.*golden", books)] == [
+        "The Golden Compass (His Dark Materials, #1)",
+    ]
+    assert 7 not in expected_ids("", books), "An empty search is '.+', which never matches an empty title"
+    # Without the u flag \w is ASCII only
+    assert expected_ids("L\\w+strump", books) == []
+    assert len(expected_ids("långstrump", books)) == 1
+
+
+def test_ladders_match_the_same_titles_as_their_linear_equivalents():
+    books = load_books()
+    for shape in ladders(sizes=(2, 3, 5)).values():
+        for pattern in shape:
+            assert expected_ids(pattern.text, books) == expected_ids(pattern.oracle, books), pattern.text
+
+
+def test_stub_backend_agrees_with_the_oracle():
+    fuzz = RegexFuzz(count=200, seed=1, sizes=(2, 4))
+    with StubServer(StubBooksApi()) as server, BooksApiClient(server.base_url, pool_size=16) as client:
+        report = fuzz.run_api(client)
+
+    assert not report.failures, report.describe()
+    assert len(report.results) == 200 + 2 * len(ladders())
+    assert {result.outcome for result in report.results if result.family == "unclosed group"} == {"ok"}
+    assert fuzz.reports == [report]
+
+
+class FakeClient:
+    """Answers like the stub; every search takes ``cost(search, calls so far)`` seconds of a fake clock."""
+
+    def __init__(self, clock, cost):
+        self.api = StubBooksApi()
+        self.clock = clock
+        self.cost = cost
+        self.calls = Counter()
+
+    def list(self, search, limit):
+        self.calls[search] += 1
+        self.clock.now += self.cost(search, self.calls[search])
+        try:
+            return self.api.list(search=search, limit=limit)
+        except re.error as error:
+            raise ApiError(500, str(error))
+
+
+def test_slow_patterns_are_measured_alone_and_ladders_stop_growing(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(support.regex_fuzz, "time", types.SimpleNamespace(perf_counter=lambda: clock.now))
+
+    def cost(search, calls):
+        if search == "Harry":
+            # Only slow while another pattern stalled the server
+            return 1.0 if calls == 1 else 0.0
+        if search == "Potter":
+            return 1.0
+        size = next((pattern.size for shape in ladders((2, 4, 6)).values() for pattern in shape
+                     if pattern.text == search), None)
+        return 0.001 * 20 ** (size / 2) if size else 0.0
+
+    fuzz = RegexFuzz(count=1, concurrency=1, slow=0.5, sizes=(2, 4, 6))
+    fuzz.patterns = [Pattern("Harry", "literal"), Pattern("Potter", "literal"), Pattern("(Harry", "unclosed group", valid=False)]
+    report = fuzz.run_api(FakeClient(clock, cost))
+
+    assert report.baseline == 0.0
+    assert [result.pattern for result in report.slow if result.family == "literal"] == ["Potter"]
+    assert all(result.outcome == "ok" for result in report.results)
+    ladder = [result for result in report.results if result.family == "redos"]
+    # 0.02 s, then 0.4 s: 20 times slower per step, so 8 s are expected at the next size
+    assert [result.size for result in ladder] == [2, 4] * len(ladders())
+    assert all(result.slow for result in ladder if result.size == 4)
+    assert "20x slower per step" in ladder[1].detail
+    assert "Potter" in report.describe()
+
+
+class CrashingClient(FakeClient):
+    """Goes down for good after its first error response, like the Express server on an unhandled rejection."""
+
+    crashed = False
+
+    def list(self, search, limit):
+        if self.crashed:
+            raise ConnectionRefusedError("server is down")
+        try:
+            return super().list(search, limit)
+        except ApiError:
+            self.crashed = True
+            raise
+
+
+def test_ladders_are_climbed_before_an_invalid_pattern_can_crash_the_server():
+    client = CrashingClient(types.SimpleNamespace(now=0.0), lambda search, calls: 0.0)
+    fuzz = RegexFuzz(count=1, concurrency=1, sizes=(2, 4))
+    fuzz.patterns = [Pattern("(Harry", "unclosed group", valid=False), Pattern("Harry", "literal")]
+    report = fuzz.run_api(client)
+
+    assert client.crashed
+    assert report.results[-1].family == "unclosed group"
+    assert all(result.outcome == "ok" for result in report.results), report.describe()
+
+
+class FakeShelf:
+    """Shows the page of the stub's results the bookshelf asks for, from offset 12 like the app does."""
+
+    def __init__(self, offset):
+        self.api = StubBooksApi()
+        self.offset = offset
+        self.query = {}
+        self.books = []
+
+    def search(self, query):
+        self.query = {"offset": str(self.offset), "limit": "12", "search": query}
+        self.books = self.api.list(offset=self.offset, limit=12, search=query)
+
+    def snapshot(self):
+        return [types.SimpleNamespace(id=str(book["id"])) for book in self.books]
+
+
+def test_ui_oracle_expects_the_page_the_grid_requested():
+    fuzz = RegexFuzz(count=1)
+    pattern = Pattern("e", "literal")
+    assert len(fuzz.expected(pattern)) > 24
+
+    assert fuzz._check_ui(FakeShelf(offset=12), pattern).outcome == "ok"
+    assert fuzz._check_ui(FakeShelf(offset=0), pattern).outcome == "ok"
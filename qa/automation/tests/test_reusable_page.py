@@ -0,0 +1,50 @@
+import pytest
+from pages.pages import BookshelfPage
+from support.reusable_page import FINGERPRINT, ReusablePage
+
+pytestmark = pytest.mark.reuse_page
+
+
+def test_goto_on_a_shared_page_resets_without_reloading(page):
+    shelf = BookshelfPage(page)
+    shelf.goto()
+    page.evaluate("window.__loadedOnce = performance.timeOrigin")
+    shelf.sort_by("title")
+    shelf.go_to_next_page()
+
+    shelf.goto()
+
+    assert page.evaluate("window.__loadedOnce") == page.evaluate("performance.timeOrigin")
+    assert page.input_value('select.form-select') == "id"
+    assert shelf.query.get("sort") == "id"
+    page.evaluate("delete window.__loadedOnce")
+
+
+def test_leaked_state_gets_a_fresh_page(page, reusable_page):
+    page.evaluate("document.body.appendChild(document.createElement('dialog'))")
+    prepare = lambda page: None
+    fresh = reusable_page.checkout(prepare, reusable_page.profile)
+
+    assert fresh is not page
+    assert reusable_page.fallbacks == 1
+    assert fresh.evaluate(FINGERPRINT) == reusable_page.baseline
+
+
+class FakePage:
+    pass
+
+
+class FakePool:
+    def __init__(self):
+        self.released = []
+
+    def release(self, page):
+        self.released.append(page)
+
+
+def test_closing_releases_the_shared_page():
+    pool = FakePool()
+    reusable = ReusablePage(pool)
+    reusable.page = FakePage()
+    reusable.close()
+    assert pool.released and reusable.page is None
@@ -1,6 +1,9 @@
 import pytest
 from pages.pages import BookshelfPage
 
+# These tests only read text, so covers and fonts are not downloaded
+pytestmark = pytest.mark.network_profile("text-only")
+
 class TestSearchFunctionality:
     """Test cases for search functionality issues"""
     
@@ -25,10 +28,9 @@ class TestSearchFunctionality:
         
         # Search with valid regex pattern for "The"
         shelf.search('The')
-        page.wait_for_timeout(2000)
         
         # Get search results
-        search_results = shelf.get_book_elements()
+        search_results = shelf.snapshot()
         assert len(search_results) > 0, "Search for 'The' should return results"
 
     def test_regex_search_with_special_characters(self, page):
@@ -41,10 +43,9 @@ class TestSearchFunctionality:
         
         # Search with regex pattern that includes special characters
         shelf.search('The.*Golden')  # Valid regex pattern for "The Golden Compass"
-        page.wait_for_timeout(2000)
         
         # Get search results
-        search_results = shelf.get_book_elements()
+        search_results = shelf.snapshot()
         assert len(search_results) > 0, "Regex search 'The.*Golden' should return results"
 
     def test_search_clears_invalid_feedback_on_valid_input(self, page):
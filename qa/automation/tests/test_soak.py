@@ -0,0 +1,112 @@
+import itertools
+import types
+
+import pytest
+
+import support.soak
+
+from support.soak import Sample, SoakRun, analyze, python_handles, slope
+
+
+def samples(values, every=5):
+    return [
+        Sample(iteration=index * every, elapsed=index * 2.0, js_heap_used=value, dom_nodes=500,
+               listeners=40, documents=1, python_handles=None)
+        for index, value in enumerate(values)
+    ]
+
+
+def test_slope_fits_a_line():
+    assert slope([0, 1, 2, 3], [1, 3, 5, 7]) == pytest.approx(2.0)
+    assert slope([5, 5], [1, 9]) == 0.0
+
+
+def test_steady_growth_is_a_leak():
+    metrics = analyze(samples([1_000_000 + 100_000 * i for i in range(10)]))
+
+    assert metrics["js_heap_used"]["unbounded"]
+    assert metrics["js_heap_used"]["slope_per_iteration"] == pytest.approx(20_000)
+    assert metrics["js_heap_used"]["slope_per_minute"] == pytest.approx(3_000_000)
+    assert not metrics["dom_nodes"]["unbounded"]
+    assert "python_handles" not in metrics
+
+
+def test_growth_that_levels_off_after_warming_up_is_not_a_leak():
+    metrics = analyze(samples([1_000_000, 1_400_000, 1_600_000, 1_650_000, 1_650_000, 1_640_000, 1_660_000, 1_650_000]))
+
+    assert metrics["js_heap_used"]["growth"] > 0.2
+    assert not metrics["js_heap_used"]["unbounded"]
+
+
+def test_small_growth_is_not_a_leak():
+    assert not analyze(samples([1_000_000 + 1_000 * i for i in range(10)]))["js_heap_used"]["unbounded"]
+
+
+class FakeCdp:
+    def __init__(self):
+        self.heap = 1_000_000
+        self.sent = []
+
+    def send(self, method, params=None):
+        self.sent.append(method)
+        if method == "Performance.getMetrics":
+            self.heap += 50_000
+            return {"metrics": [
+                {"name": "JSHeapUsedSize", "value": self.heap},
+                {"name": "Nodes", "value": 800},
+                {"name": "JSEventListeners", "value": 60},
+                {"name": "Documents", "value": 2},
+                {"name": "LayoutCount", "value": 10},
+            ]}
+        return {}
+
+
+class FakeContext:
+    def __init__(self, cdp):
+        self.cdp = cdp
+
+    def new_cdp_session(self, page):
+        return self.cdp
+
+
+class FakePage:
+    def __init__(self, cdp):
+        self.context = FakeContext(cdp)
+
+
+def test_soak_run_samples_while_looping_and_reports_leaks(monkeypatch):
+    cdp = FakeCdp()
+    run = SoakRun(FakePage(cdp), duration=0.0, sample_every=2)
+    iterations = []
+    # A zero duration still takes the first sample before stopping
+    report = run.run(iterations.append)
+
+    assert not iterations
+    assert [sample.iteration for sample in report.samples] == [0]
+    assert cdp.sent[:2] == ["Performance.enable", "HeapProfiler.collectGarbage"]
+
+    # Every iteration takes a second
+    monkeypatch.setattr(support.soak, "time", types.SimpleNamespace(monotonic=itertools.count().__next__))
+    run = SoakRun(FakePage(FakeCdp()), duration=10, sample_every=2)
+    report = run.run(iterations.append)
+
+    assert iterations == list(range(9))
+    # The last sample is taken when the time is up
+    assert [sample.iteration for sample in report.samples] == [0, 2, 4, 6, 8, 9]
+    assert report.leaks == ["js_heap_used"]
+    assert "js_heap_used" in report.describe() and "grows without bound" in report.describe()
+    assert run.report.to_dict()["leaks"] == ["js_heap_used"]
+
+
+def test_python_handles_counts_the_objects_of_the_connection():
+    class Connection:
+        _objects = {"page@1": object(), "handle@2": object()}
+
+    class Impl:
+        _connection = Connection()
+
+    class SyncPage:
+        _impl_obj = Impl()
+
+    assert python_handles(SyncPage()) == 2
+    assert python_handles(object()) is None
@@ -1,6 +1,9 @@
 import pytest
 from pages.pages import BookshelfPage
 
+# These tests only read state: covers and fonts are not downloaded and the page is shared
+pytestmark = [pytest.mark.network_profile("text-only"), pytest.mark.reuse_page]
+
 class TestSortFunctionality:
     """Test cases for sort functionality - happy path tests"""
     
@@ -13,17 +16,14 @@ class TestSortFunctionality:
         page.wait_for_load_state('networkidle')
         
         # Get initial book order
-        initial_books = shelf.get_book_elements()
+        initial_books = shelf.snapshot()
         assert len(initial_books) > 0, "Books should be loaded"
         
         # Sort by ID
         shelf.sort_by('id')
         
-        # Wait for sort to complete
-        page.wait_for_timeout(2000)
-        
         # Get books after sorting
-        sorted_books = shelf.get_book_elements()
+        sorted_books = shelf.snapshot()
         assert len(sorted_books) > 0, "Books should still be visible after sorting by ID"
         
         # Verify sort order (books should be ordered by ID)
@@ -39,17 +39,14 @@ class TestSortFunctionality:
         page.wait_for_load_state('networkidle')
         
         # Get initial book order
-        initial_books = shelf.get_book_elements()
+        initial_books = shelf.snapshot()
         assert len(initial_books) > 0, "Books should be loaded"
         
         # Sort by rating
         shelf.sort_by('rating')
         
-        # Wait for sort to complete
-        page.wait_for_timeout(2000)
-        
         # Get books after sorting
-        sorted_books = shelf.get_book_elements()
+        sorted_books = shelf.snapshot()
         assert len(sorted_books) > 0, "Books should still be visible after sorting by rating"
         
         # Verify sort order
@@ -64,17 +61,14 @@ class TestSortFunctionality:
         page.wait_for_load_state('networkidle')
         
         # Get initial book order
-        initial_books = shelf.get_book_elements()
+        initial_books = shelf.snapshot()
         assert len(initial_books) > 0, "Books should be loaded"
         
         # Sort by title
         shelf.sort_by('title')
         
-        # Wait for sort to complete
-        page.wait_for_timeout(2000)
-        
         # Get books after sorting
-        sorted_books = shelf.get_book_elements()
+        sorted_books = shelf.snapshot()
         assert len(sorted_books) > 0, "Books should still be visible after sorting by title"
         
         # Verify sort order
@@ -89,17 +83,14 @@ class TestSortFunctionality:
         page.wait_for_load_state('networkidle')
         
         # Get initial book order
-        initial_books = shelf.get_book_elements()
+        initial_books = shelf.snapshot()
         assert len(initial_books) > 0, "Books should be loaded"
         
         # Sort by author
         shelf.sort_by('author')
         
-        # Wait for sort to complete
-        page.wait_for_timeout(2000)
-        
         # Get books after sorting
-        sorted_books = shelf.get_book_elements()
+        sorted_books = shelf.snapshot()
         assert len(sorted_books) > 0, "Books should still be visible after sorting by author"
         
         # Verify sort order
@@ -115,10 +106,9 @@ class TestSortFunctionality:
         
         # Sort by title (ascending by default)
         shelf.sort_by('title')
-        page.wait_for_timeout(2000)
         
         # Get books in ascending order
-        ascending_books = shelf.get_book_elements()
+        ascending_books = shelf.snapshot()
         assert len(ascending_books) > 0, "Books should be visible after ascending sort"
         
         # Note: The current implementation might not have explicit ascending/descending controls
@@ -135,11 +125,9 @@ class TestSortFunctionality:
         
         # Sort by title
         shelf.sort_by('title')
-        page.wait_for_timeout(2000)
         
         # Navigate to next page
         shelf.go_to_next_page()
-        page.wait_for_timeout(2000)
         
         # Check that sort preference is maintained
         # The sort dropdown should still show 'title' as selected
@@ -149,7 +137,6 @@ class TestSortFunctionality:
         
         # Navigate back to first page
         shelf.go_to_prev_page()
-        page.wait_for_timeout(2000)
         
         # Check that sort preference is still maintained
         selected_value = sort_select.input_value()
@@ -166,18 +153,16 @@ class TestSortFunctionality:
         # Search for a specific term that exists in the dataset
         # Use a valid regex pattern since the input validates regex
         shelf.search('The.*Golden')  # Updated regex to match 'The Golden Compass'
-        page.wait_for_timeout(2000)
     
         # Get search results
-        search_results = shelf.get_book_elements()
+        search_results = shelf.snapshot()
         assert len(search_results) > 0, "Search for 'The.*Golden' should return results"
         
         # Sort the search results by title
         shelf.sort_by('title')
-        page.wait_for_timeout(2000)
         
         # Verify that sorted search results are still visible
-        sorted_search_results = shelf.get_book_elements()
+        sorted_search_results = shelf.snapshot()
         assert len(sorted_search_results) > 0, "Sorted search results should be visible"
         
         # The number of results should remain the same (just reordered)
@@ -1,5 +1,9 @@
 import pytest
 from pages.pages import BookshelfPage
+from support.invariants import check_pagination, expected_order, sweep_api, sweep_ui
+
+# These tests only read text, so covers and fonts are not downloaded
+pytestmark = pytest.mark.network_profile("text-only")
 
 class TestSortPaginationBug:
     """HIGHEST PRIORITY BUG: Sort functionality doesn't maintain state across pagination"""
@@ -31,33 +35,14 @@ class TestSortPaginationBug:
         assert selected_value == 'title', "Sort dropdown should show 'title' as selected"
         
         # Get sorted book titles from first page
-        first_page_books = shelf.get_book_elements()
+        first_page_books = shelf.snapshot()
         
         # Skip test if no books are loaded (backend issue)
         if len(first_page_books) == 0:
             pytest.skip("No books loaded - likely backend connection issue")
         
-        # Extract book titles by clicking on each book and getting the title from details page
-        first_page_titles = []
-        
-        for i in range(min(3, len(first_page_books))):  # Test first 3 books
-            # Click on the book to go to details page
-            shelf.click_book_by_index(i)
-            
-            # Wait for navigation to book details page
-            page.wait_for_url("**/books/*")
-            
-            # Get the title from the h1 element
-            title = page.text_content('h1[data-v-2dd5deba]')
-            if title and title.strip():
-                first_page_titles.append(title.strip())
-            
-            # Go back to bookshelf
-            page.go_back()
-            page.wait_for_load_state('networkidle')
-            
-            # Re-sort to maintain the sort state
-            shelf.sort_by('title')
+        # Read the titles of the whole page from the grid
+        first_page_titles = [book.title for book in first_page_books if book.title]
         
         # Verify first page has books
         assert len(first_page_titles) > 0, "First page should have book titles"
@@ -71,30 +56,9 @@ class TestSortPaginationBug:
         if next_button.is_visible() and not next_button.is_disabled():
             # Navigate to next page
             shelf.go_to_next_page()
-            page.wait_for_timeout(2000)  # Wait for page load
             
             # Get book titles from second page (same method)
-            second_page_books = shelf.get_book_elements()
-            second_page_titles = []
-            
-            for i in range(min(3, len(second_page_books))):  # Test first 3 books
-                # Click on the book to go to details page
-                shelf.click_book_by_index(i)
-                
-                # Wait for navigation to book details page
-                page.wait_for_url("**/books/*")
-                
-                # Get the title from the h1 element
-                title = page.text_content('h1[data-v-2dd5deba]')
-                if title and title.strip():
-                    second_page_titles.append(title.strip())
-                
-                # Go back to bookshelf
-                page.go_back()
-                page.wait_for_load_state('networkidle')
-                
-                # Re-sort to maintain the sort state
-                shelf.sort_by('title')
+            second_page_titles = [book.title for book in shelf.snapshot() if book.title]
             
             # Verify second page has books
             assert len(second_page_titles) > 0, "Second page should have book titles"
@@ -134,4 +98,27 @@ class TestSortPaginationBug:
                 "Sort dropdown should maintain selected option across pages"
         else:
             # If no next page, document that pagination is not available
-            pytest.skip("Next page not available - pagination may not be implemented or only one page exists") 
\ No newline at end of file
+            pytest.skip("Next page not available - pagination may not be implemented or only one page exists")
+
+    @pytest.mark.parametrize("sort", ["id", "title", "author", "rating"])
+    def test_every_page_continues_the_catalogue_order(self, page, sort):
+        """
+        FAILING TEST: Paging through the whole bookshelf should list every book once, in sort order
+
+        Sweeps all pages in one pass and checks them against the order the API
+        returns for the full catalogue: no gaps between offsets, no duplicates,
+        and each page starting after the book that ended the previous one.
+        """
+        shelf = BookshelfPage(page)
+        pages = sweep_ui(shelf, sort)
+        violations = check_pagination(pages, expected_order(page, sort))
+        assert not violations, "\n".join(violations)
+
+    @pytest.mark.parametrize("order", ["asc", "desc"])
+    @pytest.mark.parametrize("sort", ["id", "title", "author", "rating"])
+    def test_api_pages_continue_the_catalogue_order(self, page, sort, order):
+        """FAILING TEST: /api/books pages should be slices of the catalogue-wide sort order"""
+        BookshelfPage(page).goto()
+        expected = expected_order(page, sort, order)
+        violations = check_pagination(sweep_api(page, sort, order, total=len(expected)), expected)
+        assert not violations, "\n".join(violations)
@@ -0,0 +1,54 @@
+from support.catalogue import load_books
+from support.stub_backend import StubBooksApi
+
+
+def test_fixture_books_are_indexed_like_the_server():
+    books = load_books()
+    assert [book["id"] for book in books] == list(range(len(books)))
+    assert "author" not in books[7], "Keys set to undefined should be dropped"
+    assert books[15]["author"] is None, "Keys set to null should be kept"
+
+
+def test_list_defaults_to_first_hundred_books():
+    api = StubBooksApi()
+    ids = [book["id"] for book in api.list()]
+    assert len(ids) == 100
+    assert 7 not in ids, "A book with an empty title never matches the default search"
+
+
+def test_ids_are_compared_as_strings():
+    api = StubBooksApi()
+    assert [book["id"] for book in api.list(limit="12")][:5] == [0, 1, 10, 11, 12]
+
+
+def test_list_sorts_only_the_requested_page():
+    # Same as BookStore.list: the page is sliced before it is sorted
+    api = StubBooksApi()
+    page = api.list(offset="12", limit="12", sort="title")
+    assert sorted(book["id"] for book in page) == list(range(13, 25))
+
+
+def test_search_is_a_case_insensitive_regexp_on_titles():
+    api = StubBooksApi()
+    titles = [book["title"] for book in api.list(search="the.*golden")]
+    assert titles == ["The Golden Compass (His Dark Materials, #1)"]
+
+
+def test_descending_order():
+    api = StubBooksApi()
+    ascending = api.list(sort="author", limit="200")
+    descending = api.list(sort="author", limit="200", order="desc")
+    assert [book.get("author") for book in descending] == [book.get("author") for book in reversed(ascending)]
+
+
+def test_get_unknown_book_returns_nothing():
+    api = StubBooksApi()
+    assert api.get("0")["id"] == 0
+    assert api.get("05") is None
+    assert api.get("9999") is None
+
+
+def test_search_classes_are_ascii_only_like_javascript():
+    api = StubBooksApi()
+    assert api.list(search="L\\w+strump") == []
+    assert [book["title"] for book in api.list(search="långstrump")] == ["Pippi Longstocking (Pippi Långstrump, #1)"]
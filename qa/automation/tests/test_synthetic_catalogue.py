@@ -0,0 +1,30 @@
+from itertools import islice
+
+from support.catalogue import load_books
+from support.synthetic_catalogue import generate_books, write_fixture
+
+
+def test_same_seed_same_books():
+    assert list(generate_books(50, seed=3)) == list(generate_books(50, seed=3))
+    assert list(generate_books(50, seed=3)) != list(generate_books(50, seed=4))
+
+
+def test_books_are_streamed():
+    books = generate_books(10**9)
+    assert len(list(islice(books, 5))) == 5
+
+
+def test_books_look_like_the_fixture():
+    books = list(generate_books(2000, seed=1))
+    assert all(book["title"] and book["cover"].startswith("https://") for book in books)
+    ratings = [book["rating"] for book in books if book["rating"] is not None]
+    assert all(1.0 <= rating <= 5.0 for rating in ratings)
+    assert 3.8 < sum(ratings) / len(ratings) < 4.2
+    assert any(book["author"] is None for book in books)
+
+
+def test_fixture_loads_like_dev_books(tmp_path):
+    path = write_fixture(tmp_path / "books.js", 100, seed=2)
+    books = load_books(path)
+    assert [book["id"] for book in books] == list(range(100))
+    assert [{k: v for k, v in book.items() if k != "id"} for book in books] == list(generate_books(100, seed=2))
@@ -0,0 +1,86 @@
+import asyncio
+
+from support.timing import Timeline, timed
+
+
+class FakeShelf:
+    def __init__(self, clock):
+        self.clock = clock
+
+    @timed("navigation")
+    def goto(self):
+        self.clock.advance(2.0)
+        self.wait_for_render()
+
+    @timed("network")
+    def search(self, query):
+        self.clock.advance(0.5)
+        self.wait_for_render()
+
+    @timed("render")
+    def wait_for_render(self):
+        self.clock.advance(0.25)
+
+    @timed("network")
+    async def sort_by(self, value):
+        self.clock.advance(1.0)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_timeline(monkeypatch, clock):
+    monkeypatch.setattr("support.timing.time.perf_counter", lambda: clock.now)
+    return Timeline("tests/test_x.py::test_flow").start()
+
+
+def test_actions_are_split_into_phases(monkeypatch):
+    clock = Clock()
+    timeline = make_timeline(monkeypatch, clock)
+    shelf = FakeShelf(clock)
+    shelf.goto()
+    clock.advance(0.75)
+    shelf.search("a.*")
+    asyncio.run(shelf.sort_by("title"))
+    timeline.stop()
+
+    assert [span.name for span in timeline.spans] == ["goto", "wait_for_render", "search", "wait_for_render", "sort_by"]
+    assert timeline.phases() == {"navigation": 2.0, "network": 1.5, "render": 0.5, "idle": 0.75}
+    assert timeline.stacks() == {
+        "tests/test_x.py::test_flow;goto": 2_000_000,
+        "tests/test_x.py::test_flow;goto;wait_for_render": 250_000,
+        "tests/test_x.py::test_flow;search": 500_000,
+        "tests/test_x.py::test_flow;search;wait_for_render": 250_000,
+        "tests/test_x.py::test_flow;sort_by": 1_000_000,
+        "tests/test_x.py::test_flow;(idle)": 750_000,
+    }
+
+
+def test_nothing_is_recorded_without_a_timeline(monkeypatch):
+    clock = Clock()
+    timeline = make_timeline(monkeypatch, clock)
+    timeline.stop()
+    FakeShelf(clock).goto()
+    assert timeline.spans == []
+
+
+def test_restarting_drops_setup_and_keeps_one_time_base(monkeypatch):
+    clock = Clock()
+    timeline = make_timeline(monkeypatch, clock)
+    shelf = FakeShelf(clock)
+    shelf.goto()
+    clock.advance(1.0)
+
+    assert timeline.restart() is timeline
+    clock.advance(0.5)
+    shelf.search("a.*")
+    timeline.stop()
+
+    assert [(span.name, span.start) for span in timeline.spans] == [("search", 0.5), ("wait_for_render", 1.0)]
+    assert timeline.duration == 1.25
+    assert timeline.phases() == {"navigation": 0.0, "network": 0.5, "render": 0.25, "idle": 0.5}
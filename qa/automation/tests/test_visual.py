@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from support.visual import TILE, VisualChecker, compare, compare_files, describe, file_name, signature
+
+
+def screen(height=300, width=500, seed=0):
+    """A bookshelf-like image: a light page with a grid of dark covers and some text lines."""
+    image = np.full((height, width, 3), 245, dtype=np.uint8)
+    covers = np.random.default_rng(seed).integers(20, 200, size=(3, 6, 3), dtype=np.uint8)
+    for row in range(3):
+        for column in range(6):
+            top, left = 10 + row * 95, 10 + column * 80
+            image[top:top + 70, left:left + 60] = covers[row, column]
+            image[top + 75:top + 80, left:left + 45] = 60
+    return image
+
+
+def noisy(image, amplitude=3, seed=1):
+    noise = np.random.default_rng(seed).integers(-amplitude, amplitude + 1, size=image.shape)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def test_noise_and_antialiasing_match_without_pixel_comparisons():
+    baseline = screen()
+    comparison = compare(baseline, noisy(baseline))
+
+    assert comparison.status == "match"
+    assert comparison.tiles == 5 * 8
+    assert comparison.changed_pixels == 0 and comparison.changed_tiles == []
+    assert comparison.candidates == 0, "Noise should not survive the tile signatures"
+
+
+def test_only_the_changed_tiles_are_compared_and_reported():
+    baseline = screen()
+    actual = noisy(baseline)
+    # A 10x20 badge inside tile (2, 3), and a cover that changed colour across the four tiles at the top left
+    actual[140:150, 200:220] = (255, 0, 0)
+    actual[10:80, 10:70] = baseline[10:80, 10:70] // 2
+
+    comparison = compare(baseline, actual)
+
+    assert comparison.status == "changed"
+    assert comparison.changed_tiles == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 3)]
+    assert comparison.candidates < 10
+    assert comparison.changed_pixels == 10 * 20 + 70 * 60
+    assert comparison.ratio == pytest.approx(comparison.changed_pixels / (300 * 500))
+    assert comparison.box == (0, 0, 3 * TILE, 4 * TILE)
+
+
+def test_small_changes_below_the_threshold_still_match():
+    baseline = screen()
+    actual = baseline.copy()
+    actual[140:142, 200:205] = (255, 0, 0)
+
+    assert compare(baseline, actual, max_diff=0).status == "changed"
+    comparison = compare(baseline, actual)
+    assert comparison.status == "match" and comparison.changed_pixels == 10
+
+
+def test_size_changes_are_reported_without_comparing():
+    comparison = compare(screen(), screen(height=320))
+    assert comparison.status == "size" and comparison.size == (320, 500)
+
+
+def test_signatures_cover_partial_tiles():
+    hashes = signature(screen(height=130, width=70)).hashes
+    assert hashes.shape == (3, 2) and hashes.dtype == np.dtype(">u8")
+
+
+def test_names_are_safe_file_names():
+    assert file_name("bookshelf grid/iPhone SE (portrait)") == "bookshelf-grid-iPhone-SE-portrait"
+
+
+def test_missing_baselines_fail_unless_recorded(tmp_path):
+    result = compare_files("grid", b"png", tmp_path / "baselines", tmp_path / "diffs")
+    assert result["status"] == "missing" and "--visual-update" in describe(result)
+    assert not (tmp_path / "baselines").exists()
+    assert (tmp_path / "diffs" / "grid.actual.png").read_bytes() == b"png"
+
+    assert compare_files("grid", b"png", tmp_path / "baselines", tmp_path / "diffs", update=True)["status"] == "new"
+    assert (tmp_path / "baselines" / "grid.png").read_bytes() == b"png"
+    assert compare_files("grid", b"new", tmp_path / "baselines", tmp_path / "diffs", update=True)["status"] == "updated"
+    assert (tmp_path / "baselines" / "grid.png").read_bytes() == b"new"
+
+
+def test_checker_reports_comparisons_that_could_not_run(tmp_path):
+    (tmp_path / "grid.png").write_bytes(b"not a png")
+    with ThreadPoolExecutor(2) as pool:
+        checker = VisualChecker(pool, baseline_dir=tmp_path, diff_dir=tmp_path / "diffs")
+        checker.check("grid", b"not a png either")
+        checker.check("cover", b"png")
+        results = checker.wait()
+
+    assert [result["status"] for result in results] == ["error", "missing"]
+    assert checker.results == results and checker.pending == []
+
+
+def test_changed_screenshots_leave_a_compact_diff(tmp_path):
+    pytest.importorskip("PIL")
+    from support.visual import decode, encode
+
+    baseline = screen(height=600, width=900)
+    actual = baseline.copy()
+    actual[140:150, 200:220] = (255, 0, 0)
+    compare_files("grid", encode(baseline), tmp_path, tmp_path / "diffs", update=True)
+
+    assert compare_files("grid", encode(noisy(baseline)), tmp_path, tmp_path / "diffs")["status"] == "match"
+    result = compare_files("grid", encode(actual), tmp_path, tmp_path / "diffs", max_diff=0)
+    assert result["status"] == "changed" and result["changed_pixels"] == 200
+    diff = decode((tmp_path / "diffs" / "grid.diff.png").read_bytes())
+    # Baseline, actual and highlight of the one changed tile, with two 4 px gaps
+    assert diff.shape == (TILE, 3 * TILE + 8, 3)
+    assert (diff[12:22, 2 * TILE + 8 + 8:2 * TILE + 8 + 28] == (255, 0, 0)).all()
+    assert (tmp_path / "diffs" / "grid.json").exists()
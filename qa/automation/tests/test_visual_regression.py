@@ -0,0 +1,45 @@
+import pytest
+from pages.async_pages import AsyncBookshelfPage
+from pages.pages import BookshelfPage
+from support.visual import SETTLED
+
+# Screenshot checks only read the page, so they share one page that is soft-reset between them
+pytestmark = pytest.mark.reuse_page
+
+GRID = '.bookshelf section'
+BOOK_COVER = 'a.book'
+DETAILS = '.book section'
+
+
+# --- Visual 1: The bookshelf grid looks like its baseline
+def test_bookshelf_grid(page, visual):
+    BookshelfPage(page).goto()
+    visual.capture("bookshelf-grid", page.locator(GRID))
+
+
+# --- Visual 2: A single BookCover, once the large image replaced the thumbnail
+def test_book_cover(page, visual):
+    BookshelfPage(page).goto()
+    visual.capture("book-cover", page.locator(BOOK_COVER).first)
+
+
+# --- Visual 3: The details view of the first book
+def test_book_details(page, visual):
+    shelf = BookshelfPage(page)
+    shelf.goto()
+    shelf.click_book_by_index(0)
+    visual.capture("book-details", page.locator(DETAILS))
+
+
+# --- Visual 4: The bookshelf on phones and tablets; every device has its own baseline
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.device_matrix("iPhone SE", "Pixel 7", "Galaxy S8", "iPad Mini")
+async def test_mobile_bookshelf(device_matrix, visual):
+    async def check(page, device):
+        await AsyncBookshelfPage(page).goto()
+        await page.wait_for_load_state("networkidle")
+        await page.evaluate(SETTLED)
+        visual.check(f"bookshelf-{device}", await page.screenshot(animations="disabled", caret="hide"))
+
+    await device_matrix.run(check)
+    assert not device_matrix.failures, device_matrix.describe()
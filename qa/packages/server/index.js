@@ -3,7 +3,7 @@ import {createServer} from 'node:http';
 import {ROUTER} from './lib/routes/index.js';
 import cors from 'cors';
 
-const PORT = 3000;
+const PORT = process.env.PORT || 3000;
 
 const app = express();
 
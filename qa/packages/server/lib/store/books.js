@@ -1,4 +1,5 @@
-import {BOOKS} from '../fixtures/dev-books.js';
+import {pathToFileURL} from 'node:url';
+import {BOOKS as DEV_BOOKS} from '../fixtures/dev-books.js';
 import {by} from '../utils/sort-by.js';
 import {SECOND} from '../utils/time.js';
 import {timeout} from '../utils/timeout.js';
@@ -34,4 +35,9 @@ class BookStore {
   }
 }
 
+// BOOKS_FIXTURE may point to a generated catalogue module with the same shape as dev-books.js
+const BOOKS = process.env.BOOKS_FIXTURE
+  ? (await import(pathToFileURL(process.env.BOOKS_FIXTURE).href)).BOOKS
+  : DEV_BOOKS;
+
 export const BOOK_STORE = new BookStore(BOOKS);